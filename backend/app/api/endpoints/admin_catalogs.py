@@ -21,7 +21,8 @@ from ...services.catalog_service import (
     CatalogPermissionError
 )
 from ...services.catalog_permission_service import CatalogPermissionService
-from ...services.catalog_connectors import CatalogSyncService
+from ...services.catalog_connectors import CatalogSyncService, ConnectorFactory
+from ...services.catalog_sync_scheduler import catalog_sync_scheduler
 from ...schemas.catalog_schemas import (
     CreateCatalogRequest,
     UpdateCatalogRequest,
@@ -292,10 +293,12 @@ async def sync_catalog_data(
     """
     Sync data for a catalog from its source.
 
+    Joins the sync already running for this catalog, if any.
     Requires admin role.
     """
     try:
-        sync_result = await CatalogSyncService.sync_catalog_data(catalog_id)
+        await CatalogService.get_catalog(catalog_id)
+        sync_result = await catalog_sync_scheduler.request_sync(catalog_id)
 
         logger.info(f"Admin {current_user['sub']} synced catalog {catalog_id}")
 
@@ -316,6 +319,55 @@ async def sync_catalog_data(
         )
 
 
+@router.post("/{catalog_id}/sync/schedule", response_model=SuccessResponse)
+async def schedule_catalog_sync(
+    catalog_id: str,
+    current_user: dict = Depends(require_admin)
+) -> SuccessResponse:
+    """
+    Queue a background sync for a catalog and return immediately.
+
+    Requires admin role.
+    """
+    try:
+        await CatalogService.get_catalog(catalog_id)
+        scheduled = catalog_sync_scheduler.trigger_sync(catalog_id)
+
+        logger.info(f"Admin {current_user['sub']} scheduled sync for catalog {catalog_id}")
+
+        return SuccessResponse(
+            message=(
+                f"Sync scheduled for catalog '{catalog_id}'" if scheduled
+                else f"Sync already in progress for catalog '{catalog_id}'"
+            ),
+            data={"scheduled": scheduled}
+        )
+
+    except CatalogNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Catalog '{catalog_id}' not found"
+        )
+    except Exception as e:
+        logger.error(f"Error scheduling catalog sync: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to schedule catalog sync"
+        )
+
+
+@router.get("/sync/status", response_model=Dict[str, Any])
+async def get_sync_scheduler_status(
+    current_user: dict = Depends(require_admin)
+) -> Dict[str, Any]:
+    """
+    Get catalog sync scheduler state, including per-catalog durations and throughput.
+
+    Requires admin role.
+    """
+    return catalog_sync_scheduler.get_status()
+
+
 @router.post("/{catalog_id}/permissions", response_model=CatalogResponse)
 async def update_catalog_permissions(
     catalog_id: str,
@@ -410,16 +462,13 @@ async def preview_data(
         # Try to infer schema from preview data
         inferred_schema = []
         if data:
-            from ....services.catalog_connectors import ConnectorFactory
             connector = ConnectorFactory.create_connector(
                 request.source_type.value,
                 request.source_config
             )
-            # Mock the fetch_data method to return our preview
-            original_fetch = connector.fetch_data
-            connector.fetch_data = lambda: data
             try:
-                schema_objects = await connector.infer_schema()
+                # Infer from the rows already fetched instead of re-reading the source
+                schema_objects = await connector.infer_schema(data)
                 inferred_schema = [
                     {
                         "name": col.name,
@@ -429,10 +478,8 @@ async def preview_data(
                     }
                     for col in schema_objects
                 ]
-            except:
+            except Exception:
                 pass  # Schema inference is optional
-            finally:
-                connector.fetch_data = original_fetch
 
         return PreviewDataResponse(
             success=True,
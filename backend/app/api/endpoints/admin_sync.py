@@ -4,7 +4,7 @@ Only accessible by users with ADMIN (root) role.
 """
 
 from typing import Dict, Any
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
 from datetime import datetime
 
 from ...auth.provider import get_current_user
@@ -57,6 +57,7 @@ async def get_sync_status(
 
 @router.post("/sync/users")
 async def sync_all_users_to_keycloak(
+    incremental: bool = Query(False, description="Only sync users changed since the last successful sync"),
     current_user: dict = Depends(require_admin_root)
 ) -> Dict[str, Any]:
     """
@@ -64,9 +65,10 @@ async def sync_all_users_to_keycloak(
     This is a potentially long-running operation.
     """
     try:
-        logger.info(f"Starting full user sync to Keycloak, requested by {current_user.get('email')}")
+        mode = "incremental" if incremental else "full"
+        logger.info(f"Starting {mode} user sync to Keycloak, requested by {current_user.get('email')}")
 
-        sync_results = await keycloak_sync_service.sync_all_users()
+        sync_results = await keycloak_sync_service.sync_all_users(incremental=incremental)
 
         logger.info(f"User sync completed: {sync_results}")
 
@@ -89,6 +91,7 @@ async def sync_all_users_to_keycloak(
 
 @router.post("/sync/teams")
 async def sync_all_teams_to_keycloak(
+    incremental: bool = Query(False, description="Only sync teams changed since the last successful sync"),
     current_user: dict = Depends(require_admin_root)
 ) -> Dict[str, Any]:
     """
@@ -96,9 +99,10 @@ async def sync_all_teams_to_keycloak(
     This operation creates/updates groups in Keycloak.
     """
     try:
-        logger.info(f"Starting full team sync to Keycloak, requested by {current_user.get('email')}")
+        mode = "incremental" if incremental else "full"
+        logger.info(f"Starting {mode} team sync to Keycloak, requested by {current_user.get('email')}")
 
-        sync_results = await keycloak_sync_service.sync_all_teams()
+        sync_results = await keycloak_sync_service.sync_all_teams(incremental=incremental)
 
         logger.info(f"Team sync completed: {sync_results}")
 
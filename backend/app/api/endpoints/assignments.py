@@ -7,12 +7,12 @@ administrative workflows that require manual intervention.
 
 from fastapi import APIRouter, HTTPException, Depends, Query, Body
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime
 from beanie.operators import In
 import logging
 
 from ...models.workflow import (
-    WorkflowInstance, WorkflowDefinition, AssignmentStatus,
+    WorkflowInstance, AssignmentStatus,
     AssignmentType, WorkflowType
 )
 from ...models.user import UserModel, UserRole
@@ -24,6 +24,10 @@ from ...schemas.assignment import (
     UserAssignmentInfo, WorkflowStartRequest, WorkflowStartResponse
 )
 from ...core.logging_config import get_workflow_logger
+from ...services.assignment_stats import assignment_stats
+from ...services.instance_pagination import paginate_instances
+from ...services.instance_summaries import workflow_list_info, progress_percentage
+from ...services.instance_search import search_filter
 from ...workflows.executor import DAGExecutor
 
 logger = get_workflow_logger(__name__)
@@ -56,6 +60,7 @@ async def list_assignments(
     search: Optional[str] = Query(None, description="Search in workflow name, citizen email, citizen name, instance ID, or context data"),
     skip: int = Query(0, ge=0, description="Number of items to skip"),
     limit: int = Query(20, ge=1, le=100, description="Number of items to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (overrides skip)"),
     admin: dict = Depends(get_current_admin)
 ):
     """
@@ -127,58 +132,23 @@ async def list_assignments(
     if not workflow_type:
         query["workflow_type"] = WorkflowType.ADMIN
 
-    # Add search functionality
+    # Add search functionality: indexed prefix lookup over the instance's
+    # maintained search terms (ids, workflow name and context values)
     if search:
-        # Base search conditions for instance and workflow IDs
-        search_conditions = [
-            {"instance_id": {"$regex": search, "$options": "i"}},
-            {"workflow_id": {"$regex": search, "$options": "i"}}
-        ]
-
-        # Get all unique context keys from existing instances to build dynamic search
-        pipeline = [
-            {"$match": {"context": {"$exists": True, "$ne": {}}}},
-            {"$project": {"context_keys": {"$objectToArray": "$context"}}},
-            {"$unwind": "$context_keys"},
-            {"$group": {"_id": "$context_keys.k"}},
-            {"$project": {"key": "$_id", "_id": 0}}
-        ]
-
-        try:
-            context_keys_result = await WorkflowInstance.aggregate(pipeline).to_list()
-            context_keys = [item["key"] for item in context_keys_result if isinstance(item.get("key"), str)]
-
-            # Build dynamic search conditions for all context keys
-            for key in context_keys:
-                search_conditions.append({
-                    f"context.{key}": {"$regex": search, "$options": "i"}
-                })
-
-        except Exception as e:
-            # Fallback: if aggregation fails, just search in the context object as text
-            logger.warning(f"Failed to get dynamic context keys, using fallback: {e}")
-            search_conditions.append({
-                "$where": f"JSON.stringify(this.context).toLowerCase().includes('{search.lower()}')"
-            })
-
-        # If there are existing conditions, combine with AND
-        if query:
-            # Convert existing query conditions to a list for $and
-            existing_conditions = []
-            for key, value in query.items():
-                existing_conditions.append({key: value})
-
-            query = {"$and": existing_conditions + [{"$or": search_conditions}]}
-        else:
-            query = {"$or": search_conditions}
+        search_conditions = search_filter(search)
+        if search_conditions:
+            query = {"$and": [query, search_conditions]} if query else search_conditions
 
     try:
         # Debug: Print the query being executed
         logger.info("Assignments endpoint query", query=query)
         print(f"[ASSIGNMENTS DEBUG] Query: {query}")
 
-        # Get total count
-        total = await WorkflowInstance.find(query).count()
+        # Get paginated results ordered by most recent first, plus the (cached) total
+        try:
+            instances, next_cursor, total = await paginate_instances(query, limit, cursor=cursor, skip=skip)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         print(f"[ASSIGNMENTS DEBUG] Total count: {total}")
 
         # Debug: Check if specific child workflow exists
@@ -189,40 +159,26 @@ async def list_assignments(
         else:
             print(f"[ASSIGNMENTS DEBUG] Child workflow {child_id} not found in database")
 
-        # Get paginated results ordered by most recent first
-        instances = await WorkflowInstance.find(query).sort([("created_at", -1)]).skip(skip).limit(limit).to_list()
         print(f"[ASSIGNMENTS DEBUG] Retrieved {len(instances)} instances")
 
+        # Workflow names and step totals for the whole page at once
+        workflows = await workflow_list_info(inst.workflow_id for inst in instances)
+
         # Build response
         assignments = []
         for inst in instances:
-            # Get workflow definition for name and total steps
-            workflow_def = await WorkflowDefinition.find_one(
-                WorkflowDefinition.workflow_id == inst.workflow_id
+            workflow = workflows.get(inst.workflow_id)
+            completion_percentage = progress_percentage(
+                inst.completed_step_count,
+                workflow["total_steps"] if workflow else 0
             )
 
-            # Calculate completion percentage based on workflow steps
-            total_steps = 0
-            if workflow_def:
-                # Get total steps from workflow definition
-                from ...models.workflow import WorkflowStep
-                total_steps = await WorkflowStep.find(
-                    WorkflowStep.workflow_id == inst.workflow_id
-                ).count()
-
-            # Calculate progress percentage
-            completion_percentage = 0
-            if total_steps > 0 and inst.completed_steps:
-                completion_percentage = (len(inst.completed_steps) / total_steps) * 100
-                # Cap at 100%
-                completion_percentage = min(completion_percentage, 100)
-
             assignments.append(AssignmentResponse(
                 instance_id=inst.instance_id,
                 workflow_id=inst.workflow_id,
                 workflow_type=inst.workflow_type,
-                workflow_name=workflow_def.name if workflow_def else inst.workflow_id,
-                status=inst.assignment_status,  # Keep assignment status for compatibility
+                workflow_name=workflow["name"] if workflow else inst.workflow_id,
+                status=inst.assignment_status or AssignmentStatus.PENDING_REVIEW,  # Keep assignment status for compatibility
                 workflow_status=inst.status,  # Add workflow status as new field
                 assigned_to_user=inst.assigned_user_id,
                 assigned_to_team=inst.assigned_team_id,
@@ -232,8 +188,8 @@ async def list_assignments(
                 parent_workflow_id=inst.parent_workflow_id,
                 priority=inst.priority,
                 created_at=inst.created_at,
-                updated_at=inst.updated_at,
-                citizen_email=inst.context.get("parent_customer_email"),
+                updated_at=inst.updated_at or inst.created_at,
+                citizen_email=inst.citizen_email,
                 current_step=inst.current_step,
                 completion_percentage=completion_percentage
             ))
@@ -242,9 +198,12 @@ async def list_assignments(
             assignments=assignments,
             total=total,
             page=(skip // limit) + 1,
-            page_size=limit
+            page_size=limit,
+            next_cursor=next_cursor
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Failed to list assignments", error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to list assignments: {str(e)}")
@@ -519,12 +478,14 @@ async def start_assigned_workflow(
 async def get_assignment_stats(
     team_id: Optional[str] = Query(None, description="Filter stats by team"),
     workflow_type: Optional[WorkflowType] = Query(None, description="Filter by workflow type"),
+    fresh: bool = Query(False, description="Bypass the short-lived statistics cache"),
     admin: dict = Depends(get_current_admin)
 ):
     """
     Get statistics about workflow assignments.
 
-    Useful for dashboards and workload monitoring.
+    Useful for dashboards and workload monitoring. All breakdowns come from
+    one aggregation, cached briefly per filter unless `fresh` is set.
     """
     user_role = admin.get("roles", [])
     user_id = admin.get("sub")
@@ -553,88 +514,22 @@ async def get_assignment_stats(
             query["assigned_user_id"] = user_id
 
     try:
-        # Get counts by status
-        status_pipeline = [
-            {"$match": query},
-            {"$group": {
-                "_id": "$assignment_status",
-                "count": {"$sum": 1}
-            }}
-        ]
-        status_stats = await WorkflowInstance.aggregate(status_pipeline).to_list()
-        by_status = {str(stat["_id"]): stat["count"] for stat in status_stats if stat["_id"]}
-
-        # Get counts by user
-        user_pipeline = [
-            {"$match": {**query, "assigned_user_id": {"$ne": None}}},
-            {"$group": {
-                "_id": "$assigned_user_id",
-                "count": {"$sum": 1}
-            }}
-        ]
-        user_stats = await WorkflowInstance.aggregate(user_pipeline).to_list()
-        by_user = {stat["_id"]: stat["count"] for stat in user_stats if stat["_id"]}
-
-        # Get counts by team
-        team_pipeline = [
-            {"$match": {**query, "assigned_team_id": {"$ne": None}}},
-            {"$group": {
-                "_id": "$assigned_team_id",
-                "count": {"$sum": 1}
-            }}
-        ]
-        team_stats = await WorkflowInstance.aggregate(team_pipeline).to_list()
-        by_team = {stat["_id"]: stat["count"] for stat in team_stats if stat["_id"]}
-
-        # Get counts by workflow type
-        type_pipeline = [
-            {"$match": query},
-            {"$group": {
-                "_id": "$workflow_type",
-                "count": {"$sum": 1}
-            }}
-        ]
-        type_stats = await WorkflowInstance.aggregate(type_pipeline).to_list()
-        by_workflow_type = {
-            str(stat["_id"]): stat["count"]
-            for stat in type_stats
-            if stat["_id"]
-        }
-
-        # Calculate time-based stats
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-
-        # Completed today
-        completed_today = await WorkflowInstance.find({
-            **query,
-            "assignment_status": AssignmentStatus.COMPLETED,
-            "completed_at": {"$gte": today_start}
-        }).count()
-
-        # Overdue (pending for more than 48 hours)
-        overdue_time = datetime.utcnow() - timedelta(hours=48)
-        overdue = await WorkflowInstance.find({
-            **query,
-            "assignment_status": {"$in": [
-                AssignmentStatus.PENDING_REVIEW,
-                AssignmentStatus.UNDER_REVIEW
-            ]},
-            "created_at": {"$lt": overdue_time}
-        }).count()
+        stats = await assignment_stats.get(query, use_cache=not fresh)
+        by_status = stats["by_status"]
 
         # Total
         total = sum(by_status.values())
 
         return AssignmentStatsResponse(
             by_status=by_status,
-            by_user=by_user,
-            by_team=by_team,
-            by_workflow_type=by_workflow_type,
+            by_user=stats["by_user"],
+            by_team=stats["by_team"],
+            by_workflow_type=stats["by_workflow_type"],
             total=total,
             pending=by_status.get(AssignmentStatus.PENDING_REVIEW.value, 0),
             in_progress=by_status.get(AssignmentStatus.UNDER_REVIEW.value, 0),
-            completed_today=completed_today,
-            overdue=overdue
+            completed_today=stats["completed_today"],
+            overdue=stats["overdue"]
         )
 
     except Exception as e:
@@ -5,7 +5,6 @@ Keycloak Authentication API endpoints.
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-import httpx
 import os
 
 from ...auth.provider import keycloak, get_current_user
@@ -74,19 +73,18 @@ async def exchange_code_for_token(request: TokenExchangeRequest):
     if request.code_verifier:
         data["code_verifier"] = request.code_verifier
 
-    async with httpx.AsyncClient(verify=False) as client:
-        response = await client.post(
-            keycloak.token_endpoint,
-            data=data
-        )
+    response = await keycloak.http.post(
+        keycloak.token_endpoint,
+        data=data
+    )
 
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail="Failed to exchange code for token"
-            )
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=response.status_code,
+            detail="Failed to exchange code for token"
+        )
 
-        return response.json()
+    return response.json()
 
 
 @router.post("/refresh", response_model=TokenResponse)
@@ -103,19 +101,18 @@ async def refresh_token(request: TokenRefreshRequest):
     if keycloak.client_secret:
         data["client_secret"] = keycloak.client_secret
 
-    async with httpx.AsyncClient(verify=False) as client:
-        response = await client.post(
-            keycloak.token_endpoint,
-            data=data
-        )
+    response = await keycloak.http.post(
+        keycloak.token_endpoint,
+        data=data
+    )
 
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail="Failed to refresh token"
-            )
+    if response.status_code != 200:
+        raise HTTPException(
+            status_code=response.status_code,
+            detail="Failed to refresh token"
+        )
 
-        return response.json()
+    return response.json()
 
 
 @router.post("/logout")
@@ -131,13 +128,12 @@ async def logout(refresh_token: str, current_user: dict = Depends(get_current_us
     if keycloak.client_secret:
         data["client_secret"] = keycloak.client_secret
 
-    async with httpx.AsyncClient(verify=False) as client:
-        response = await client.post(
-            f"{keycloak.realm_url}/protocol/openid-connect/logout",
-            data=data
-        )
+    response = await keycloak.http.post(
+        f"{keycloak.realm_url}/protocol/openid-connect/logout",
+        data=data
+    )
 
-        return {"message": "Logged out successfully"}
+    return {"message": "Logged out successfully"}
 
 
 @router.get("/me")
@@ -5,8 +5,13 @@ These endpoints allow workflow users to access catalog data with proper
 permission filtering based on their Keycloak groups.
 """
 
-from typing import List, Optional, Dict, Any
+import csv
+import io
+import json
+from contextlib import aclosing
+from typing import List, Optional, Dict, Any, AsyncIterator
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 
 from ...auth.provider import get_current_user
 from ...models.catalog import CatalogStatus
@@ -15,6 +20,7 @@ from ...services.catalog_service import (
     CatalogNotFoundError,
     CatalogPermissionError
 )
+from ...services.catalog_permission_service import CatalogPermissionService
 from ...schemas.catalog_schemas import (
     CatalogDataResponse,
     CatalogSearchRequest,
@@ -134,7 +140,7 @@ async def get_catalog_schema(
         catalog = await CatalogService.get_catalog(catalog_id)
 
         # Check access
-        if not catalog.is_accessible_by_user(user_groups):
+        if not CatalogPermissionService.get_permission_plan(catalog, user_groups).can_view:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied to this catalog"
@@ -215,7 +221,8 @@ async def get_catalog_data(
 
         # Get visible columns for response
         catalog = await CatalogService.get_catalog(catalog_id)
-        visible_columns = catalog.get_visible_columns_for_user(user_groups)
+        plan = CatalogPermissionService.get_permission_plan(catalog, user_groups)
+        visible_columns = list(plan.visible_columns)
 
         # Log access for audit
         logger.info(
@@ -278,7 +285,8 @@ async def search_catalog_data(
 
         # Get visible columns for response
         catalog = await CatalogService.get_catalog(catalog_id)
-        visible_columns = catalog.get_visible_columns_for_user(user_groups)
+        plan = CatalogPermissionService.get_permission_plan(catalog, user_groups)
+        visible_columns = list(plan.visible_columns)
 
         # Log search for audit
         logger.info(
@@ -314,6 +322,93 @@ async def search_catalog_data(
         )
 
 
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+# The encoders close the row stream when the response is closed (client
+# disconnect), so the Mongo cursor is released right away instead of at GC.
+
+async def _encode_ndjson(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    async with aclosing(batches):
+        async for batch in batches:
+            yield "".join(
+                json.dumps(row, default=str, ensure_ascii=False) + "\n" for row in batch
+            ).encode("utf-8")
+
+
+async def _encode_csv(
+    batches: AsyncIterator[List[Dict[str, Any]]],
+    columns: List[str]
+) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    yield buffer.getvalue().encode("utf-8")
+
+    async with aclosing(batches):
+        async for batch in batches:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(batch)
+            yield buffer.getvalue().encode("utf-8")
+
+
+@router.get("/{catalog_id}/export")
+async def export_catalog_data(
+    catalog_id: str,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="Export format: ndjson or csv"),
+    current_user: dict = Depends(get_current_user)
+) -> StreamingResponse:
+    """
+    Stream the full catalog as NDJSON or CSV.
+
+    Rows are read from MongoDB in batches and the user's permission plan is
+    applied per batch, so memory stays flat regardless of catalog size.
+    """
+    try:
+        user_groups = _extract_user_groups(current_user)
+        plan = await CatalogService.get_export_plan(catalog_id, user_groups)
+
+    except CatalogNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Catalog '{catalog_id}' not found"
+        )
+    except CatalogPermissionError:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this catalog"
+        )
+    except Exception as e:
+        logger.error(f"Error exporting catalog data: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to export catalog data"
+        )
+
+    logger.info(
+        f"User {current_user.get('sub', 'unknown')} exporting catalog {catalog_id} "
+        f"as {export_format}: {len(plan.visible_columns)} columns"
+    )
+
+    batches = CatalogService.stream_catalog_rows(catalog_id, plan)
+    if export_format == "csv":
+        body = _encode_csv(batches, list(plan.visible_columns))
+    else:
+        body = _encode_ndjson(batches)
+
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{catalog_id}.{export_format}"',
+        },
+    )
+
+
 @router.get("/{catalog_id}/info", response_model=Dict[str, Any])
 async def get_catalog_info(
     catalog_id: str,
@@ -331,15 +426,16 @@ async def get_catalog_info(
         catalog = await CatalogService.get_catalog(catalog_id)
 
         # Check access
-        if not catalog.is_accessible_by_user(user_groups):
+        plan = CatalogPermissionService.get_permission_plan(catalog, user_groups)
+        if not plan.can_view:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied to this catalog"
             )
 
         # Get user's effective permissions
-        effective_permissions = catalog.get_visible_columns_for_user(user_groups)
-        max_rows = catalog.get_max_rows_for_user(user_groups)
+        effective_permissions = list(plan.visible_columns)
+        max_rows = plan.max_rows
 
         return {
             "catalog_id": catalog.catalog_id,
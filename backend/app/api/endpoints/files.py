@@ -4,13 +4,13 @@ File Download Endpoints
 Handles downloading files from S3/MinIO storage using s3_key paths.
 """
 
-import io
 import os
 import mimetypes
 import asyncio
+from typing import Optional
 from botocore.exceptions import ClientError
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import Response, StreamingResponse
 from ...services import s3_storage
 from ...core.logging_config import get_workflow_logger
 
@@ -19,7 +19,11 @@ router = APIRouter()
 
 
 @router.get("/download/{s3_key:path}")
-async def download_file(s3_key: str):
+async def download_file(
+    s3_key: str,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Download a file from S3/MinIO using its s3_key path.
 
@@ -29,18 +33,36 @@ async def download_file(s3_key: str):
     devuelve 404 explícito; cualquier otro error es 500 — antes este endpoint
     enmascaraba toda excepción como 404 y ocultaba bugs como un endpoint
     hardcoded a http://minio:9000 o credenciales mal configuradas.
+
+    El Body se sirve en chunks de `DOWNLOAD_CHUNK_SIZE` sin cargar el objeto
+    en memoria. Un `Range` de un solo rango se traduce a un GetObject ranged
+    (206, descargas reanudables) y `If-None-Match` se pasa a S3 para responder
+    304 cuando el ETag no cambió.
     """
     bucket = s3_storage.default_bucket()
     client = s3_storage.get_s3_client()
 
-    logger.info(f"Downloading s3://{bucket}/{s3_key}")
+    params = {"Bucket": bucket, "Key": s3_key}
+    byte_range = s3_storage.single_byte_range(range_header)
+    if byte_range:
+        params["Range"] = byte_range
+    if if_none_match:
+        params["IfNoneMatch"] = if_none_match
+
+    logger.info(f"Downloading s3://{bucket}/{s3_key}" + (f" ({byte_range})" if byte_range else ""))
 
     try:
-        response = await asyncio.to_thread(
-            client.get_object, Bucket=bucket, Key=s3_key
-        )
+        response = await asyncio.to_thread(client.get_object, **params)
     except ClientError as e:
         code = e.response.get("Error", {}).get("Code", "")
+        if code in ("304", "NotModified"):
+            etag = e.response.get("ResponseMetadata", {}).get("HTTPHeaders", {}).get("etag") or if_none_match
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        if code in ("InvalidRange", "416"):
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail=f"Range not satisfiable: {byte_range}",
+            )
         if code in ("NoSuchKey", "NoSuchBucket", "404"):
             logger.warning(f"S3 object missing for {bucket}/{s3_key}: {code}")
             raise HTTPException(
@@ -53,19 +75,26 @@ async def download_file(s3_key: str):
             detail=f"S3 error: {code or 'unknown'}",
         )
 
-    file_bytes = await asyncio.to_thread(response["Body"].read)
-
     filename = os.path.basename(s3_key) or "downloaded_file"
     content_type, _ = mimetypes.guess_type(filename)
     content_type = content_type or response.get("ContentType") or "application/octet-stream"
 
-    logger.info(f"Serving {filename} ({len(file_bytes)} bytes, {content_type})")
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Accept-Ranges": "bytes",
+    }
+    if response.get("ContentLength") is not None:
+        headers["Content-Length"] = str(response["ContentLength"])
+    if response.get("ETag"):
+        headers["ETag"] = response["ETag"]
+    if response.get("ContentRange"):
+        headers["Content-Range"] = response["ContentRange"]
+
+    logger.info(f"Serving {filename} ({headers.get('Content-Length', '?')} bytes, {content_type})")
 
     return StreamingResponse(
-        io.BytesIO(file_bytes),
+        s3_storage.iter_body(response["Body"]),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if response.get("ContentRange") else status.HTTP_200_OK,
         media_type=content_type,
-        headers={
-            "Content-Disposition": f'attachment; filename="{filename}"',
-            "Content-Length": str(len(file_bytes)),
-        },
-    )
\ No newline at end of file
+        headers=headers,
+    )
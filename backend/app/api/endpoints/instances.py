@@ -1,5 +1,6 @@
 from typing import List, Optional, Dict, Any
 from fastapi import APIRouter, HTTPException, Query, BackgroundTasks, Depends, Request
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 import uuid
 import logging
@@ -9,6 +10,7 @@ from ...schemas.workflow import (
     WorkflowExecuteRequest,
     InstanceResponse,
     InstanceListResponse,
+    InstanceSummaryResponse,
     InstanceStatus,
     InstanceUpdateRequest,
     ApprovalRequest,
@@ -19,6 +21,7 @@ from ...schemas.workflow import (
 )
 from ...models.workflow import (
     WorkflowInstance,
+    InstanceSummary,
     StepExecution,
     WorkflowDefinition,
     WorkflowStep,
@@ -31,7 +34,11 @@ from ...core.database import get_database
 from ...workflows.dag import DAGInstance, InstanceStatus
 from ...services.workflow_service import workflow_service
 from ...auth.provider import require_permission, get_current_user
-from ...services.assignment_service import assignment_service
+from ...services.assignment_service import assignment_service, is_unassigned, UNASSIGNED_QUERY
+from ...services.instance_pagination import paginate_instances
+from ...services.instance_summaries import workflow_list_info, progress_percentage
+from ...services.workflow_metadata import workflow_metadata
+from ...services.instance_updates import stream_instance_updates
 from ...models.team import TeamModel
 
 router = APIRouter()
@@ -90,6 +97,14 @@ async def require_instance_access(instance_id: str, current_user: dict = Depends
     return instance
 
 
+async def _paginate_or_400(query: Dict[str, Any], page: int, page_size: int, cursor: Optional[str]):
+    """Keyset page of instances; page numbers still work for the first request"""
+    try:
+        return await paginate_instances(query, page_size, cursor=cursor, skip=(page - 1) * page_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/", response_model=InstanceResponse)
 async def create_workflow_instance(
     request: WorkflowExecuteRequest,
@@ -179,6 +194,7 @@ async def get_my_assigned_instances(
     current_user: dict = Depends(get_current_user),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (overrides page)"),
     assignment_status: Optional[str] = Query(None, description="Filter by assignment status"),
     workflow_id: Optional[str] = Query(None, description="Filter by workflow ID"),
     team_id: Optional[str] = Query(None, description="Filter by specific team (admin only)")
@@ -221,24 +237,23 @@ async def get_my_assigned_instances(
         query["workflow_id"] = workflow_id
     
     # Execute query with pagination
-    skip = (page - 1) * page_size
-    
-    instances = await WorkflowInstance.find(query).skip(skip).limit(page_size).to_list()
-    total = await WorkflowInstance.find(query).count()
+    instances, next_cursor, total = await _paginate_or_400(query, page, page_size, cursor)
     
     # Convert to response format
-    instance_responses = [convert_instance_to_response(instance) for instance in instances]
+    instance_responses = [convert_summary_to_response(instance) for instance in instances]
     
     return InstanceListResponse(
         instances=instance_responses,
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/assignment-statistics")
 async def get_assignment_statistics_early(
+    fresh: bool = Query(False, description="Bypass the short-lived statistics cache"),
     current_user: dict = Depends(get_current_user)
 ):
     """Get statistics about automatic vs manual assignments"""
@@ -250,7 +265,7 @@ async def get_assignment_statistics_early(
             detail="Only administrators and managers can view assignment statistics"
         )
     
-    stats = await assignment_service.get_assignment_statistics()
+    stats = await assignment_service.get_assignment_statistics(use_cache=not fresh)
     return stats
 
 
@@ -259,6 +274,7 @@ async def get_unassigned_instances_early(
     workflow_id: Optional[str] = Query(None, description="Filter by workflow ID"),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (overrides page)"),
     current_user: dict = Depends(get_current_user)
 ):
     """Get list of unassigned instances that can be auto-assigned"""
@@ -271,38 +287,30 @@ async def get_unassigned_instances_early(
         )
     
     # Build query
-    query = {
-        "$or": [
-            {"assignment_status": AssignmentStatus.UNASSIGNED},
-            {"assignment_status": None}
-        ]
-    }
+    query = dict(UNASSIGNED_QUERY)
     
     if workflow_id:
         query["workflow_id"] = workflow_id
     
-    # Get total count
-    total = await WorkflowInstance.find(query).count()
-    
-    # Get paginated results
-    skip = (page - 1) * page_size
-    instances = await WorkflowInstance.find(query).sort(-WorkflowInstance.created_at).skip(skip).limit(page_size).to_list()
+    # Get paginated results and (cached) total count
+    instances, next_cursor, total = await _paginate_or_400(query, page, page_size, cursor)
     
     # Convert to response format
-    instance_responses = [convert_instance_to_response(instance) for instance in instances]
+    instance_responses = [convert_summary_to_response(instance) for instance in instances]
     
     return InstanceListResponse(
         instances=instance_responses,
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
 @router.post("/bulk-auto-assign")
 async def bulk_auto_assign_instances_early(
     workflow_id: Optional[str] = None,
-    limit: int = Query(10, ge=1, le=100, description="Maximum number of instances to assign"),
+    limit: int = Query(10, ge=1, le=5000, description="Maximum number of instances to assign"),
     current_user: dict = Depends(get_current_user)
 ):
     """Automatically assign multiple unassigned instances"""
@@ -315,71 +323,49 @@ async def bulk_auto_assign_instances_early(
         )
     
     # Build query for unassigned instances
-    query = {
-        "$or": [
-            {"assignment_status": AssignmentStatus.UNASSIGNED},
-            {"assignment_status": None}
-        ]
-    }
+    query = dict(UNASSIGNED_QUERY)
     
     if workflow_id:
         query["workflow_id"] = workflow_id
     
-    # Get unassigned instances
-    unassigned_instances = await WorkflowInstance.find(query).limit(limit).to_list()
+    # Get unassigned instances (summaries carry all the engine needs) and their definitions
+    unassigned_instances = await WorkflowInstance.find(query).limit(limit).project(InstanceSummary).to_list()
+    workflow_ids = list({instance.workflow_id for instance in unassigned_instances})
+    workflow_defs = {
+        d.workflow_id: d
+        for d in await WorkflowDefinition.find({"workflow_id": {"$in": workflow_ids}}).to_list()
+    }
+    
+    # Solve and persist the whole batch at once
+    outcomes = await assignment_service.bulk_auto_assign(
+        unassigned_instances, workflow_defs, actor=str(current_user.get("sub"))
+    )
     
     results = {
-        "total_processed": 0,
+        "total_processed": len(outcomes),
         "successful_assignments": 0,
         "failed_assignments": 0,
         "assignments": []
     }
-    
-    for instance in unassigned_instances:
-        results["total_processed"] += 1
-        
-        try:
-            # Get workflow definition
-            workflow_def = await WorkflowDefinition.find_one(
-                WorkflowDefinition.workflow_id == instance.workflow_id
-            )
-            
-            # Attempt auto-assignment
-            success = await assignment_service.auto_assign_instance(instance, workflow_def)
-            
-            if success:
-                results["successful_assignments"] += 1
-                
-                # Get updated assignment info
-                updated_instance = await WorkflowInstance.find_one(
-                    WorkflowInstance.instance_id == instance.instance_id
-                )
-                
-                results["assignments"].append({
-                    "instance_id": instance.instance_id,
-                    "workflow_id": instance.workflow_id,
-                    "success": True,
-                    "assigned_to": {
-                        "team_id": updated_instance.assigned_team_id,
-                        "user_id": updated_instance.assigned_user_id
-                    }
-                })
-            else:
-                results["failed_assignments"] += 1
-                results["assignments"].append({
-                    "instance_id": instance.instance_id,
-                    "workflow_id": instance.workflow_id,
-                    "success": False,
-                    "error": "No suitable assignment found"
-                })
-                
-        except Exception as e:
+    for outcome in outcomes:
+        if outcome.success:
+            results["successful_assignments"] += 1
+            results["assignments"].append({
+                "instance_id": outcome.instance_id,
+                "workflow_id": outcome.workflow_id,
+                "success": True,
+                "assigned_to": {
+                    "team_id": outcome.team_id,
+                    "user_id": outcome.user_id
+                }
+            })
+        else:
             results["failed_assignments"] += 1
             results["assignments"].append({
-                "instance_id": instance.instance_id,
-                "workflow_id": instance.workflow_id,
+                "instance_id": outcome.instance_id,
+                "workflow_id": outcome.workflow_id,
                 "success": False,
-                "error": str(e)
+                "error": outcome.error
             })
     
     return results
@@ -387,13 +373,7 @@ async def bulk_auto_assign_instances_early(
 
 def convert_instance_to_response(instance: WorkflowInstance) -> InstanceResponse:
     """Convert internal WorkflowInstance to API response"""
-    # Handle invalid status gracefully
-    try:
-        status = InstanceStatus(instance.status)
-    except ValueError:
-        # If status is invalid, default to FAILED 
-        print(f"Warning: Invalid status '{instance.status}' for instance {instance.instance_id}, defaulting to FAILED")
-        status = InstanceStatus.FAILED
+    status = _response_status(instance.status, instance.instance_id)
     
     return InstanceResponse(
         instance_id=instance.instance_id,
@@ -417,6 +397,41 @@ def convert_instance_to_response(instance: WorkflowInstance) -> InstanceResponse
     )
 
 
+def _response_status(status: str, instance_id: str) -> InstanceStatus:
+    # Handle invalid status gracefully
+    try:
+        return InstanceStatus(status)
+    except ValueError:
+        # If status is invalid, default to FAILED 
+        print(f"Warning: Invalid status '{status}' for instance {instance_id}, defaulting to FAILED")
+        return InstanceStatus.FAILED
+
+
+def convert_summary_to_response(summary: InstanceSummary) -> InstanceSummaryResponse:
+    """Convert a projected instance summary to a list row"""
+    return InstanceSummaryResponse(
+        instance_id=summary.instance_id,
+        workflow_id=summary.workflow_id,
+        workflow_type=summary.workflow_type.value if summary.workflow_type else None,
+        user_id=summary.user_id,
+        status=_response_status(summary.status, summary.instance_id),
+        current_step=summary.current_step,
+        completed_steps_count=summary.completed_step_count,
+        priority=summary.priority,
+        created_at=summary.created_at,
+        updated_at=summary.updated_at or summary.created_at,
+        completed_at=summary.completed_at,
+        # Assignment information
+        assigned_user_id=summary.assigned_user_id,
+        assigned_team_id=summary.assigned_team_id,
+        assignment_status=summary.assignment_status.value if summary.assignment_status else None,
+        assignment_type=summary.assignment_type.value if summary.assignment_type else None,
+        assigned_at=summary.assigned_at,
+        assigned_by=summary.assigned_by,
+        assignment_notes=summary.assignment_notes
+    )
+
+
 # Removed execute_workflow_instance - using DAG executor directly now
 
 @router.post("/{instance_id}/cancel")
@@ -445,7 +460,7 @@ async def auto_assign_new_instance(instance_id: str, workflow_def: WorkflowDefin
             return
         
         # Check if already assigned (manual assignment might have happened)
-        if instance.assignment_status and instance.assignment_status != AssignmentStatus.UNASSIGNED:
+        if not is_unassigned(instance):
             print(f"Instance {instance_id} already assigned, skipping auto-assignment")
             return
         
@@ -473,7 +488,8 @@ async def list_instances(
     workflow_id: Optional[str] = None,
     user_id: Optional[str] = None,
     status: Optional[InstanceStatus] = None,
-    instance_id: Optional[str] = Query(None, description="Search by instance ID (partial match)")
+    instance_id: Optional[str] = Query(None, description="Search by instance ID (partial match)"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (overrides page)")
 ):
     """List workflow instances with filtering and pagination"""
     # Build query
@@ -487,21 +503,18 @@ async def list_instances(
     if instance_id:
         query["instance_id"] = {"$regex": instance_id, "$options": "i"}
     
-    # Get total count
-    total = await WorkflowInstance.find(query).count()
-    
-    # Get paginated results
-    skip = (page - 1) * page_size
-    instances = await WorkflowInstance.find(query).sort(-WorkflowInstance.created_at).skip(skip).limit(page_size).to_list()
+    # Get paginated results and (cached) total count
+    instances, next_cursor, total = await _paginate_or_400(query, page, page_size, cursor)
     
     # Convert to response format
-    instance_responses = [convert_instance_to_response(instance) for instance in instances]
+    instance_responses = [convert_summary_to_response(instance) for instance in instances]
     
     return InstanceListResponse(
         instances=instance_responses,
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
@@ -537,27 +550,27 @@ async def get_active_instances(
     # Get all instances (not just active ones) with filters
     active_instances = await WorkflowInstance.find(
         query_filters
-    ).sort(-WorkflowInstance.updated_at).skip(offset).limit(limit).to_list()
+    ).sort(-WorkflowInstance.updated_at).skip(offset).limit(limit).project(InstanceSummary).to_list()
+    
+    # Workflow names and step totals for the whole page at once
+    workflows = await workflow_list_info(instance.workflow_id for instance in active_instances)
     
     result = []
     for instance in active_instances:
-        # Get basic progress info
-        workflow = await WorkflowDefinition.find_one(WorkflowDefinition.workflow_id == instance.workflow_id)
-        total_steps = await WorkflowStep.find(WorkflowStep.workflow_id == instance.workflow_id).count() if workflow else 0
-        
-        progress_percentage = (len(instance.completed_steps) / total_steps * 100) if total_steps > 0 else 0
+        workflow = workflows.get(instance.workflow_id)
+        total_steps = workflow["total_steps"] if workflow else 0
         
         result.append({
             "instance_id": instance.instance_id,
             "workflow_id": instance.workflow_id,
-            "workflow_name": workflow.name if workflow else "Unknown",
+            "workflow_name": workflow["name"] if workflow else "Unknown",
             "user_id": instance.user_id,
             "status": instance.status,
             "current_step": instance.current_step,
-            "progress_percentage": round(progress_percentage, 2),
-            "started_at": instance.started_at,
-            "updated_at": instance.updated_at,
-            "pending_approvals": len(instance.pending_approvals)
+            "progress_percentage": round(progress_percentage(instance.completed_step_count, total_steps), 2),
+            "started_at": instance.started_at or instance.created_at,
+            "updated_at": instance.updated_at or instance.created_at,
+            "pending_approvals": instance.pending_approval_count
         })
     
     return {
@@ -569,42 +582,26 @@ async def get_active_instances(
 @router.get("/analytics/bottlenecks", response_model=BottleneckAnalysisResponse)
 async def get_bottleneck_analysis():
     """Analyze workflow bottlenecks across all instances"""
-    # Get all step executions from last 30 days
+    # Merge the last 30 days of precomputed step rollups
     from datetime import timedelta
+    from ...services.step_metric_rollups import step_metric_rollups
     cutoff_date = datetime.utcnow() - timedelta(days=30)
-    
-    recent_executions = await StepExecution.find(
-        StepExecution.started_at >= cutoff_date
-    ).to_list()
-    
-    # Group by step_id and calculate average duration
-    step_stats = {}
-    for execution in recent_executions:
-        step_id = execution.step_id
-        if step_id not in step_stats:
-            step_stats[step_id] = {
-                "step_id": step_id,
-                "total_executions": 0,
-                "total_duration": 0,
-                "failed_executions": 0,
-                "avg_duration": 0
-            }
-        
-        step_stats[step_id]["total_executions"] += 1
-        if execution.duration_seconds:
-            step_stats[step_id]["total_duration"] += execution.duration_seconds
-        if execution.status == "failed":
-            step_stats[step_id]["failed_executions"] += 1
-    
-    # Calculate averages and sort by duration
-    bottlenecks = []
-    for stats in step_stats.values():
-        if stats["total_executions"] > 0:
-            stats["avg_duration"] = stats["total_duration"] / stats["total_executions"]
-            stats["failure_rate"] = stats["failed_executions"] / stats["total_executions"]
-            bottlenecks.append(stats)
-    
+
+    step_summaries = await step_metric_rollups.summarize_steps(since=cutoff_date)
+
     # Sort by average duration (descending)
+    bottlenecks = [
+        {
+            "step_id": summary["step_id"],
+            "total_executions": summary["total_executions"],
+            "failed_executions": summary["failed_executions"],
+            "avg_duration": summary["avg_duration_seconds"],
+            "p95_duration": summary["p95_duration_seconds"],
+            "failure_rate": summary["failure_rate"]
+        }
+        for summary in step_summaries.values()
+        if summary["total_executions"] > 0
+    ]
     bottlenecks.sort(key=lambda x: x["avg_duration"], reverse=True)
     
     # Get instances currently stuck at bottleneck steps
@@ -630,7 +627,7 @@ async def get_bottleneck_analysis():
         "bottlenecks": bottlenecks[:10],  # Top 10 bottlenecks
         "stuck_instances": stuck_instances,
         "analysis_period_days": 30,
-        "total_executions_analyzed": len(recent_executions)
+        "total_executions_analyzed": sum(b["total_executions"] for b in bottlenecks)
     }
 
 
@@ -994,13 +991,15 @@ async def get_instance_progress(instance: WorkflowInstance = Depends(require_ins
     """Get detailed progress information for a workflow instance with role-based access control"""
     instance_id = instance.instance_id
     
-    # Get workflow definition to calculate progress percentage
-    workflow = await WorkflowDefinition.find_one(WorkflowDefinition.workflow_id == instance.workflow_id)
-    if not workflow:
-        raise HTTPException(status_code=404, detail="Workflow definition not found")
-    
-    # Get all steps for this workflow
-    total_steps = await WorkflowStep.find(WorkflowStep.workflow_id == instance.workflow_id).count()
+    # Get the workflow's step count to calculate progress percentage
+    metadata = workflow_metadata.get(instance.workflow_id, instance.workflow_version)
+    if metadata:
+        total_steps = metadata.total_steps
+    else:
+        workflow = await WorkflowDefinition.find_one(WorkflowDefinition.workflow_id == instance.workflow_id)
+        if not workflow:
+            raise HTTPException(status_code=404, detail="Workflow definition not found")
+        total_steps = await WorkflowStep.find(WorkflowStep.workflow_id == instance.workflow_id).count()
     completed_steps_count = len(instance.completed_steps)
     failed_steps_count = len(instance.failed_steps)
     
@@ -1153,6 +1152,27 @@ async def track_instance_for_admin(
     }
 
 
+@router.get("/{instance_id}/stream")
+async def stream_instance_for_admin(
+    request: Request,
+    db_instance: WorkflowInstance = Depends(require_instance_access)
+):
+    """
+    Stream workflow instance updates as Server-Sent Events, with the same
+    access control as /track.
+
+    Sends a `snapshot` event with the current state, then `step_advanced`,
+    `status_changed` and `waiting_for_input` events as the executor makes
+    those transitions. The stream closes once the instance finishes; call
+    /track when an event reports `requires_input` to get the form.
+    """
+    return StreamingResponse(
+        stream_instance_updates(db_instance.instance_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/{instance_id}/start")
 async def start_workflow_instance(
     db_instance: WorkflowInstance = Depends(require_instance_access),
@@ -1273,6 +1293,9 @@ async def submit_workflow_data(
     else:
         # Handle JSON
         data = await request.json()
+        # Large base64 files go to the blob store; context keeps a reference
+        from app.services.context_blobs import offload_submitted_blobs
+        await offload_submitted_blobs(data, instance_id)
 
     # Update BOTH the DAG instance and database with input
     dag_instance.context[f"{waiting_task}_input"] = data
@@ -2038,7 +2061,7 @@ async def auto_assign_instance(
         raise HTTPException(status_code=404, detail="Instance not found")
     
     # Check if already assigned
-    if instance.assignment_status not in [AssignmentStatus.UNASSIGNED, None]:
+    if not is_unassigned(instance):
         raise HTTPException(
             status_code=400, 
             detail=f"Instance is already {instance.assignment_status}. Unassign first if needed."
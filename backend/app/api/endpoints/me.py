@@ -5,6 +5,7 @@ from typing import Dict, List, Optional
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel, Field
 
+from ...auth.customer_sessions import customer_sessions
 from ...models.customer import Customer
 from ...notifier.models import NotificationChannelToggle, NotificationPreferences
 from ...notifier.system_notifications import SYSTEM_NOTIFICATIONS
@@ -85,6 +86,7 @@ async def update_my_notification_preferences(
     )
     current_customer.updated_at = datetime.utcnow()
     await current_customer.save()
+    customer_sessions.invalidate(current_customer.keycloak_id)
     return _as_response(current_customer.notification_preferences)
 
 
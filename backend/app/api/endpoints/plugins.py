@@ -88,8 +88,12 @@ async def reload_plugins(current_user = Depends(require_admin)):
         workflows_loaded = plugin_manager.discover_and_load_workflows()
         
         # Sync to database
-        from ...main import sync_programmatic_workflows
-        await sync_programmatic_workflows()
+        from ...main import sync_plugin_dags
+        await sync_plugin_dags()
+
+        # Rebuild the public catalog snapshots from the reloaded DAGs
+        from ...services.public_workflow_catalog import public_workflow_catalog
+        await public_workflow_catalog.rebuild()
         
         return PluginLoadResponse(
             success=True,
@@ -2,10 +2,9 @@
 Public API endpoints for workflows.
 Simplified and focused on clarity.
 """
-from fastapi import APIRouter, HTTPException, Request, BackgroundTasks, Query, Depends, Header
+from fastapi import APIRouter, HTTPException, Request, BackgroundTasks, Query, Depends, Header, Response
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-import json
 import base64
 import logging
 from pydantic import BaseModel
@@ -16,6 +15,13 @@ from ...models.customer import Customer
 from .public_auth import get_current_customer_optional
 from ...models.legal_entity import LegalEntity, EntityType
 from ...services.entity_service import EntityService
+from ...services.public_workflow_catalog import (
+    CatalogEntry,
+    PublicCatalogSnapshot,
+    etag_matches,
+    public_workflow_catalog,
+)
+from ...services.entity_workflow_index import entity_workflow_index
 from ...workflows.dag import DAG
 from .public_auth import router as auth_router, get_current_customer
 from ...core.logging_config import set_workflow_context
@@ -168,6 +174,9 @@ async def submit_data(
     else:
         # Handle JSON
         data = await request.json()
+        # Large base64 files go to the blob store; context keeps a reference
+        from app.services.context_blobs import offload_submitted_blobs
+        await offload_submitted_blobs(data, instance_id)
     
     # Update BOTH the DAG instance and database with input
     dag_instance.context[f"{waiting_task}_input"] = data
@@ -206,8 +215,58 @@ async def start_workflow(request: Dict[str, Any]):
     )
 
 
+async def _build_catalog_entries(locale: str) -> List[CatalogEntry]:
+    """Public representation of every active workflow, in DAGBag order."""
+    workflows = await workflow_service.list_workflow_definitions(status="active", limit=0)
+
+    entries = []
+    for w in workflows:
+        dag = workflow_service.dag_bag.get_dag(w.workflow_id)
+        entries.append(CatalogEntry(
+            workflow_id=w.workflow_id,
+            workflow_type=dag.workflow_type.value,
+            data=await _get_workflow_data(w, dag, locale)
+        ))
+    return entries
+
+
+public_workflow_catalog.configure(
+    builder=_build_catalog_entries,
+    source_version=lambda: workflow_service.dag_bag.version
+)
+
+entity_workflow_index.configure(
+    loader=lambda: workflow_service.list_workflow_definitions(status="active", limit=0),
+    source_version=lambda: (public_workflow_catalog.generation, workflow_service.dag_bag.version)
+)
+
+
+def _catalog_response(request: Request, snapshot: PublicCatalogSnapshot, key: Any, build) -> Response:
+    """Serve a snapshot-derived body with a strong ETag, or 304 if the client has it."""
+    body, etag = snapshot.render(key, build)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _sorted_by_name(workflows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return sorted(workflows, key=lambda x: x.get('name', '').lower())
+
+
+def _workflows_of_type(snapshot: PublicCatalogSnapshot, workflow_type: str, limit: int = 100) -> List[Dict[str, Any]]:
+    return [e.data for e in snapshot.entries if e.workflow_type == workflow_type][:limit]
+
+
+def _catalog_locale(locale: str) -> str:
+    """Supported catalog locale for a free-form query value ("en-US" -> "en", unknown -> "es")"""
+    language = locale.split("-")[0].split("_")[0].lower()
+    return language if language in WORKFLOW_CATEGORIES else "es"
+
+
 @router.get("/workflows")
 async def list_public_workflows(
+    request: Request,
     workflow_type: str = Query("process", description="Filter by workflow type (process, document_processing, admin, etc.)")
 ):
     """
@@ -215,26 +274,18 @@ async def list_public_workflows(
     Defaults to showing only PROCESS type workflows (user-facing processes).
     No authentication required - citizens can browse available services.
     """
-    workflows = await workflow_service.list_workflow_definitions(
-        status="active",
-        workflow_type=workflow_type,
-        limit=100
-    )
-
-    result = []
-    for w in workflows:
-        dag = workflow_service.dag_bag.get_dag(w.workflow_id)
-        workflow_data = await _get_workflow_data(w, dag, "es")
-        result.append(workflow_data)
+    snapshot = await public_workflow_catalog.get("es")
 
     # Sort workflows alphabetically by name
-    result.sort(key=lambda x: x.get('name', '').lower())
-
-    return {"workflows": result}
+    return _catalog_response(
+        request, snapshot, ("workflows", workflow_type),
+        lambda snap: {"workflows": _sorted_by_name(_workflows_of_type(snap, workflow_type))}
+    )
 
 
 @router.get("/workflows/documents")
 async def list_document_processing_workflows(
+    request: Request,
     locale: str = Query("es", description="Language locale (es/en)")
 ):
     """
@@ -242,26 +293,19 @@ async def list_document_processing_workflows(
     These are workflows that citizens use to upload and process documents.
     No authentication required - citizens can browse available document services.
     """
-    workflows = await workflow_service.list_workflow_definitions(
-        status="active",
-        workflow_type="document_processing",
-        limit=100
-    )
-
-    result = []
-    for w in workflows:
-        dag = workflow_service.dag_bag.get_dag(w.workflow_id)
-        workflow_data = await _get_workflow_data(w, dag, locale)
-        result.append(workflow_data)
+    locale = _catalog_locale(locale)
+    snapshot = await public_workflow_catalog.get(locale)
 
     # Sort document workflows alphabetically by name
-    result.sort(key=lambda x: x.get('name', '').lower())
-
-    return {"documents": result}
+    return _catalog_response(
+        request, snapshot, ("documents",),
+        lambda snap: {"documents": _sorted_by_name(_workflows_of_type(snap, "document_processing"))}
+    )
 
 
 @router.get("/workflows/featured")
 async def get_featured_workflows(
+    request: Request,
     locale: str = Query("es", description="Language locale (es/en)")
 ):
     """
@@ -269,149 +313,106 @@ async def get_featured_workflows(
     No authentication required - public can see featured services.
     Returns workflows marked as featured or popular.
     """
-    # Get all active workflows
-    all_workflows = await workflow_service.list_workflow_definitions(status="active")
-    
-    # For now, return first 6 workflows as featured
-    # In production, you'd filter by a "featured" flag or popularity metrics
-    featured = all_workflows[:6] if all_workflows else []
-    
-    # Prepare response with real workflow data
-    result = []
-    for w in featured:
-        dag = workflow_service.dag_bag.get_dag(w.workflow_id)
-        workflow_data = await _get_workflow_data(w, dag, locale)
-        # Add compatibility field
-        workflow_data["estimatedTime"] = workflow_data["estimatedDuration"]
-        result.append(workflow_data)
-
-    # Sort featured workflows alphabetically by name
-    result.sort(key=lambda x: x.get('name', '').lower())
-    
-    return {
-        "featured": result,
-        "locale": locale
-    }
+    locale = _catalog_locale(locale)
+    snapshot = await public_workflow_catalog.get(locale)
+
+    def build(snap: PublicCatalogSnapshot) -> Dict[str, Any]:
+        # For now, return first 6 workflows as featured
+        # In production, you'd filter by a "featured" flag or popularity metrics
+        featured = [
+            # Add compatibility field
+            {**e.data, "estimatedTime": e.data["estimatedDuration"]}
+            for e in snap.entries[:6]
+        ]
+        # Sort featured workflows alphabetically by name
+        return {"featured": _sorted_by_name(featured), "locale": locale}
+
+    return _catalog_response(request, snapshot, ("featured",), build)
+
+
+# Available categories with translations
+WORKFLOW_CATEGORIES = {
+    "es": [
+        {"id": "automated", "name": "Procesos Automatizados", "icon": "smart_toy"},
+        {"id": "permits", "name": "Permisos y Licencias", "icon": "description"},
+        {"id": "property", "name": "Propiedad y Catastro", "icon": "home"},
+        {"id": "business", "name": "Negocios", "icon": "business"},
+        {"id": "construction", "name": "Construcción", "icon": "construction"},
+        {"id": "environment", "name": "Medio Ambiente", "icon": "nature"},
+        {"id": "social", "name": "Servicios Sociales", "icon": "people"},
+        {"id": "general", "name": "General", "icon": "assignment"},
+    ],
+    "en": [
+        {"id": "automated", "name": "Automated Processes", "icon": "smart_toy"},
+        {"id": "permits", "name": "Permits & Licenses", "icon": "description"},
+        {"id": "property", "name": "Property & Registry", "icon": "home"},
+        {"id": "business", "name": "Business", "icon": "business"},
+        {"id": "construction", "name": "Construction", "icon": "construction"},
+        {"id": "environment", "name": "Environment", "icon": "nature"},
+        {"id": "social", "name": "Social Services", "icon": "people"},
+        {"id": "general", "name": "General", "icon": "assignment"},
+    ]
+}
 
 
 @router.get("/workflows/categories")
 async def get_workflow_categories(
+    request: Request,
     locale: str = Query("es", description="Language locale (es/en)")
 ):
     """
     Get workflow categories for filtering.
     No authentication required - public can browse categories.
     """
-    # Define available categories with translations
-    categories = {
-        "es": [
-            {"id": "automated", "name": "Procesos Automatizados", "icon": "smart_toy", "count": 0},
-            {"id": "permits", "name": "Permisos y Licencias", "icon": "description", "count": 0},
-            {"id": "property", "name": "Propiedad y Catastro", "icon": "home", "count": 0},
-            {"id": "business", "name": "Negocios", "icon": "business", "count": 0},
-            {"id": "construction", "name": "Construcción", "icon": "construction", "count": 0},
-            {"id": "environment", "name": "Medio Ambiente", "icon": "nature", "count": 0},
-            {"id": "social", "name": "Servicios Sociales", "icon": "people", "count": 0},
-            {"id": "general", "name": "General", "icon": "assignment", "count": 0},
-        ],
-        "en": [
-            {"id": "automated", "name": "Automated Processes", "icon": "smart_toy", "count": 0},
-            {"id": "permits", "name": "Permits & Licenses", "icon": "description", "count": 0},
-            {"id": "property", "name": "Property & Registry", "icon": "home", "count": 0},
-            {"id": "business", "name": "Business", "icon": "business", "count": 0},
-            {"id": "construction", "name": "Construction", "icon": "construction", "count": 0},
-            {"id": "environment", "name": "Environment", "icon": "nature", "count": 0},
-            {"id": "social", "name": "Social Services", "icon": "people", "count": 0},
-            {"id": "general", "name": "General", "icon": "assignment", "count": 0},
-        ]
-    }
-    
-    # Count workflows per category - use DAG data for accurate counts
-    all_workflows = await workflow_service.list_workflow_definitions(status="active")
-    category_counts = {}
-    for w in all_workflows:
-        # Get category from DAG if available (more accurate than database)
-        dag = workflow_service.dag_bag.get_dag(w.workflow_id)
-        if dag and hasattr(dag, 'category'):
-            cat = dag.category
-        else:
-            cat = w.category or "general"
-        category_counts[cat] = category_counts.get(cat, 0) + 1
-    
-    # Update counts
-    selected_categories = categories.get(locale, categories["es"])
-    for cat in selected_categories:
-        cat["count"] = category_counts.get(cat["id"], 0)
-    
-    return {
-        "categories": selected_categories,
-        "total": len(all_workflows)
-    }
+    locale = _catalog_locale(locale)
+    snapshot = await public_workflow_catalog.get(locale)
+
+    def build(snap: PublicCatalogSnapshot) -> Dict[str, Any]:
+        # Count workflows per category (category comes from the DAG when available)
+        category_counts: Dict[str, int] = {}
+        for e in snap.entries:
+            category_counts[e.data["category"]] = category_counts.get(e.data["category"], 0) + 1
+
+        return {
+            "categories": [
+                {**cat, "count": category_counts.get(cat["id"], 0)}
+                for cat in WORKFLOW_CATEGORIES[locale]
+            ],
+            "total": len(snap.entries)
+        }
+
+    return _catalog_response(request, snapshot, ("categories",), build)
 
 
 @router.get("/workflows/search")
 async def search_workflows(
+    request: Request,
     q: str = Query("", description="Search query"),
     category: Optional[str] = Query(None, description="Filter by category"),
-    locale: str = Query("es", description="Language locale")
+    locale: str = Query("es", description="Language locale"),
+    skip: int = Query(0, ge=0, description="Number of results to skip"),
+    limit: int = Query(50, ge=1, le=100, description="Number of results to return")
 ):
     """
-    Search workflows by name or description.
+    Search workflows by name, description, category and tags.
+    Matching is accent-insensitive and accepts partial words; results are
+    ranked by relevance (alphabetical when there is no query).
     """
-    all_workflows = await workflow_service.list_workflow_definitions(status="active")
-    
-    # Build a list with DAG data for accurate searching
-    workflows_with_dag_data = []
-    for w in all_workflows:
-        dag = workflow_service.dag_bag.get_dag(w.workflow_id)
-        if dag:
-            # Use DAG data if available
-            name = dag.name if hasattr(dag, 'name') else w.name
-            description = dag.description if dag.description else w.description
-            cat = dag.category if hasattr(dag, 'category') else (w.category or "general")
-        else:
-            name = w.name
-            description = w.description
-            cat = w.category or "general"
-        
-        workflows_with_dag_data.append({
-            "workflow": w,
-            "dag": dag,
-            "name": name,
-            "description": description,
-            "category": cat
-        })
-    
-    # Filter by search query
-    if q:
-        q_lower = q.lower()
-        filtered = [
-            wd for wd in workflows_with_dag_data
-            if q_lower in wd["name"].lower() or 
-               (wd["description"] and q_lower in wd["description"].lower())
-        ]
-    else:
-        filtered = workflows_with_dag_data
-    
-    # Filter by category
-    if category:
-        filtered = [wd for wd in filtered if wd["category"] == category]
-    
-    # Build results with real workflow data
-    results = []
-    for wd in filtered:
-        workflow_data = await _get_workflow_data(wd["workflow"], wd["dag"], locale)
-        results.append(workflow_data)
-
-    # Sort search results alphabetically by name
-    results.sort(key=lambda x: x.get('name', '').lower())
-    
-    return {
-        "results": results,
-        "total": len(filtered),
-        "query": q,
-        "category": category
-    }
+    locale = _catalog_locale(locale)
+    snapshot = await public_workflow_catalog.get(locale)
+
+    def build(snap: PublicCatalogSnapshot) -> Dict[str, Any]:
+        total, results = snap.search_index.search(q, category=category, skip=skip, limit=limit)
+        return {
+            "results": results,
+            "total": total,
+            "query": q,
+            "category": category,
+            "skip": skip,
+            "limit": limit
+        }
+
+    return _catalog_response(request, snapshot, ("search", q, category, skip, limit), build)
 
 
 @router.get("/workflows/{workflow_id}")
@@ -585,23 +586,10 @@ def _calculate_duration(num_steps: int, avg_seconds_per_step: int = 180) -> str:
         return f"{minutes}-{minutes+15} min"
 
 
-def _slim_entity_data(data: Dict[str, Any], max_bytes: int = 1024) -> Dict[str, Any]:
-    """Strip heavy values (base64 images, signable_data, certificates, etc.) from
-    entity data for LIST views. The list UI only renders short text fields, while
-    these entities can embed multi-MB base64 images — returning them all turns a
-    page load into tens of MB of JSON. Full data stays available via the entity
-    detail endpoint."""
-    if not data:
-        return {}
-    slim: Dict[str, Any] = {}
-    for key, value in data.items():
-        try:
-            size = len(value) if isinstance(value, str) else len(json.dumps(value, default=str))
-        except (TypeError, ValueError):
-            size = max_bytes + 1
-        if size <= max_bytes:
-            slim[key] = value
-    return slim
+# Largest entity data value returned by list views. The list UI only renders
+# short text fields, while entities can embed multi-MB base64 images; full
+# data stays available via the entity detail endpoint.
+ENTITY_LIST_MAX_VALUE_BYTES = 1024
 
 
 @router.get("/entities")
@@ -620,27 +608,17 @@ async def list_user_entities(
         owner_user_id=str(current_customer.id),
         entity_type=entity_type,
         skip=skip,
-        limit=limit
+        limit=limit,
+        data_value_max_bytes=ENTITY_LIST_MAX_VALUE_BYTES
     )
     
     # Transform entities for response
     result = []
     for entity in entities:
-        # Get available workflows for this entity type
-        all_workflows = await workflow_service.list_workflow_definitions(status="active")
-        
-        # Filter workflows that can work with this entity type
-        # Look for workflows that have this entity type in their metadata
-        available_workflows = []
-        for w in all_workflows:
-            if w.metadata and "entity_types" in w.metadata:
-                if entity.entity_type in w.metadata["entity_types"]:
-                    available_workflows.append({
-                        "workflow_id": w.workflow_id,
-                        "name": w.name,
-                        "description": w.description,
-                        "category": w.category
-                    })
+        # Workflows that declare this entity type in their metadata
+        available_workflows = await entity_workflow_index.workflows_for(entity.entity_type)
+        for w in available_workflows:
+            w.pop("estimatedDuration", None)
         
         entity_data = {
             "entity_id": entity.entity_id,
@@ -648,7 +626,7 @@ async def list_user_entities(
             "name": entity.name,
             "status": entity.status,
             "verified": entity.verified,
-            "data": _slim_entity_data(entity.data),
+            "data": entity.data,
             "created_at": entity.created_at.isoformat() if entity.created_at else None,
             "updated_at": entity.updated_at.isoformat() if entity.updated_at else None,
             "available_workflows": available_workflows,
@@ -690,18 +668,7 @@ async def get_entity_details(
     ).to_list()
     
     # Get available workflows for this entity type
-    all_workflows = await workflow_service.list_workflow_definitions(status="active")
-    available_workflows = []
-    for w in all_workflows:
-        if w.metadata and "entity_types" in w.metadata:
-            if entity.entity_type in w.metadata["entity_types"]:
-                available_workflows.append({
-                    "workflow_id": w.workflow_id,
-                    "name": w.name,
-                    "description": w.description,
-                    "category": w.category,
-                    "estimatedDuration": w.metadata.get("estimated_duration", "10-20 min")
-                })
+    available_workflows = await entity_workflow_index.workflows_for(entity.entity_type)
     
     # Prepare entity data
     entity_dict = entity.to_display_dict()
@@ -6,7 +6,8 @@ Separate from admin authentication.
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 import json
-from fastapi import APIRouter, HTTPException, status, Header, Depends
+from fastapi import APIRouter, HTTPException, status, Header, Depends, Request
+from fastapi.responses import StreamingResponse
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
@@ -16,6 +17,7 @@ from ...models.customer import Customer, CustomerStatus
 from ...core.config import settings
 from ...core.i18n import t as translate
 from ...auth.auth_callbacks import run_post_auth_callbacks
+from ...auth.customer_sessions import customer_sessions
 
 logger = logging.getLogger(__name__)
 
@@ -99,13 +101,14 @@ def _parse_personas_morales(raw: Any) -> List[Dict[str, Any]]:
     return []
 
 
-def _sync_llavemx_profile(customer: Customer, payload: Dict[str, Any]) -> None:
+def _sync_llavemx_profile(customer: Customer, payload: Dict[str, Any]) -> bool:
     """
     Sync Llave MX identity data from the Keycloak token claims into the Customer.
 
-    Called on every authenticated request so the MuniStream profile mirrors the
-    FORCE-synced Keycloak attributes (persona física + all associated personas
-    morales). Only overwrites fields when the corresponding claim is present.
+    Called whenever a login session starts or its claims change so the
+    MuniStream profile mirrors the FORCE-synced Keycloak attributes (persona
+    física + all associated personas morales). Only overwrites fields when the
+    corresponding claim is present. Returns whether anything changed.
     """
     curp = payload.get("curp")
     rfc = payload.get("rfc")
@@ -143,12 +146,15 @@ def _sync_llavemx_profile(customer: Customer, payload: Dict[str, Any]) -> None:
         "personas_morales": personas_morales,
         "synced_at": datetime.utcnow().isoformat(),
     }
-    if customer.metadata.get("llavemx") != llavemx_meta:
+    # synced_at alone changing is not a profile change
+    current_meta = {k: v for k, v in (customer.metadata.get("llavemx") or {}).items() if k != "synced_at"}
+    if current_meta != {k: v for k, v in llavemx_meta.items() if k != "synced_at"}:
         customer.metadata["llavemx"] = llavemx_meta
         changed = True
 
     if changed:
         customer.updated_at = datetime.utcnow()
+    return changed
 
 
 async def get_current_customer(authorization: Optional[str] = Header(None)) -> Customer:
@@ -199,6 +205,11 @@ async def get_current_customer(authorization: Optional[str] = Header(None)) -> C
         logger.error(f"Token verification failed: {e}")
         raise credentials_exception
 
+    # Later requests of the same login session skip resolution and writes
+    cached = customer_sessions.get(customer_id, payload)
+    if cached is not None:
+        return cached
+
     # Resolve the customer. Prefer keycloak_id / curp to find the right record
     # even when email is absent or changed, then fall back to email.
     email = payload.get("email", "")
@@ -210,6 +221,7 @@ async def get_current_customer(authorization: Optional[str] = Header(None)) -> C
     if customer is None and email:
         customer = await Customer.find_one(Customer.email == email)
 
+    changed = customer is None
     if customer is None:
         # Create customer from Keycloak token if it doesn't exist.
         # Customer.email is required/unique; Llave MX accounts carry a correo,
@@ -233,17 +245,26 @@ async def get_current_customer(authorization: Optional[str] = Header(None)) -> C
             keycloak_id=customer_id  # Store Keycloak ID separately
         )
 
-    # Keep the Keycloak link fresh and sync Llave MX data on every login.
+    # Keep the Keycloak link fresh and sync Llave MX data on every login;
+    # write only when something actually changed.
     if customer.keycloak_id != customer_id:
         customer.keycloak_id = customer_id
-    _sync_llavemx_profile(customer, payload)
-    customer.update_last_login()
-    await customer.save()
+        changed = True
+    changed = _sync_llavemx_profile(customer, payload) or changed
+    new_session = customer_sessions.is_new_session(customer_id, payload)
+    if new_session:
+        customer.update_last_login()
+        changed = True
+    if changed:
+        await customer.save()
 
-    # Run plugin-registered post-auth callbacks (e.g. tenant-specific entity sync).
-    # Runs after save so customer.id is assigned; callbacks persist their own changes.
-    await run_post_auth_callbacks(customer, payload, settings.TENANT_ID)
+    # Run plugin-registered post-auth callbacks (e.g. tenant-specific entity sync)
+    # once per login session. Runs after save so customer.id is assigned;
+    # callbacks persist their own changes.
+    if new_session:
+        await run_post_auth_callbacks(customer, payload, settings.TENANT_ID)
 
+    customer_sessions.put(customer_id, payload, customer)
     return customer
 
 
@@ -395,6 +416,38 @@ async def start_citizen_workflow(
         )
 
 
+@router.get("/track/{instance_id}/stream")
+async def stream_instance(
+    instance_id: str,
+    request: Request,
+    current_customer: Customer = Depends(get_current_customer)
+):
+    """
+    Stream workflow instance updates as Server-Sent Events.
+    Replaces polling /track: sends the current state, then an event each time
+    the instance advances a step, changes status or waits for input.
+    Requires authentication - only authenticated users can track instances.
+    """
+    from ...models.workflow import WorkflowInstance, InstanceSummary
+    from ...services.instance_updates import stream_instance_updates
+
+    db_instance = await WorkflowInstance.find_one(
+        WorkflowInstance.instance_id == instance_id,
+        projection_model=InstanceSummary
+    )
+    if not db_instance:
+        raise HTTPException(status_code=404, detail="Instance not found")
+
+    if db_instance.user_id != str(current_customer.id):
+        raise HTTPException(status_code=403, detail="Not authorized to access this instance")
+
+    return StreamingResponse(
+        stream_instance_updates(instance_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/track/{instance_id}")
 async def track_instance(
     instance_id: str,
@@ -17,6 +17,7 @@ from ...schemas.workflow import (
 )
 from ...models.workflow import WorkflowDefinition, WorkflowStep
 from ...models.team import TeamModel
+from ...services.public_workflow_catalog import public_workflow_catalog
 from ...auth.provider import get_current_user, require_roles
 
 router = APIRouter()
@@ -200,6 +201,7 @@ async def update_workflow(workflow_id: str, update_data: WorkflowUpdate):
     
     workflow.updated_at = datetime.utcnow()
     await workflow.save()
+    public_workflow_catalog.invalidate()
     
     return await convert_workflow_to_response(workflow)
 
@@ -216,6 +218,7 @@ async def delete_workflow(workflow_id: str):
     
     # Delete workflow
     await workflow.delete()
+    public_workflow_catalog.invalidate()
     
     return {"message": "Workflow deleted successfully"}
 
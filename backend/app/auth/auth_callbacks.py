@@ -2,8 +2,8 @@
 Generic post-authentication callback registry.
 
 Plugins (or any module loaded at startup) may register async callbacks that run
-on every authenticated citizen request, right after the Customer record has been
-resolved/synced. The backend stays agnostic: it does not know what the callbacks
+once per citizen login session (per API process), right after the Customer
+record has been resolved/synced. The backend stays agnostic: it does not know what the callbacks
 do, and registering none is a no-op.
 
 A callback has the signature:
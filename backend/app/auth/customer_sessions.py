@@ -0,0 +1,94 @@
+"""
+Per-process cache of resolved citizen accounts.
+
+get_current_customer runs on every citizen portal request. Resolving the
+Customer, syncing the Llave MX profile, saving it and running the post-auth
+callbacks is only needed when a login session starts or its claims change;
+later requests of the same session reuse the cached account.
+
+Entries are keyed by token subject and remember the Keycloak session
+(`sid`) and a fingerprint of the identity claims. A different session runs
+the login work again; changed claims re-sync the profile. Cached accounts go
+stale after CUSTOMER_SESSION_CACHE_SECONDS so changes made elsewhere are
+picked up; endpoints that save the customer call invalidate().
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+
+# Claims that change with every token refresh and say nothing about the user
+VOLATILE_CLAIMS = {"exp", "iat", "nbf", "jti", "at_hash", "c_hash", "nonce"}
+
+
+def session_key(claims: Dict[str, Any]) -> Optional[str]:
+    """Keycloak login session a token belongs to"""
+    value = claims.get("sid") or claims.get("session_state") or claims.get("auth_time")
+    return str(value) if value is not None else None
+
+
+def claims_fingerprint(claims: Dict[str, Any]) -> str:
+    """Hash of the identity claims (everything but per-token fields)"""
+    stable = {k: v for k, v in claims.items() if k not in VOLATILE_CLAIMS}
+    return hashlib.sha256(json.dumps(stable, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@dataclass
+class _CachedSession:
+    session: Optional[str]
+    fingerprint: str
+    customer: Any
+    cached_at: float
+
+
+class CustomerSessionCache:
+    """Bounded LRU of resolved customers by token subject"""
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size or settings.CUSTOMER_SESSION_CACHE_SIZE
+        self.ttl_seconds = settings.CUSTOMER_SESSION_CACHE_SECONDS if ttl_seconds is None else ttl_seconds
+        self._entries: "OrderedDict[str, _CachedSession]" = OrderedDict()
+
+    def get(self, subject: str, claims: Dict[str, Any]) -> Optional[Any]:
+        """Copy of the cached customer if the session, claims and entry are current"""
+        entry = self._entries.get(subject)
+        if (entry is None or entry.customer is None
+                or entry.session != session_key(claims)
+                or entry.fingerprint != claims_fingerprint(claims)
+                or time.monotonic() - entry.cached_at > self.ttl_seconds):
+            return None
+        self._entries.move_to_end(subject)
+        # Handlers may mutate the customer they receive
+        return entry.customer.model_copy(deep=True)
+
+    def is_new_session(self, subject: str, claims: Dict[str, Any]) -> bool:
+        """True unless this process already handled the token's login session"""
+        entry = self._entries.get(subject)
+        return entry is None or entry.session != session_key(claims)
+
+    def put(self, subject: str, claims: Dict[str, Any], customer: Any) -> None:
+        self._entries[subject] = _CachedSession(
+            session=session_key(claims),
+            fingerprint=claims_fingerprint(claims),
+            customer=customer.model_copy(deep=True),
+            cached_at=time.monotonic(),
+        )
+        self._entries.move_to_end(subject)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, subject: Optional[str]) -> None:
+        """Drop the cached account but remember the session (no new login)"""
+        entry = self._entries.get(subject) if subject else None
+        if entry is not None:
+            entry.customer = None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+customer_sessions = CustomerSessionCache()
@@ -1,9 +1,11 @@
 """
 Keycloak authentication provider for MuniStream
 """
+import hashlib
 import os
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
 import httpx
 from jose import jwt, JWTError
 from fastapi import HTTPException, status, Depends, Request
@@ -16,9 +18,55 @@ logger = logging.getLogger(__name__)
 security_scheme = HTTPBearer()
 
 
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified token claims keyed by token hash.
+
+    Entries expire at the token's `exp`, capped at max_seconds so a token
+    revoked in Keycloak is not honoured indefinitely.
+    """
+
+    def __init__(self, max_size: int, max_seconds: int):
+        self.max_size = max_size
+        self.max_seconds = max_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return claims
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        expires_at = time.time() + self.max_seconds
+        if isinstance(claims.get("exp"), (int, float)):
+            expires_at = min(expires_at, claims["exp"])
+        key = self._key(token)
+        self._entries[key] = (expires_at, claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
 class KeycloakProvider:
     """Keycloak OAuth 2.0/OIDC authentication provider"""
 
+    # Audiences accepted besides the backend client id
+    EXTRA_AUDIENCES = ["account", "munistream-admin", "munistream-citizen"]
+
     def __init__(self):
         """Initialize Keycloak provider from environment variables"""
         self.server_url = os.getenv("KEYCLOAK_URL", "http://localhost:8180").rstrip('/')
@@ -33,117 +81,115 @@ class KeycloakProvider:
         self.introspect_endpoint = f"{self.realm_url}/protocol/openid-connect/token/introspect"
         self.jwks_uri = f"{self.realm_url}/protocol/openid-connect/certs"
 
-        # Cache for JWKS
+        # Cache for JWKS, indexed by key id
         self._jwks_cache = None
-        self._jwks_cache_time = None
-        self._jwks_cache_duration = timedelta(hours=1)
+        self._jwks_by_kid: Dict[str, Dict[str, Any]] = {}
+        self._jwks_cache_time: Optional[float] = None
+        self._jwks_cache_duration = 3600
+
+        self._token_cache = VerifiedTokenCache(
+            settings.KEYCLOAK_TOKEN_CACHE_SIZE,
+            settings.KEYCLOAK_TOKEN_CACHE_MAX_SECONDS
+        )
+        self._client: Optional[httpx.AsyncClient] = None
 
         logger.info(f"Keycloak provider initialized for realm: {self.realm}")
 
-    async def get_jwks(self) -> Dict[str, Any]:
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Pooled HTTP client for calls to Keycloak"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(verify=False, timeout=10.0)
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_jwks(self, force: bool = False) -> Dict[str, Any]:
         """Get JSON Web Key Set from Keycloak"""
-        now = datetime.utcnow()
-        if (self._jwks_cache is None or
+        now = time.monotonic()
+        if (force or
+            self._jwks_cache is None or
             self._jwks_cache_time is None or
             now - self._jwks_cache_time > self._jwks_cache_duration):
 
             try:
-                async with httpx.AsyncClient(verify=False, timeout=10.0) as client:
-                    logger.info(f"Fetching JWKS from: {self.jwks_uri}")
-                    response = await client.get(self.jwks_uri)
-                    response.raise_for_status()
-                    self._jwks_cache = response.json()
-                    self._jwks_cache_time = now
-                    logger.info("JWKS fetched successfully")
+                logger.info(f"Fetching JWKS from: {self.jwks_uri}")
+                response = await self.http.get(self.jwks_uri)
+                response.raise_for_status()
+                self._jwks_cache = response.json()
+                self._jwks_by_kid = {key["kid"]: key for key in self._jwks_cache.get("keys", []) if "kid" in key}
+                self._jwks_cache_time = now
+                logger.info("JWKS fetched successfully")
             except Exception as e:
                 logger.error(f"Failed to fetch JWKS from {self.jwks_uri}: {e}")
                 raise
 
         return self._jwks_cache
 
-    async def verify_token(self, token: str) -> Dict[str, Any]:
-        """Verify and decode a JWT token"""
-        try:
-            # Debug: Log token info
-            logger.info(f"Token length: {len(token)}")
-            logger.info(f"Token first 50 chars: {token[:50]}...")
-            logger.info(f"Token last 10 chars: ...{token[-10:]}")
+    async def get_signing_key(self, kid: str) -> Optional[Dict[str, Any]]:
+        """Public key for a key id, refetching the JWKS once if the id is unknown (key rotation)"""
+        await self.get_jwks()
+        key = self._jwks_by_kid.get(kid)
+        if key is None:
+            # Rate limited so tokens with bogus key ids cannot hammer Keycloak
+            since_fetch = time.monotonic() - (self._jwks_cache_time or 0)
+            if since_fetch >= settings.KEYCLOAK_JWKS_MIN_REFRESH_SECONDS:
+                await self.get_jwks(force=True)
+                key = self._jwks_by_kid.get(kid)
+        if key is None:
+            return None
+        return {"kty": key["kty"], "kid": key["kid"], "use": key.get("use"), "n": key["n"], "e": key["e"]}
 
-            # Get JWKS for verification
-            jwks = await self.get_jwks()
+    async def verify_token(self, token: str) -> Dict[str, Any]:
+        """Verify and decode a JWT token (claims are cached until the token expires)"""
+        cached = self._token_cache.get(token)
+        if cached is not None:
+            return cached
 
-            # Decode and verify token
+        try:
             unverified_header = jwt.get_unverified_header(token)
-
-            rsa_key = {}
-            for key in jwks["keys"]:
-                if key["kid"] == unverified_header["kid"]:
-                    rsa_key = {
-                        "kty": key["kty"],
-                        "kid": key["kid"],
-                        "use": key["use"],
-                        "n": key["n"],
-                        "e": key["e"]
-                    }
-                    break
-
+            rsa_key = await self.get_signing_key(unverified_header.get("kid", ""))
             if not rsa_key:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Unable to find appropriate key"
                 )
 
-            # Decode without audience verification first to check the actual audience
-            unverified_payload = jwt.decode(
-                token,
-                key="",  # Empty key for unverified decode
-                options={"verify_signature": False, "verify_aud": False}
-            )
+            # Read audience and issuer first so the token is verified in a single decode
+            unverified_claims = jwt.get_unverified_claims(token)
 
             # Service account tokens have "account" as audience
             # Regular user tokens have the client_id
-            audience = unverified_payload.get("aud", [])
+            audience = unverified_claims.get("aud", [])
             if isinstance(audience, str):
                 audience = [audience]
 
-            # Verify with proper audience
             # Accept tokens from munistream-backend, munistream-admin, and munistream-citizen clients
-            valid_audiences = ["account", self.client_id, "munistream-admin", "munistream-citizen"]
-            if any(aud in audience for aud in valid_audiences):
-                # Try to decode with configured valid issuers
-                valid_issuers = settings.KEYCLOAK_VALID_ISSUERS or [self.realm_url]
-
-                payload = None
-                last_error = None
-
-                for issuer in valid_issuers:
-                    try:
-                        payload = jwt.decode(
-                            token,
-                            rsa_key,
-                            algorithms=["RS256"],
-                            audience=audience[0] if audience else self.client_id,
-                            issuer=issuer
-                        )
-                        logger.debug(f"Token validated with issuer: {issuer}")
-                        break
-                    except JWTError as e:
-                        last_error = e
-                        continue
-
-                if not payload:
-                    token_issuer = unverified_payload.get("iss", "unknown")
-                    raise JWTError(f"Token issuer '{token_issuer}' not in valid issuers: {valid_issuers}. Error: {last_error}")
-            else:
+            valid_audiences = [self.client_id] + self.EXTRA_AUDIENCES
+            if not any(aud in audience for aud in valid_audiences):
                 raise JWTError(f"Invalid audience: {audience}. Expected one of: {valid_audiences}")
 
+            valid_issuers = settings.KEYCLOAK_VALID_ISSUERS or [self.realm_url]
+            token_issuer = unverified_claims.get("iss", "unknown")
+            if token_issuer not in valid_issuers:
+                raise JWTError(f"Token issuer '{token_issuer}' not in valid issuers: {valid_issuers}")
+
+            payload = jwt.decode(
+                token,
+                rsa_key,
+                algorithms=["RS256"],
+                audience=audience[0] if audience else self.client_id,
+                issuer=token_issuer
+            )
+
+            self._token_cache.put(token, payload)
             return payload
 
         except JWTError as e:
-            logger.error(f"JWT verification failed: {e}")
-            logger.error(f"Full exception details: {str(e)}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.warning(f"JWT verification failed: {e}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication token",
@@ -152,17 +198,16 @@ class KeycloakProvider:
 
     async def introspect_token(self, token: str) -> Dict[str, Any]:
         """Check if token is active via introspection"""
-        async with httpx.AsyncClient(verify=False) as client:
-            response = await client.post(
-                self.introspect_endpoint,
-                data={
-                    "token": token,
-                    "client_id": self.client_id,
-                    "client_secret": self.client_secret
-                }
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self.http.post(
+            self.introspect_endpoint,
+            data={
+                "token": token,
+                "client_id": self.client_id,
+                "client_secret": self.client_secret
+            }
+        )
+        response.raise_for_status()
+        return response.json()
 
     def extract_roles(self, token_claims: Dict[str, Any]) -> List[str]:
         """Extract roles from token claims"""
@@ -232,8 +277,6 @@ async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme)
 ) -> dict:
     """FastAPI dependency to get current authenticated user"""
-    logger.info(f"get_current_user called with credentials: {credentials}")
-
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -241,10 +284,6 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    logger.info(f"Token from credentials: length={len(credentials.credentials)}")
-    logger.info(f"Token scheme: {credentials.scheme}")
-    logger.info(f"Token first 50: {credentials.credentials[:50]}...")
-
     try:
         user_info = await keycloak.get_user_info(credentials.credentials)
         return user_info
@@ -47,6 +47,18 @@ class Settings(BaseSettings):
             valid_issuers.append(f"http://host.docker.internal:8180/realms/{keycloak_realm}")
 
         return valid_issuers
+
+    # Verified Keycloak token claims, reused until the token expires (capped)
+    KEYCLOAK_TOKEN_CACHE_SIZE: int = 10000
+    KEYCLOAK_TOKEN_CACHE_MAX_SECONDS: int = 300
+    # Minimum interval between JWKS refetches triggered by an unknown key id
+    KEYCLOAK_JWKS_MIN_REFRESH_SECONDS: int = 30
+    # Resolved citizen accounts, reused across requests of the same login session
+    CUSTOMER_SESSION_CACHE_SIZE: int = 10000
+    CUSTOMER_SESSION_CACHE_SECONDS: int = 300
+    # Keycloak admin sync: parallel admin API calls and page size for listings
+    KEYCLOAK_SYNC_CONCURRENCY: int = 8
+    KEYCLOAK_SYNC_PAGE_SIZE: int = 100
     
     # Azure
     AZURE_STORAGE_CONNECTION_STRING: Optional[str] = None
@@ -104,6 +116,32 @@ class Settings(BaseSettings):
     EXECUTOR_SAFETY_NET_SECONDS: int = 300
     EXECUTOR_RUNNING_THROTTLE_SECONDS: float = 0.5
 
+    # Catalog sync scheduling
+    CATALOG_SYNC_SCHEDULER_ENABLED: bool = True
+    CATALOG_SYNC_MAX_CONCURRENCY: int = 2
+    CATALOG_SYNC_POLL_SECONDS: int = 60
+    CATALOG_SYNC_LEASE_SECONDS: int = 900
+    # Upper bound for the retry backoff of catalogs whose syncs keep failing
+    CATALOG_SYNC_MAX_BACKOFF_MINUTES: int = 1440
+    CATALOG_SQL_POOL_MAX_SIZE: int = 5
+    CATALOG_SQL_POOL_IDLE_SECONDS: int = 300
+
+    # Public workflow catalog snapshots
+    PUBLIC_CATALOG_MAX_AGE_SECONDS: int = 300
+
+    # Instance update streams (SSE), fanned out across replicas via Redis pub/sub
+    INSTANCE_UPDATES_USE_REDIS: bool = True
+    INSTANCE_STREAM_HEARTBEAT_SECONDS: int = 15
+
+    # Assignment dashboard statistics, recomputed at most this often per filter
+    ASSIGNMENT_STATS_CACHE_SECONDS: int = 30
+
+    # Binary fields of submitted data stored outside the instance context
+    # (content-addressed, "s3" or "local" under DOCUMENT_STORAGE_PATH/blobs)
+    CONTEXT_BLOB_OFFLOAD_ENABLED: bool = True
+    CONTEXT_BLOB_BACKEND: str = "s3"
+    CONTEXT_BLOB_MIN_BYTES: int = 64 * 1024
+
     # Wallet Configuration
     APPLE_TEAM_ID: Optional[str] = None
     APPLE_PASS_TYPE_ID: Optional[str] = None
@@ -8,6 +8,7 @@ from ..models.workflow import (
     WorkflowStep,
     WorkflowInstance,
     StepExecution,
+    StepMetricRollup,
     ApprovalRequest,
     WorkflowAuditLog,
     IntegrationLog,
@@ -23,6 +24,7 @@ from ..models.legal_entity import EntityType, LegalEntity
 from ..models.catalog import Catalog, CatalogData
 from ..models.profile_field_definition import ProfileFieldDefinition
 from ..models.user_profile import UserProfile
+from ..models.sync_state import KeycloakSyncState
 from ..notifier.models import (
     NotificationChannelConfig,
     NotificationTemplate,
@@ -52,6 +54,7 @@ async def connect_to_mongo():
             WorkflowStep,
             WorkflowInstance,
             StepExecution,
+            StepMetricRollup,
             ApprovalRequest,
             WorkflowAuditLog,
             IntegrationLog,
@@ -72,6 +75,7 @@ async def connect_to_mongo():
             CatalogData,
             ProfileFieldDefinition,
             UserProfile,
+            KeycloakSyncState,
             NotificationChannelConfig,
             NotificationTemplate,
             NotificationTrigger,
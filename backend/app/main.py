@@ -201,6 +201,15 @@ async def startup_event():
     
     print("\n🔄 Initializing new DAG workflow system...")
     await initialize_workflow_system()
+
+    from app.services.public_workflow_catalog import public_workflow_catalog
+    await public_workflow_catalog.rebuild()
+    print("✅ Public workflow catalog built")
+
+    if settings.CATALOG_SYNC_SCHEDULER_ENABLED:
+        from app.services.catalog_sync_scheduler import catalog_sync_scheduler
+        await catalog_sync_scheduler.start()
+        print("✅ Catalog sync scheduler started")
     
     print("\n" + "="*60)
     print("✅ MUNISTREAM BACKEND READY")
@@ -209,7 +218,17 @@ async def startup_event():
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    from app.services.catalog_sync_scheduler import catalog_sync_scheduler
+    from app.services.catalog_connectors import sql_pool_registry
+    from app.services.instance_updates import instance_updates
+    from app.auth.provider import keycloak
+    from app.services.keycloak_sync import keycloak_sync_service
+    await catalog_sync_scheduler.stop()
+    await sql_pool_registry.close_all()
     await shutdown_workflow_system()
+    await instance_updates.close()
+    await keycloak.close()
+    await keycloak_sync_service.close()
     await close_mongo_connection()
 
 
@@ -139,6 +139,12 @@ class Catalog(Document):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     last_sync: Optional[datetime] = None
     last_sync_result: Optional[SyncResult] = None
+    # Set while a sync worker holds the catalog (see CatalogSyncScheduler)
+    sync_lease_until: Optional[datetime] = None
+    # Last scheduled sync run, successful or not, and failures since the last
+    # success; failing catalogs are retried with exponential backoff
+    last_sync_attempt: Optional[datetime] = None
+    sync_failures: int = 0
 
     # Status
     status: CatalogStatus = CatalogStatus.DRAFT
@@ -154,6 +160,7 @@ class Catalog(Document):
             "created_by",
             "tags",
             ("source_type", "status"),
+            "permissions.group_id",
         ]
 
     def __repr__(self) -> str:
@@ -217,6 +224,35 @@ class Catalog(Document):
         return max_rows
 
 
+class CatalogScheduleSource(BaseModel):
+    refresh_rate_minutes: int = 60
+    uploaded_file_id: Optional[str] = None
+
+
+class CatalogSyncSchedule(BaseModel):
+    """
+    Projection of Catalog with just what the sync scheduler needs to decide
+    whether a catalog is due, so each tick doesn't load schemas and permissions.
+    """
+    catalog_id: str
+    source_type: SourceType
+    source_config: CatalogScheduleSource
+    last_sync: Optional[datetime] = None
+    last_sync_attempt: Optional[datetime] = None
+    sync_failures: int = 0
+
+    class Settings:
+        projection = {
+            "catalog_id": 1,
+            "source_type": 1,
+            "source_config.refresh_rate_minutes": 1,
+            "source_config.uploaded_file_id": 1,
+            "last_sync": 1,
+            "last_sync_attempt": 1,
+            "sync_failures": 1,
+        }
+
+
 class CatalogData(Document):
     """
     Storage for actual catalog data.
@@ -0,0 +1,22 @@
+"""
+Watermarks for incremental synchronization with external systems.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from beanie import Document, Indexed
+from pydantic import Field
+
+
+class KeycloakSyncState(Document):
+    """Progress of one kind of MuniStream -> Keycloak sync (users, teams)"""
+    sync_type: Indexed(str, unique=True)
+
+    # Records updated after this instant still need syncing
+    watermark: Optional[datetime] = None
+    last_run_at: Optional[datetime] = None
+    last_results: Dict[str, Any] = Field(default_factory=dict)
+
+    class Settings:
+        name = "keycloak_sync_state"
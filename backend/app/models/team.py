@@ -48,7 +48,8 @@ class TeamModel(Document):
             "name",
             "department",
             "is_active",
-            "members.user_id"
+            "members.user_id",
+            "updated_at"  # Incremental Keycloak sync
         ]
     
     def add_member(self, user_id: str, role: str = "member") -> bool:
@@ -168,6 +168,9 @@ class UserModel(Document):
     class Settings:
         name = "users"
         use_state_management = True
+        indexes = [
+            "updated_at"  # Incremental Keycloak sync
+        ]
     
     def verify_password(self, password: str) -> bool:
         """Verify password against stored hash"""
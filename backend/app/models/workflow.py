@@ -1,8 +1,8 @@
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from enum import Enum
-from beanie import Document, Indexed
-from pydantic import Field
+from beanie import Document, Indexed, PydanticObjectId
+from pydantic import BaseModel, Field
 from pymongo import IndexModel
 
 
@@ -250,6 +250,50 @@ class StepExecution(Document):
             IndexModel([("workflow_id", 1)]),
             IndexModel([("status", 1)]),
             IndexModel([("started_at", -1)]),
+            # Performance analytics: per-step / per-workflow windows
+            IndexModel([("step_id", 1), ("started_at", -1)]),
+            IndexModel([("workflow_id", 1), ("step_id", 1), ("started_at", -1)]),
+        ]
+
+
+class StepMetricRollup(Document):
+    """Pre-aggregated step outcome and duration metrics for one time bucket"""
+    workflow_id: str = Field(..., description="Workflow ID")
+    step_id: str = Field(..., description="Step ID")
+    granularity: str = Field(..., description="Bucket size: minute, hour or day")
+    bucket_start: datetime = Field(..., description="Start of the time bucket (UTC)")
+
+    # Outcome counts; `executions` covers terminal outcomes (completed/failed/skipped)
+    executions: int = Field(default=0)
+    completed: int = Field(default=0)
+    failed: int = Field(default=0)
+    skipped: int = Field(default=0)
+    waiting: int = Field(default=0, description="Executions that paused waiting for input")
+    retried: int = Field(default=0)
+
+    # Duration moments of terminal executions, in seconds
+    duration_count: int = Field(default=0)
+    duration_sum: float = Field(default=0.0)
+    duration_sum_sq: float = Field(default=0.0)
+    duration_min: Optional[float] = Field(None)
+    duration_max: Optional[float] = Field(None)
+    sketch: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Log-bucketed duration counts, mergeable across buckets for percentiles"
+    )
+
+    expires_at: Optional[datetime] = Field(None, description="When the bucket is purged (TTL)")
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "step_metric_rollups"
+        indexes = [
+            IndexModel(
+                [("workflow_id", 1), ("step_id", 1), ("granularity", 1), ("bucket_start", 1)],
+                unique=True
+            ),
+            IndexModel([("granularity", 1), ("bucket_start", 1)]),
+            IndexModel([("expires_at", 1)], expireAfterSeconds=0),
         ]
 
 
@@ -331,6 +375,9 @@ class WorkflowInstance(Document):
     # Terminal status
     terminal_status: Optional[str] = Field(None, description="Final status (SUCCESS, FAILURE, etc.)")
     terminal_message: Optional[str] = Field(None, description="Final status message")
+
+    # Back-office search (maintained by the executor, see services/instance_search.py)
+    search_terms: List[str] = Field(default_factory=list, description="Normalized search tokens")
     
     class Settings:
         name = "workflow_instances"
@@ -359,6 +406,16 @@ class WorkflowInstance(Document):
             # Performance optimization indexes for executor queries
             IndexModel([("status", 1), ("updated_at", -1)]),  # For finding active instances
             IndexModel([("status", 1), ("priority", -1), ("started_at", 1)]),  # Priority-based execution
+            IndexModel([("workflow_id", 1), ("started_at", -1)]),  # Windowed performance analytics
+            # Keyset pagination of back-office lists (newest first)
+            IndexModel([("created_at", -1), ("_id", -1)]),
+            IndexModel([("workflow_id", 1), ("created_at", -1), ("_id", -1)]),
+            IndexModel([("workflow_type", 1), ("created_at", -1), ("_id", -1)]),
+            IndexModel([("assigned_user_id", 1), ("created_at", -1), ("_id", -1)]),
+            IndexModel([("assigned_team_id", 1), ("created_at", -1), ("_id", -1)]),
+            IndexModel([("assignment_status", 1), ("created_at", -1), ("_id", -1)]),
+            # Indexed prefix search over maintained search terms
+            IndexModel([("search_terms", 1)]),
         ]
     
     # Assignment management methods
@@ -522,6 +579,69 @@ class WorkflowInstance(Document):
         ] and self.status == "running"
 
 
+class InstanceSummary(BaseModel):
+    """
+    Projection of WorkflowInstance for list views.
+
+    Excludes context, task_states and context snapshots, which can reach
+    megabytes per instance; progress comes from step counts computed by Mongo.
+    """
+    id: Optional[PydanticObjectId] = Field(None, alias="_id")
+    instance_id: str
+    workflow_id: str
+    workflow_type: Optional[WorkflowType] = None
+    parent_instance_id: Optional[str] = None
+    parent_workflow_id: Optional[str] = None
+    user_id: str
+    status: str = "running"
+    current_step: Optional[str] = None
+    completed_step_count: int = 0
+    pending_approval_count: int = 0
+    citizen_email: Optional[str] = None
+    priority: int = 5
+
+    assigned_user_id: Optional[str] = None
+    assigned_team_id: Optional[str] = None
+    assignment_status: Optional[AssignmentStatus] = None
+    assignment_type: Optional[AssignmentType] = None
+    assigned_at: Optional[datetime] = None
+    assigned_by: Optional[str] = None
+    assignment_notes: Optional[str] = None
+
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "instance_id": 1,
+            "workflow_id": 1,
+            "workflow_type": 1,
+            "parent_instance_id": 1,
+            "parent_workflow_id": 1,
+            "user_id": 1,
+            "status": 1,
+            "current_step": 1,
+            "completed_step_count": {"$size": {"$ifNull": ["$completed_steps", []]}},
+            "pending_approval_count": {"$size": {"$ifNull": ["$pending_approvals", []]}},
+            "citizen_email": "$context.parent_customer_email",
+            "priority": 1,
+            "assigned_user_id": 1,
+            "assigned_team_id": 1,
+            "assignment_status": 1,
+            "assignment_type": 1,
+            "assigned_at": 1,
+            "assigned_by": 1,
+            "assignment_notes": 1,
+            "started_at": 1,
+            "completed_at": 1,
+            "created_at": 1,
+            "updated_at": 1,
+        }
+
+
 class ApprovalRequest(Document):
     """Approval request for workflow steps"""
     approval_id: str = Field(..., description="Unique approval identifier")
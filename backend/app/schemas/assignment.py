@@ -66,6 +66,7 @@ class AssignmentListResponse(BaseModel):
     total: int = Field(..., description="Total count of assignments")
     page: int = Field(default=1, description="Current page")
     page_size: int = Field(default=20, description="Items per page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
 
 
 class AssignmentStatsResponse(BaseModel):
@@ -121,11 +121,39 @@ class InstanceResponse(BaseModel):
         use_enum_values = True
 
 
+class InstanceSummaryResponse(BaseModel):
+    """List row for an instance; fetch the instance for context and results"""
+    instance_id: str
+    workflow_id: str
+    workflow_type: Optional[str] = None
+    user_id: str
+    status: InstanceStatus
+    current_step: Optional[str]
+    completed_steps_count: int = 0
+    priority: int = 5
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime]
+    
+    # Assignment information
+    assigned_user_id: Optional[str] = None
+    assigned_team_id: Optional[str] = None  
+    assignment_status: Optional[str] = None
+    assignment_type: Optional[str] = None
+    assigned_at: Optional[datetime] = None
+    assigned_by: Optional[str] = None
+    assignment_notes: Optional[str] = None
+    
+    class Config:
+        use_enum_values = True
+
+
 class InstanceListResponse(BaseModel):
-    instances: List[InstanceResponse]
+    instances: List[InstanceSummaryResponse]
     total: int
     page: int = 1
     page_size: int = 20
+    next_cursor: Optional[str] = None
 
 
 class InstanceUpdateRequest(BaseModel):
@@ -182,6 +210,7 @@ class BottleneckAnalysis(BaseModel):
     step_id: str
     total_executions: int
     avg_duration: float
+    p95_duration: float = 0.0
     failure_rate: float
     failed_executions: int
 
@@ -0,0 +1,63 @@
+"""
+Script to backfill search terms on workflow instances saved before they existed.
+
+The executor maintains `search_terms` on every save; this fills them in for
+older instances so back-office search finds them too.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+from pymongo import UpdateOne
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.core.database import connect_to_mongo, close_mongo_connection
+from app.models.workflow import WorkflowDefinition, WorkflowInstance
+from app.services.instance_search import build_search_terms
+
+BATCH_SIZE = 500
+
+
+async def backfill_instance_search_terms():
+    """Compute search terms for instances that have none"""
+    await connect_to_mongo()
+
+    workflow_names = {
+        w.workflow_id: f"{w.name} {w.description or ''}"
+        for w in await WorkflowDefinition.find_all().to_list()
+    }
+
+    collection = WorkflowInstance.get_motor_collection()
+    cursor = collection.find(
+        {"$or": [{"search_terms": {"$exists": False}}, {"search_terms": {"$size": 0}}]},
+        projection={"instance_id": 1, "workflow_id": 1, "context": 1}
+    )
+
+    updated = 0
+    operations = []
+    async for doc in cursor:
+        terms = build_search_terms(
+            doc.get("instance_id", ""),
+            doc.get("workflow_id", ""),
+            doc.get("context") or {},
+            workflow_name=workflow_names.get(doc.get("workflow_id"))
+        )
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"search_terms": terms}}))
+        if len(operations) >= BATCH_SIZE:
+            await collection.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+            print(f"  ... {updated} instances updated")
+
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+        updated += len(operations)
+
+    await close_mongo_connection()
+    print(f"\n✅ Search terms backfilled for {updated} instances")
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_instance_search_terms())
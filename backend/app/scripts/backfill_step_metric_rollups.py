@@ -0,0 +1,74 @@
+"""
+Script to backfill step metric rollups from step executions recorded before
+the executor maintained them.
+
+Executions are replayed into the rollup buckets by completion time. Only
+executions before the earliest existing day bucket are replayed, since the
+executor already covers everything from there on; pass an ISO datetime to
+override that cutoff.
+
+    python app/scripts/backfill_step_metric_rollups.py [until]
+"""
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.core.database import connect_to_mongo, close_mongo_connection
+from app.models.workflow import StepExecution, StepMetricRollup
+from app.services.step_metric_rollups import ROLLUP_OUTCOMES, step_metric_rollups
+
+BATCH_SIZE = 500
+
+
+async def _first_rollup_bucket():
+    """Start of the earliest live day bucket, if the executor wrote any"""
+    first = await StepMetricRollup.get_motor_collection().find_one(
+        {"granularity": "day"},
+        projection={"bucket_start": 1},
+        sort=[("bucket_start", 1)]
+    )
+    return first["bucket_start"] if first else None
+
+
+async def backfill_step_metric_rollups(until=None):
+    """Replay finished step executions into the rollups"""
+    await connect_to_mongo()
+
+    until = until or await _first_rollup_bucket()
+    query = {"status": {"$in": list(ROLLUP_OUTCOMES)}, "started_at": {"$ne": None}}
+    if until:
+        query["started_at"]["$lt"] = until
+        print(f"Backfilling executions started before {until.isoformat()}")
+
+    cursor = StepExecution.get_motor_collection().find(
+        query,
+        projection={"workflow_id": 1, "step_id": 1, "status": 1,
+                    "started_at": 1, "completed_at": 1, "duration_seconds": 1}
+    )
+
+    replayed = 0
+    async for doc in cursor:
+        step_metric_rollups.record(
+            doc["workflow_id"],
+            doc["step_id"],
+            doc["status"],
+            doc.get("duration_seconds"),
+            timestamp=doc.get("completed_at") or doc["started_at"]
+        )
+        replayed += 1
+        if replayed % BATCH_SIZE == 0:
+            await step_metric_rollups.flush()
+            print(f"  ... {replayed} executions replayed")
+
+    await step_metric_rollups.flush()
+    await close_mongo_connection()
+    print(f"\n✅ Step metric rollups backfilled from {replayed} executions")
+
+
+if __name__ == "__main__":
+    cutoff = datetime.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None
+    asyncio.run(backfill_step_metric_rollups(cutoff))
@@ -14,11 +14,28 @@ from datetime import datetime, timedelta
 from enum import Enum
 from dataclasses import dataclass
 import random
+import uuid
 
-from ..models.workflow import WorkflowInstance, WorkflowDefinition, AssignmentStatus, AssignmentType
+import numpy as np
+from pymongo import UpdateOne
+
+from ..models.workflow import WorkflowInstance, WorkflowDefinition, WorkflowAuditLog, AssignmentStatus, AssignmentType
 from ..models.user import UserModel, UserRole
 from ..models.team import TeamModel
 from ..core.database import get_database
+from .assignment_stats import assignment_stats
+
+
+# Assignment statuses that count as open work for a team or user
+ACTIVE_ASSIGNMENT_STATUSES = [AssignmentStatus.PENDING_REVIEW.value, AssignmentStatus.UNDER_REVIEW.value]
+IN_PROGRESS_ASSIGNMENT_STATUS = AssignmentStatus.UNDER_REVIEW.value
+
+# Instances with neither a team nor a user (see WorkflowInstance.unassign)
+UNASSIGNED_QUERY = {"assigned_team_id": None, "assigned_user_id": None}
+
+
+def is_unassigned(instance: WorkflowInstance) -> bool:
+    return not instance.assigned_team_id and not instance.assigned_user_id
 
 
 class AssignmentStrategy(str, Enum):
@@ -54,6 +71,122 @@ class UserWorkload:
     availability_score: float  # 0.0 to 1.0
 
 
+@dataclass
+class BulkAssignmentResult:
+    """Outcome of one instance in a bulk auto-assignment"""
+    instance_id: str
+    workflow_id: str
+    team_id: Optional[str] = None
+    user_id: Optional[str] = None
+    confidence: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.team_id is not None and self.error is None
+
+
+def workload_pipeline(team_ids: List[str], user_ids: List[str]) -> List[Dict[str, Any]]:
+    """Open instances per team and assignment counts per user, in one aggregation"""
+    return [
+        {"$match": {"$or": [
+            {"assigned_team_id": {"$in": team_ids}},
+            {"assigned_user_id": {"$in": user_ids}},
+        ]}},
+        {"$facet": {
+            "teams": [
+                {"$match": {
+                    "assigned_team_id": {"$in": team_ids},
+                    "assignment_status": {"$in": ACTIVE_ASSIGNMENT_STATUSES}
+                }},
+                {"$group": {"_id": "$assigned_team_id", "active": {"$sum": 1}}},
+            ],
+            "users": [
+                {"$match": {"assigned_user_id": {"$in": user_ids}}},
+                {"$group": {
+                    "_id": "$assigned_user_id",
+                    "total": {"$sum": 1},
+                    "active": {"$sum": {"$cond": [{"$in": ["$assignment_status", ACTIVE_ASSIGNMENT_STATUSES]}, 1, 0]}},
+                    "in_progress": {"$sum": {"$cond": [{"$eq": ["$assignment_status", IN_PROGRESS_ASSIGNMENT_STATUS]}, 1, 0]}},
+                }},
+            ],
+        }},
+    ]
+
+
+class WorkloadSnapshot:
+    """
+    In-memory workload of teams and their users.
+
+    Teams are loaded on first use with one user query and one aggregation,
+    then counters are updated in place as assignments are made, so a bulk
+    run costs the same few queries however many instances it assigns.
+    """
+
+    def __init__(self):
+        self.team_active: Dict[str, int] = {}
+        self.team_users: Dict[str, List[UserModel]] = {}
+        self.user_counts: Dict[str, Dict[str, int]] = {}
+        self.available_teams: Dict[Tuple, List[TeamModel]] = {}
+        self.last_auto_team_id: Optional[str] = None
+        self.last_auto_team_loaded = False
+
+    async def load(self, teams: List[TeamModel]) -> None:
+        """Load counts for teams (and their users) not yet in the snapshot"""
+        missing = [team for team in teams if team.team_id not in self.team_users]
+        if not missing:
+            return
+        team_ids = [team.team_id for team in missing]
+
+        users = await UserModel.find({
+            "team_ids": {"$in": team_ids},
+            "status": "active"
+        }).to_list()
+        for team in missing:
+            self.team_users[team.team_id] = [u for u in users if team.team_id in u.team_ids] if team.members else []
+            self.team_active[team.team_id] = 0
+
+        user_ids = list(dict.fromkeys(str(u.id) for u in users if str(u.id) not in self.user_counts))
+        for user_id in user_ids:
+            self.user_counts[user_id] = {"active": 0, "in_progress": 0, "total": 0}
+
+        rows = await WorkflowInstance.aggregate(workload_pipeline(team_ids, user_ids)).to_list()
+        facets = rows[0] if rows else {}
+        for row in facets.get("teams", []):
+            self.team_active[row["_id"]] = row["active"]
+        for row in facets.get("users", []):
+            self.user_counts[row["_id"]] = {k: row[k] for k in ("active", "in_progress", "total")}
+
+    def team_workload(self, team: TeamModel) -> float:
+        """Open instances per team member"""
+        team_size = len(team.members) if team.members else 1
+        return self.team_active.get(team.team_id, 0) / team_size
+
+    def user_workload(self, user: UserModel) -> UserWorkload:
+        counts = self.user_counts.get(str(user.id), {"active": 0, "in_progress": 0, "total": 0})
+
+        # Calculate availability score based on max concurrent tasks
+        max_tasks = getattr(user, 'max_concurrent_tasks', 5) or 5
+        return UserWorkload(
+            user_id=str(user.id),
+            active_instances=counts["active"],
+            in_progress_instances=counts["in_progress"],
+            total_assigned=counts["total"],
+            avg_completion_time=24.0,  # Placeholder - could be calculated from history
+            availability_score=max(0.0, 1.0 - (counts["active"] / max_tasks))
+        )
+
+    def record_assignment(self, team_id: str, user_id: Optional[str]) -> None:
+        """Account for an assignment just made"""
+        self.team_active[team_id] = self.team_active.get(team_id, 0) + 1
+        if user_id:
+            counts = self.user_counts.setdefault(user_id, {"active": 0, "in_progress": 0, "total": 0})
+            counts["active"] += 1
+            counts["total"] += 1
+        self.last_auto_team_id = team_id
+        self.last_auto_team_loaded = True
+
+
 class AssignmentService:
     """Service for automatic workflow instance assignment"""
     
@@ -69,28 +202,34 @@ class AssignmentService:
     async def auto_assign_instance(
         self, 
         instance: WorkflowInstance, 
-        workflow_def: Optional[WorkflowDefinition] = None
+        workflow_def: Optional[WorkflowDefinition] = None,
+        workload: Optional[WorkloadSnapshot] = None
     ) -> bool:
         """
         Automatically assign an instance to the most appropriate team/user
         
+        Pass the same WorkloadSnapshot when assigning several instances so
+        workloads are loaded once and kept current in memory.
+        
         Returns:
             bool: True if assignment was successful
         """
         try:
             # Get assignment rule for this workflow
             rule = await self._get_assignment_rule(instance, workflow_def)
+            workload = workload or WorkloadSnapshot()
             
             # Get available teams and users
-            available_teams = await self._get_available_teams(rule)
+            available_teams = await self._get_available_teams(rule, workload)
             
             if not available_teams:
                 print(f"No available teams for assignment of instance {instance.instance_id}")
                 return False
+            await workload.load(available_teams)
             
             # Apply assignment strategy
             assignment_result = await self._apply_assignment_strategy(
-                instance, rule, available_teams
+                instance, rule, available_teams, workload
             )
             
             if assignment_result:
@@ -102,6 +241,7 @@ class AssignmentService:
                 )
                 
                 if success:
+                    workload.record_assignment(team_id, user_id)
                     print(f"Successfully auto-assigned instance {instance.instance_id} to team {team_id}, user {user_id}")
                     return True
             
@@ -131,8 +271,12 @@ class AssignmentService:
         # Return default rule
         return self.default_rules["default"]
     
-    async def _get_available_teams(self, rule: AssignmentRule) -> List[TeamModel]:
-        """Get teams available for assignment based on the rule"""
+    async def _get_available_teams(self, rule: AssignmentRule, workload: WorkloadSnapshot) -> List[TeamModel]:
+        """Get teams available for assignment based on the rule (once per snapshot)"""
+        
+        key = (tuple(rule.preferred_teams or ()), tuple(rule.required_specializations or ()))
+        if key in workload.available_teams:
+            return workload.available_teams[key]
         
         query = {"is_active": True}
         
@@ -151,13 +295,15 @@ class AssignmentService:
                     filtered_teams.append(team)
             teams = filtered_teams
         
+        workload.available_teams[key] = teams
         return teams
     
     async def _apply_assignment_strategy(
         self, 
         instance: WorkflowInstance, 
         rule: AssignmentRule, 
-        available_teams: List[TeamModel]
+        available_teams: List[TeamModel],
+        workload: WorkloadSnapshot
     ) -> Optional[Tuple[str, Optional[str], float]]:
         """
         Apply the assignment strategy to select team/user
@@ -167,22 +313,23 @@ class AssignmentService:
         """
         
         if rule.strategy == AssignmentStrategy.WORKLOAD_BASED:
-            return await self._workload_based_assignment(instance, rule, available_teams)
+            return await self._workload_based_assignment(instance, rule, available_teams, workload)
         elif rule.strategy == AssignmentStrategy.ROUND_ROBIN:
-            return await self._round_robin_assignment(instance, rule, available_teams)
+            return await self._round_robin_assignment(instance, rule, available_teams, workload)
         elif rule.strategy == AssignmentStrategy.EXPERTISE_BASED:
-            return await self._expertise_based_assignment(instance, rule, available_teams)
+            return await self._expertise_based_assignment(instance, rule, available_teams, workload)
         elif rule.strategy == AssignmentStrategy.RANDOM:
-            return await self._random_assignment(instance, rule, available_teams)
+            return await self._random_assignment(instance, rule, available_teams, workload)
         else:
             # Default to workload-based
-            return await self._workload_based_assignment(instance, rule, available_teams)
+            return await self._workload_based_assignment(instance, rule, available_teams, workload)
     
     async def _workload_based_assignment(
         self, 
         instance: WorkflowInstance, 
         rule: AssignmentRule, 
-        available_teams: List[TeamModel]
+        available_teams: List[TeamModel],
+        workload: WorkloadSnapshot
     ) -> Optional[Tuple[str, Optional[str], float]]:
         """Assign based on current workload of teams and users"""
         
@@ -192,7 +339,7 @@ class AssignmentService:
         
         for team in available_teams:
             # Get team workload
-            team_workload = await self._calculate_team_workload(team)
+            team_workload = workload.team_workload(team)
             
             if rule.prefer_team_assignment:
                 # Assign to team, let team distribute internally
@@ -202,9 +349,8 @@ class AssignmentService:
                     best_user = None
             else:
                 # Find best user in this team
-                team_users = await self._get_team_users(team)
-                for user in team_users:
-                    user_workload = await self._calculate_user_workload(user)
+                for user in workload.team_users.get(team.team_id, []):
+                    user_workload = workload.user_workload(user)
                     
                     if user_workload.total_assigned < rule.max_instances_per_user:
                         combined_score = team_workload * 0.3 + user_workload.total_assigned * 0.7
@@ -215,7 +361,7 @@ class AssignmentService:
         
         if best_team:
             confidence = min(1.0, max(0.1, 1.0 - (best_score / 10.0)))
-            return (best_team.team_id, best_user.id if best_user else None, confidence)
+            return (best_team.team_id, str(best_user.id) if best_user else None, confidence)
         
         return None
     
@@ -223,7 +369,8 @@ class AssignmentService:
         self, 
         instance: WorkflowInstance, 
         rule: AssignmentRule, 
-        available_teams: List[TeamModel]
+        available_teams: List[TeamModel],
+        workload: WorkloadSnapshot
     ) -> Optional[Tuple[str, Optional[str], float]]:
         """Assign using round-robin rotation"""
         
@@ -231,15 +378,18 @@ class AssignmentService:
             return None
         
         # Get the last assigned team to continue rotation
-        last_assignment = await WorkflowInstance.find(
-            {"assignment_type": AssignmentType.AUTOMATIC}
-        ).sort(-WorkflowInstance.assigned_at).limit(1).to_list()
-        
-        if last_assignment and last_assignment[0].assigned_team_id:
+        if not workload.last_auto_team_loaded:
+            last_assignment = await WorkflowInstance.find(
+                {"assignment_type": AssignmentType.AUTOMATIC}
+            ).sort(-WorkflowInstance.assigned_at).limit(1).to_list()
+            workload.last_auto_team_id = last_assignment[0].assigned_team_id if last_assignment else None
+            workload.last_auto_team_loaded = True
+        
+        if workload.last_auto_team_id:
             try:
                 last_team_index = next(
                     i for i, team in enumerate(available_teams) 
-                    if team.team_id == last_assignment[0].assigned_team_id
+                    if team.team_id == workload.last_auto_team_id
                 )
                 next_team_index = (last_team_index + 1) % len(available_teams)
             except StopIteration:
@@ -252,18 +402,19 @@ class AssignmentService:
         # If individual assignment is preferred, select user within team
         selected_user = None
         if not rule.prefer_team_assignment:
-            team_users = await self._get_team_users(selected_team)
+            team_users = workload.team_users.get(selected_team.team_id, [])
             if team_users:
                 # Round-robin within team
                 selected_user = team_users[hash(instance.instance_id) % len(team_users)]
         
-        return (selected_team.team_id, selected_user.id if selected_user else None, 0.8)
+        return (selected_team.team_id, str(selected_user.id) if selected_user else None, 0.8)
     
     async def _expertise_based_assignment(
         self, 
         instance: WorkflowInstance, 
         rule: AssignmentRule, 
-        available_teams: List[TeamModel]
+        available_teams: List[TeamModel],
+        workload: WorkloadSnapshot
     ) -> Optional[Tuple[str, Optional[str], float]]:
         """Assign based on team/user expertise and specializations"""
         
@@ -284,7 +435,7 @@ class AssignmentService:
                 expertise_score = min(1.0, len(team_specializations) / 5.0)
             
             # Consider team workload as tiebreaker
-            workload_factor = 1.0 - min(1.0, await self._calculate_team_workload(team) / 10.0)
+            workload_factor = 1.0 - min(1.0, workload.team_workload(team) / 10.0)
             combined_score = expertise_score * 0.7 + workload_factor * 0.3
             
             if combined_score > best_match_score:
@@ -293,7 +444,7 @@ class AssignmentService:
                 
                 # If individual assignment preferred, find best user in team
                 if not rule.prefer_team_assignment:
-                    team_users = await self._get_team_users(team)
+                    team_users = workload.team_users.get(team.team_id, [])
                     if team_users:
                         # Select user with best specialization match
                         best_user_score = 0.0
@@ -310,7 +461,7 @@ class AssignmentService:
                                 best_user = user
         
         if best_team:
-            return (best_team.team_id, best_user.id if best_user else None, best_match_score)
+            return (best_team.team_id, str(best_user.id) if best_user else None, best_match_score)
         
         return None
     
@@ -318,7 +469,8 @@ class AssignmentService:
         self, 
         instance: WorkflowInstance, 
         rule: AssignmentRule, 
-        available_teams: List[TeamModel]
+        available_teams: List[TeamModel],
+        workload: WorkloadSnapshot
     ) -> Optional[Tuple[str, Optional[str], float]]:
         """Random assignment for testing or when no specific criteria apply"""
         
@@ -329,71 +481,191 @@ class AssignmentService:
         selected_user = None
         
         if not rule.prefer_team_assignment:
-            team_users = await self._get_team_users(selected_team)
+            team_users = workload.team_users.get(selected_team.team_id, [])
             if team_users:
                 selected_user = random.choice(team_users)
         
-        return (selected_team.team_id, selected_user.id if selected_user else None, 0.5)
-    
-    async def _calculate_team_workload(self, team: TeamModel) -> float:
-        """Calculate current workload for a team"""
-        
-        # Count active instances assigned to this team
-        active_count = await WorkflowInstance.find({
-            "assigned_team_id": team.team_id,
-            "assignment_status": {"$in": [AssignmentStatus.ASSIGNED, AssignmentStatus.IN_PROGRESS]}
-        }).count()
-        
-        # Normalize by team size
-        team_size = len(team.members) if team.members else 1
-        workload_per_member = active_count / team_size
-        
-        return workload_per_member
-    
-    async def _calculate_user_workload(self, user: UserModel) -> UserWorkload:
-        """Calculate detailed workload information for a user"""
-        
-        # Count different types of assignments
-        active_instances = await WorkflowInstance.find({
-            "assigned_user_id": str(user.id),
-            "assignment_status": {"$in": [AssignmentStatus.ASSIGNED, AssignmentStatus.IN_PROGRESS]}
-        }).count()
-        
-        in_progress_instances = await WorkflowInstance.find({
-            "assigned_user_id": str(user.id),
-            "assignment_status": AssignmentStatus.IN_PROGRESS
-        }).count()
-        
-        total_assigned = await WorkflowInstance.find({
-            "assigned_user_id": str(user.id)
-        }).count()
-        
-        # Calculate availability score based on max concurrent tasks
-        max_tasks = getattr(user, 'max_concurrent_tasks', 5)
-        availability_score = max(0.0, 1.0 - (active_instances / max_tasks))
-        
-        return UserWorkload(
-            user_id=str(user.id),
-            active_instances=active_instances,
-            in_progress_instances=in_progress_instances,
-            total_assigned=total_assigned,
-            avg_completion_time=24.0,  # Placeholder - could be calculated from history
-            availability_score=availability_score
-        )
-    
-    async def _get_team_users(self, team: TeamModel) -> List[UserModel]:
-        """Get all users belonging to a team"""
-        
-        if not team.members:
-            return []
-        
-        users = await UserModel.find({
-            "team_ids": {"$in": [team.team_id]},
-            "status": "active"
-        }).to_list()
-        
-        return users
+        return (selected_team.team_id, str(selected_user.id) if selected_user else None, 0.5)
     
+    def _balance_workload(
+        self,
+        rule: AssignmentRule,
+        available_teams: List[TeamModel],
+        workload: WorkloadSnapshot,
+        count: int
+    ) -> List[Optional[Tuple[str, Optional[str], float]]]:
+        """
+        Batch form of _workload_based_assignment: each of `count` instances
+        goes to the currently least loaded team (or team user under the
+        per-user cap), whose load then grows. Scores are kept in arrays so
+        every pick is one vectorized argmin.
+        """
+        candidates: List[Tuple[int, Optional[UserModel]]] = []
+        for team_index, team in enumerate(available_teams):
+            if rule.prefer_team_assignment:
+                candidates.append((team_index, None))
+            else:
+                candidates.extend((team_index, user) for user in workload.team_users.get(team.team_id, []))
+        if not candidates:
+            return [None] * count
+
+        team_load = np.array([workload.team_workload(team) for team in available_teams], dtype=float)
+        team_step = np.array([1.0 / (len(team.members) if team.members else 1) for team in available_teams])
+        candidate_team = np.array([team_index for team_index, _ in candidates])
+
+        # Users may belong to several teams; their counts are shared
+        user_ids = [str(user.id) if user else None for _, user in candidates]
+        unique_users = {u: i for i, u in enumerate(dict.fromkeys(u for u in user_ids if u))}
+        user_index = np.array([unique_users[u] if u else -1 for u in user_ids])
+        user_total = np.array([workload.user_counts.get(u, {}).get("total", 0) for u in unique_users], dtype=float)
+
+        choices: List[Optional[Tuple[str, Optional[str], float]]] = []
+        for _ in range(count):
+            if rule.prefer_team_assignment:
+                scores = team_load[candidate_team]
+            else:
+                totals = user_total[user_index]
+                scores = np.where(
+                    totals < rule.max_instances_per_user,
+                    team_load[candidate_team] * 0.3 + totals * 0.7,
+                    np.inf
+                )
+            best = int(np.argmin(scores))
+            if not np.isfinite(scores[best]):
+                choices.extend([None] * (count - len(choices)))
+                break
+
+            team_index, user = candidates[best]
+            team_load[team_index] += team_step[team_index]
+            if user is not None:
+                user_total[user_index[best]] += 1
+            confidence = min(1.0, max(0.1, 1.0 - (float(scores[best]) / 10.0)))
+            choices.append((available_teams[team_index].team_id, user_ids[best], confidence))
+
+        return choices
+
+    async def bulk_auto_assign(
+        self,
+        instances: List[Any],
+        workflow_defs: Dict[str, WorkflowDefinition],
+        actor: str
+    ) -> List[BulkAssignmentResult]:
+        """
+        Assign a batch of unassigned instances in one pass.
+
+        Teams, users and workloads are loaded once, the batch is solved in
+        memory, assignments are written with a single bulk_write (only to
+        instances still unassigned) and audited with a single insert.
+        `instances` only need id, instance_id and workflow_id.
+        """
+        workload = WorkloadSnapshot()
+        results = {
+            instance.instance_id: BulkAssignmentResult(instance.instance_id, instance.workflow_id)
+            for instance in instances
+        }
+
+        groups: Dict[int, Tuple[AssignmentRule, List[Any]]] = {}
+        for instance in instances:
+            rule = await self._get_assignment_rule(instance, workflow_defs.get(instance.workflow_id))
+            groups.setdefault(id(rule), (rule, []))[1].append(instance)
+
+        chosen: List[Tuple[Any, AssignmentRule, Tuple[str, Optional[str], float]]] = []
+        for rule, group in groups.values():
+            available_teams = await self._get_available_teams(rule, workload)
+            if not available_teams:
+                for instance in group:
+                    results[instance.instance_id].error = "No available teams"
+                continue
+            await workload.load(available_teams)
+
+            if rule.strategy == AssignmentStrategy.WORKLOAD_BASED:
+                choices = self._balance_workload(rule, available_teams, workload, len(group))
+                for choice in choices:
+                    if choice:
+                        workload.record_assignment(choice[0], choice[1])
+            else:
+                choices = []
+                for instance in group:
+                    choice = await self._apply_assignment_strategy(instance, rule, available_teams, workload)
+                    if choice:
+                        workload.record_assignment(choice[0], choice[1])
+                    choices.append(choice)
+
+            for instance, choice in zip(group, choices):
+                if choice is None:
+                    results[instance.instance_id].error = "No suitable assignment found"
+                else:
+                    chosen.append((instance, rule, choice))
+
+        if not chosen:
+            return list(results.values())
+
+        # Millisecond precision, as stored by Mongo, so writes can be recognized below
+        now = datetime.utcnow()
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        operations = [
+            UpdateOne(
+                {"_id": instance.id, **UNASSIGNED_QUERY},
+                {"$set": self._assignment_update(team_id, user_id, rule, confidence, now)}
+            )
+            for instance, rule, (team_id, user_id, confidence) in chosen
+        ]
+        collection = WorkflowInstance.get_motor_collection()
+        write = await collection.bulk_write(operations, ordered=False)
+
+        lost = set()
+        if write.matched_count < len(operations):
+            # Some instances were assigned by someone else meanwhile
+            ids = [instance.id for instance, _, _ in chosen]
+            async for doc in collection.find(
+                {"_id": {"$in": ids}},
+                projection={"instance_id": 1, "assigned_at": 1}
+            ):
+                if doc.get("assigned_at") != now:
+                    lost.add(doc["instance_id"])
+
+        audit_logs = []
+        for instance, rule, (team_id, user_id, confidence) in chosen:
+            result = results[instance.instance_id]
+            if instance.instance_id in lost:
+                result.error = "Instance was assigned concurrently"
+                continue
+            result.team_id, result.user_id, result.confidence = team_id, user_id, confidence
+            audit_logs.append(WorkflowAuditLog(
+                log_id=str(uuid.uuid4()),
+                workflow_id=instance.workflow_id,
+                instance_id=instance.instance_id,
+                action="auto_assign",
+                actor=actor,
+                target="instance",
+                after_state={"team_id": team_id, "user_id": user_id, "strategy": rule.strategy, "confidence": confidence},
+                timestamp=now
+            ))
+        if audit_logs:
+            await WorkflowAuditLog.insert_many(audit_logs)
+
+        return list(results.values())
+
+    def _assignment_update(
+        self,
+        team_id: str,
+        user_id: Optional[str],
+        rule: AssignmentRule,
+        confidence: float,
+        now: datetime
+    ) -> Dict[str, Any]:
+        """Fields set on an instance by an automatic assignment"""
+        update_data = {
+            "assigned_team_id": team_id,
+            "assignment_status": AssignmentStatus.PENDING_REVIEW,
+            "assignment_type": AssignmentType.AUTOMATIC,
+            "assigned_at": now,
+            "assignment_notes": f"Auto-assigned using {rule.strategy} strategy (confidence: {confidence:.2f})"
+        }
+        if user_id:
+            update_data["assigned_user_id"] = user_id
+        return update_data
+
     async def _execute_assignment(
         self, 
         instance: WorkflowInstance, 
@@ -405,19 +677,8 @@ class AssignmentService:
         """Execute the actual assignment"""
         
         try:
-            now = datetime.utcnow()
-            
             # Update instance with assignment
-            update_data = {
-                "assigned_team_id": team_id,
-                "assignment_status": AssignmentStatus.ASSIGNED,
-                "assignment_type": AssignmentType.AUTOMATIC,
-                "assigned_at": now,
-                "assignment_notes": f"Auto-assigned using {rule.strategy} strategy (confidence: {confidence:.2f})"
-            }
-            
-            if user_id:
-                update_data["assigned_user_id"] = user_id
+            update_data = self._assignment_update(team_id, user_id, rule, confidence, datetime.utcnow())
             
             # Update the instance
             await instance.update({"$set": update_data})
@@ -428,38 +689,23 @@ class AssignmentService:
             print(f"Error executing assignment: {e}")
             return False
     
-    async def get_assignment_statistics(self) -> Dict[str, Any]:
-        """Get statistics about automatic assignments"""
-        
-        # Count assignments by type
-        auto_assignments = await WorkflowInstance.find({
-            "assignment_type": AssignmentType.AUTOMATIC
-        }).count()
-        
-        manual_assignments = await WorkflowInstance.find({
-            "assignment_type": AssignmentType.MANUAL
-        }).count()
-        
-        # Count by status
-        assigned_count = await WorkflowInstance.find({
-            "assignment_status": AssignmentStatus.ASSIGNED
-        }).count()
+    async def get_assignment_statistics(self, use_cache: bool = True) -> Dict[str, Any]:
+        """Get statistics about automatic assignments (one aggregation, briefly cached)"""
         
-        in_progress_count = await WorkflowInstance.find({
-            "assignment_status": AssignmentStatus.IN_PROGRESS
-        }).count()
+        stats = await assignment_stats.get({}, use_cache=use_cache)
+        by_type = stats["by_assignment_type"]
+        by_status = stats["by_status"]
         
-        completed_count = await WorkflowInstance.find({
-            "assignment_status": AssignmentStatus.COMPLETED
-        }).count()
+        auto_assignments = by_type.get(AssignmentType.AUTOMATIC.value, 0)
+        manual_assignments = by_type.get(AssignmentType.MANUAL.value, 0)
         
         return {
             "total_assignments": auto_assignments + manual_assignments,
             "automatic_assignments": auto_assignments,
             "manual_assignments": manual_assignments,
-            "assigned_instances": assigned_count,
-            "in_progress_instances": in_progress_count,
-            "completed_instances": completed_count,
+            "assigned_instances": by_status.get(AssignmentStatus.PENDING_REVIEW.value, 0),
+            "in_progress_instances": by_status.get(IN_PROGRESS_ASSIGNMENT_STATUS, 0),
+            "completed_instances": by_status.get(AssignmentStatus.COMPLETED.value, 0),
             "automation_rate": auto_assignments / (auto_assignments + manual_assignments) if (auto_assignments + manual_assignments) > 0 else 0
         }
 
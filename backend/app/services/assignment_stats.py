@@ -0,0 +1,104 @@
+"""
+Assignment statistics in a single collection pass.
+
+The assignment dashboards used to issue a dozen separate count() queries and
+$group pipelines. Every breakdown is now a branch of one $facet aggregation,
+and results are cached per filter for ASSIGNMENT_STATS_CACHE_SECONDS since
+dashboards reload them far more often than they change.
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..models.workflow import AssignmentStatus, WorkflowInstance
+
+# Pending review for longer than this counts as overdue
+OVERDUE_AFTER = timedelta(hours=48)
+
+STATS_CACHE_MAX_ENTRIES = 256
+
+GROUPED_FIELDS = {
+    "by_status": "assignment_status",
+    "by_user": "assigned_user_id",
+    "by_team": "assigned_team_id",
+    "by_workflow_type": "workflow_type",
+    "by_assignment_type": "assignment_type",
+}
+
+
+def assignment_stats_pipeline(
+    query: Dict[str, Any],
+    today_start: datetime,
+    overdue_before: datetime
+) -> List[Dict[str, Any]]:
+    """Every assignment breakdown as one $facet over the matching instances"""
+    facets: Dict[str, List[Dict[str, Any]]] = {
+        name: [
+            {"$match": {field: {"$ne": None}}},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        ]
+        for name, field in GROUPED_FIELDS.items()
+    }
+    facets["completed_today"] = [
+        {"$match": {
+            "assignment_status": AssignmentStatus.COMPLETED.value,
+            "completed_at": {"$gte": today_start}
+        }},
+        {"$count": "count"},
+    ]
+    facets["overdue"] = [
+        {"$match": {
+            "assignment_status": {"$in": [AssignmentStatus.PENDING_REVIEW.value, AssignmentStatus.UNDER_REVIEW.value]},
+            "created_at": {"$lt": overdue_before}
+        }},
+        {"$count": "count"},
+    ]
+    return [{"$match": query}, {"$facet": facets}]
+
+
+def collect_stats(facets: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn facet output into count dicts and totals"""
+    stats: Dict[str, Any] = {
+        name: {str(row["_id"]): row["count"] for row in facets.get(name, []) if row["_id"]}
+        for name in GROUPED_FIELDS
+    }
+    for name in ("completed_today", "overdue"):
+        rows = facets.get(name) or [{}]
+        stats[name] = rows[0].get("count", 0)
+    return stats
+
+
+class AssignmentStatsCache:
+    """Facet results per filter, reused for a short TTL"""
+
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self.ttl_seconds = settings.ASSIGNMENT_STATS_CACHE_SECONDS if ttl_seconds is None else ttl_seconds
+        self._stats: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    async def get(self, query: Dict[str, Any], use_cache: bool = True) -> Dict[str, Any]:
+        """Breakdowns for instances matching `query` (one aggregation on a miss)"""
+        key = json.dumps(query, sort_keys=True, default=str)
+        now = time.monotonic()
+        cached = self._stats.get(key)
+        if use_cache and cached and now - cached[0] < self.ttl_seconds:
+            return cached[1]
+
+        utcnow = datetime.utcnow()
+        today_start = utcnow.replace(hour=0, minute=0, second=0, microsecond=0)
+        rows = await WorkflowInstance.aggregate(
+            assignment_stats_pipeline(query, today_start, utcnow - OVERDUE_AFTER)
+        ).to_list()
+        stats = collect_stats(rows[0] if rows else {})
+
+        if len(self._stats) >= STATS_CACHE_MAX_ENTRIES:
+            self._stats = {k: v for k, v in self._stats.items() if now - v[0] < self.ttl_seconds}
+            if len(self._stats) >= STATS_CACHE_MAX_ENTRIES:
+                self._stats.clear()
+        self._stats[key] = (now, stats)
+        return stats
+
+
+assignment_stats = AssignmentStatsCache()
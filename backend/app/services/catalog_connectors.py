@@ -6,6 +6,8 @@ CSV files, JSON APIs, Excel files, and geographic data formats.
 """
 
 import asyncio
+import random
+import time
 import asyncpg
 import pandas as pd
 import httpx
@@ -13,20 +15,150 @@ import json
 import csv
 import io
 from abc import ABC, abstractmethod
+from contextlib import aclosing, asynccontextmanager
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Union, Tuple
+from typing import Dict, Any, List, Optional, Union, Tuple, AsyncIterator
 from urllib.parse import urlparse
 import openpyxl
 
 from ..models.catalog import SourceConfig, ColumnSchema, ColumnType, SyncResult, CatalogStatus
+from ..core.config import settings
 from ..core.logging_config import get_workflow_logger
 
 logger = get_workflow_logger(__name__)
 
 
+# Rows handed to the sync pipeline per batch
+SYNC_BATCH_SIZE = 1000
+
+# Non-null values kept per column for type inference
+SCHEMA_SAMPLE_SIZE = 1000
+
+_DATE_FORMATS = [
+    "%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%Y-%m-%dT%H:%M:%S"
+]
+
+_INTEGER_PATTERN = r"[+-]?\d+"
+_BOOLEAN_LITERALS = ["true", "false", "0", "1"]
+
+
+def infer_column_type(sample_values: List[Any]) -> ColumnType:
+    """
+    Infer a column type from sample values with vectorized checks.
+
+    Null and blank values are ignored. Checks run in order of specificity:
+    integer, float, boolean, datetime, falling back to string.
+    """
+    values = pd.Series(sample_values, dtype=object)
+    as_text = values.astype(str).str.strip()
+    present = values.notna() & (as_text != "")
+    values = values[present]
+    as_text = as_text[present]
+
+    if values.empty:
+        return ColumnType.STRING
+
+    value_types = values.map(type)
+    is_bool = value_types == bool
+
+    if is_bool.all():
+        return ColumnType.BOOLEAN
+
+    if (~is_bool & as_text.str.fullmatch(_INTEGER_PATTERN)).all():
+        return ColumnType.INTEGER
+
+    if (~is_bool & pd.to_numeric(as_text, errors="coerce").notna()).all():
+        return ColumnType.FLOAT
+
+    if (is_bool | as_text.str.lower().isin(_BOOLEAN_LITERALS)).all():
+        return ColumnType.BOOLEAN
+
+    is_date = values.map(lambda v: isinstance(v, datetime)).astype(bool)
+    for fmt in _DATE_FORMATS:
+        if is_date.all():
+            break
+        pending = ~is_date
+        parsed = pd.to_datetime(as_text[pending], format=fmt, errors="coerce")
+        is_date[pending] = parsed.notna()
+    if is_date.all():
+        return ColumnType.DATETIME
+
+    return ColumnType.STRING
+
+
+class SchemaSampler:
+    """
+    Single-pass schema inference over streamed row batches.
+
+    Keeps a bounded reservoir of non-null values per column (Algorithm R), so
+    inference cost depends on the sample size and not on the table size.
+    """
+
+    def __init__(self, sample_size: int = SCHEMA_SAMPLE_SIZE, seed: Optional[int] = None):
+        self.sample_size = sample_size
+        self._random = random.Random(seed)
+        self._samples: Dict[str, List[Any]] = {}
+        self._seen: Dict[str, int] = {}
+        self._nullable: Dict[str, bool] = {}
+        self.rows_observed = 0
+
+    def observe(self, rows: List[Dict[str, Any]]) -> None:
+        """Feed a batch of rows into the per-column reservoirs"""
+        for row in rows:
+            self.rows_observed += 1
+            # Columns absent from this row count as null
+            for column in self._samples.keys() - row.keys():
+                self._nullable[column] = True
+
+            for column, value in row.items():
+                if column not in self._samples:
+                    self._samples[column] = []
+                    self._seen[column] = 0
+                    # Rows seen before this column appeared lacked it
+                    self._nullable[column] = self.rows_observed > 1
+
+                if value is None or (isinstance(value, str) and not value.strip()):
+                    self._nullable[column] = True
+                    continue
+
+                seen = self._seen[column] + 1
+                self._seen[column] = seen
+                sample = self._samples[column]
+                if len(sample) < self.sample_size:
+                    sample.append(value)
+                else:
+                    slot = self._random.randrange(seen)
+                    if slot < self.sample_size:
+                        sample[slot] = value
+
+    @property
+    def columns(self) -> List[str]:
+        """Columns in first-seen order"""
+        return list(self._samples.keys())
+
+    def infer(self, description_prefix: str, sort_columns: bool = False) -> List[ColumnSchema]:
+        """Build column schemas from the sampled values"""
+        columns = sorted(self._samples) if sort_columns else self.columns
+        return [
+            ColumnSchema(
+                name=column,
+                type=infer_column_type(self._samples[column]),
+                nullable=self._nullable[column],
+                description=f"{description_prefix}: {column}"
+            )
+            for column in columns
+        ]
+
+
 class BaseConnector(ABC):
     """Base class for all catalog data connectors"""
 
+    # Prefix for inferred column descriptions
+    schema_description: str = "Column"
+    # Whether inferred columns are sorted by name instead of first-seen order
+    sort_schema_columns: bool = False
+
     def __init__(self, config: SourceConfig):
         self.config = config
 
@@ -40,78 +172,147 @@ class BaseConnector(ABC):
         """Fetch data from source"""
         pass
 
-    @abstractmethod
-    async def infer_schema(self) -> List[ColumnSchema]:
-        """Infer schema from data source"""
-        pass
-
     @abstractmethod
     async def validate_config(self) -> List[str]:
         """Validate connector configuration"""
         pass
 
+    async def iter_batches(self, batch_size: int = SYNC_BATCH_SIZE) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream source rows in batches.
+
+        Connectors that can read incrementally override this; the default
+        fetches once and slices.
+        """
+        data = await self.fetch_data()
+        for start in range(0, len(data), batch_size):
+            yield data[start:start + batch_size]
+
+    def schema_rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Shape rows for schema inference (e.g. flatten nested objects)"""
+        return rows
+
+    def new_schema_sampler(self, sample_size: int = SCHEMA_SAMPLE_SIZE) -> SchemaSampler:
+        """Create a sampler to feed while streaming batches"""
+        return SchemaSampler(sample_size=sample_size)
+
+    def build_schema(self, sampler: SchemaSampler) -> List[ColumnSchema]:
+        """Turn a fed sampler into column schemas for this connector"""
+        return sampler.infer(self.schema_description, sort_columns=self.sort_schema_columns)
+
+    async def infer_schema(self, sample_data: Optional[List[Dict[str, Any]]] = None) -> List[ColumnSchema]:
+        """
+        Infer schema from data source.
+
+        Pass already fetched rows as sample_data to avoid reading the source
+        again; otherwise the source is read once in batches.
+        """
+        sampler = self.new_schema_sampler()
+        if sample_data is not None:
+            sampler.observe(self.schema_rows(sample_data))
+        else:
+            async for batch in self.iter_batches():
+                sampler.observe(self.schema_rows(batch))
+        return self.build_schema(sampler)
+
     def _infer_column_type(self, sample_values: List[Any]) -> ColumnType:
         """Infer column type from sample values"""
-        # Remove null/None values for inference
-        non_null_values = [v for v in sample_values if v is not None and str(v).strip() != ""]
-
-        if not non_null_values:
-            return ColumnType.STRING
-
-        # Check if all values are integers
-        if all(isinstance(v, int) or (isinstance(v, str) and v.isdigit()) for v in non_null_values):
-            return ColumnType.INTEGER
-
-        # Check if all values are floats
-        if all(self._is_float(v) for v in non_null_values):
-            return ColumnType.FLOAT
-
-        # Check if all values are booleans
-        if all(isinstance(v, bool) or str(v).lower() in ['true', 'false', '0', '1'] for v in non_null_values):
-            return ColumnType.BOOLEAN
-
-        # Check if all values look like dates
-        if all(self._is_date(v) for v in non_null_values):
-            return ColumnType.DATETIME
+        return infer_column_type(sample_values)
+
+
+class SQLPoolRegistry:
+    """
+    Shared asyncpg pools for SQL catalog sources, keyed by connection string.
+
+    Pools are created on first use, bounded in size, and closed once they
+    have been idle longer than the idle timeout. Connections live across
+    tests, previews and syncs, so repeat calls skip TCP/TLS/auth setup and
+    reuse the prepared statement for the catalog query from asyncpg's
+    per-connection statement cache.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, idle_timeout_seconds: Optional[int] = None):
+        self.max_size = max_size or settings.CATALOG_SQL_POOL_MAX_SIZE
+        self.idle_timeout_seconds = idle_timeout_seconds or settings.CATALOG_SQL_POOL_IDLE_SECONDS
+        self._pools: Dict[str, asyncpg.Pool] = {}
+        self._last_used: Dict[str, float] = {}
+        self._in_use: Dict[str, int] = {}
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def get_pool(self, connection_string: str) -> asyncpg.Pool:
+        """Get the pool for a connection string, creating it lazily"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            await self._close_idle_locked()
+
+            pool = self._pools.get(connection_string)
+            if pool is None:
+                pool = await asyncpg.create_pool(
+                    connection_string,
+                    min_size=0,
+                    max_size=self.max_size,
+                    max_inactive_connection_lifetime=self.idle_timeout_seconds
+                )
+                self._pools[connection_string] = pool
+                logger.info(f"Created SQL catalog pool (max_size={self.max_size})")
 
-        # Default to string
-        return ColumnType.STRING
+            self._last_used[connection_string] = time.monotonic()
+            return pool
 
-    def _is_float(self, value: Any) -> bool:
-        """Check if value can be converted to float"""
+    @asynccontextmanager
+    async def acquire(self, connection_string: str) -> AsyncIterator[asyncpg.Connection]:
+        """Borrow a pooled connection for the given source"""
+        pool = await self.get_pool(connection_string)
+        self._in_use[connection_string] = self._in_use.get(connection_string, 0) + 1
         try:
-            float(value)
-            return True
-        except (ValueError, TypeError):
-            return False
-
-    def _is_date(self, value: Any) -> bool:
-        """Check if value looks like a date"""
-        if isinstance(value, datetime):
-            return True
-
-        if isinstance(value, str):
-            # Common date formats
-            date_formats = [
-                "%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%Y-%m-%d %H:%M:%S",
-                "%d/%m/%Y %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%Y-%m-%dT%H:%M:%S"
-            ]
-            for fmt in date_formats:
-                try:
-                    datetime.strptime(value, fmt)
-                    return True
-                except ValueError:
-                    continue
-
-        return False
+            async with pool.acquire() as connection:
+                yield connection
+        finally:
+            self._in_use[connection_string] -= 1
+            self._last_used[connection_string] = time.monotonic()
+
+    async def close_idle(self) -> int:
+        """Close pools that have been idle past the timeout"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            return await self._close_idle_locked()
+
+    async def close_all(self) -> None:
+        """Close every pool (application shutdown)"""
+        pools = list(self._pools.values())
+        self._pools.clear()
+        self._last_used.clear()
+        self._in_use.clear()
+        for pool in pools:
+            await pool.close()
+
+    async def _close_idle_locked(self) -> int:
+        now = time.monotonic()
+        idle = [
+            key for key, last_used in self._last_used.items()
+            if not self._in_use.get(key) and now - last_used > self.idle_timeout_seconds
+        ]
+        for key in idle:
+            pool = self._pools.pop(key, None)
+            self._last_used.pop(key, None)
+            self._in_use.pop(key, None)
+            if pool is not None:
+                await pool.close()
+        if idle:
+            logger.info(f"Closed {len(idle)} idle SQL catalog pool(s)")
+        return len(idle)
+
+
+sql_pool_registry = SQLPoolRegistry()
 
 
 class SQLConnector(BaseConnector):
     """Connector for SQL databases (PostgreSQL, MySQL, etc.)"""
 
-    def __init__(self, config: SourceConfig):
-        super().__init__(config)
-        self.connection = None
+    schema_description = "Column from SQL query"
 
     async def validate_config(self) -> List[str]:
         """Validate SQL configuration"""
@@ -128,10 +329,8 @@ class SQLConnector(BaseConnector):
     async def connect(self) -> bool:
         """Test connection to database"""
         try:
-            if self.connection:
-                await self.connection.close()
-
-            self.connection = await asyncpg.connect(self.config.connection_string)
+            async with sql_pool_registry.acquire(self.config.connection_string) as connection:
+                await connection.fetchval("SELECT 1")
             return True
         except Exception as e:
             logger.error(f"SQL connection failed: {str(e)}")
@@ -139,17 +338,12 @@ class SQLConnector(BaseConnector):
 
     async def fetch_data(self) -> List[Dict[str, Any]]:
         """Fetch data using SQL query"""
-        if not self.connection:
-            if not await self.connect():
-                raise ConnectionError("Failed to connect to database")
-
         try:
-            rows = await self.connection.fetch(self.config.query)
-            data = []
-            for row in rows:
-                # Convert asyncpg.Record to dict
-                row_dict = dict(row)
-                data.append(row_dict)
+            async with sql_pool_registry.acquire(self.config.connection_string) as connection:
+                rows = await connection.fetch(self.config.query)
+
+            # Convert asyncpg.Record to dict
+            data = [dict(row) for row in rows]
 
             logger.info(f"Fetched {len(data)} rows from SQL database")
             return data
@@ -157,44 +351,33 @@ class SQLConnector(BaseConnector):
         except Exception as e:
             logger.error(f"SQL query failed: {str(e)}")
             raise
-        finally:
-            if self.connection:
-                await self.connection.close()
-                self.connection = None
-
-    async def infer_schema(self) -> List[ColumnSchema]:
-        """Infer schema from SQL query results"""
-        # Get sample data
-        sample_data = await self.fetch_data()
-
-        if not sample_data:
-            return []
-
-        schemas = []
-        first_row = sample_data[0]
-
-        for column_name in first_row.keys():
-            # Get sample values for type inference
-            sample_values = [row.get(column_name) for row in sample_data[:100]]
-            column_type = self._infer_column_type(sample_values)
-
-            # Check if column has null values
-            nullable = any(v is None for v in sample_values)
 
-            schema = ColumnSchema(
-                name=column_name,
-                type=column_type,
-                nullable=nullable,
-                description=f"Column from SQL query: {column_name}"
-            )
-            schemas.append(schema)
+    async def iter_batches(self, batch_size: int = SYNC_BATCH_SIZE) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream query results through a server-side cursor"""
+        total = 0
+        try:
+            async with sql_pool_registry.acquire(self.config.connection_string) as connection:
+                async with connection.transaction():
+                    cursor = await connection.cursor(self.config.query)
+                    while True:
+                        rows = await cursor.fetch(batch_size)
+                        if not rows:
+                            break
+                        total += len(rows)
+                        yield [dict(row) for row in rows]
+
+            logger.info(f"Streamed {total} rows from SQL database")
 
-        return schemas
+        except Exception as e:
+            logger.error(f"SQL query failed: {str(e)}")
+            raise
 
 
 class CSVConnector(BaseConnector):
     """Connector for CSV files (upload or download from URL)"""
 
+    schema_description = "Column from CSV"
+
     async def validate_config(self) -> List[str]:
         """Validate CSV configuration"""
         errors = []
@@ -247,22 +430,8 @@ class CSVConnector(BaseConnector):
                     )
                     response.raise_for_status()
                     csv_content = response.text
-            elif self.config.uploaded_file_id:
-                # Read from uploaded file
-                from pathlib import Path
-                upload_dir = Path("/app/uploads/catalog-files")
-                file_pattern = f"{self.config.uploaded_file_id}.*"
-                matching_files = list(upload_dir.glob(file_pattern))
-
-                if not matching_files:
-                    raise FileNotFoundError(f"Uploaded file with ID {self.config.uploaded_file_id} not found")
-
-                file_path = matching_files[0]
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    csv_content = f.read()
             else:
-                # Read from file path (in production, handle file storage properly)
-                with open(self.config.file_path, 'r', encoding='utf-8') as f:
+                with open(self._local_file_path(), 'r', encoding='utf-8') as f:
                     csv_content = f.read()
 
             # Parse CSV
@@ -271,13 +440,7 @@ class CSVConnector(BaseConnector):
                 delimiter=self.config.delimiter or ','
             )
 
-            data = []
-            for row in csv_reader:
-                # Convert empty strings to None
-                clean_row = {}
-                for key, value in row.items():
-                    clean_row[key] = value if value.strip() else None
-                data.append(clean_row)
+            data = [self._clean_row(row) for row in csv_reader]
 
             logger.info(f"Fetched {len(data)} rows from CSV")
             return data
@@ -286,38 +449,65 @@ class CSVConnector(BaseConnector):
             logger.error(f"CSV fetch failed: {str(e)}")
             raise
 
-    async def infer_schema(self) -> List[ColumnSchema]:
-        """Infer schema from CSV data"""
-        sample_data = await self.fetch_data()
+    async def iter_batches(self, batch_size: int = SYNC_BATCH_SIZE) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream local CSV files row by row; URL sources are fetched once"""
+        if self.config.url:
+            async for batch in super().iter_batches(batch_size):
+                yield batch
+            return
 
-        if not sample_data:
-            return []
+        total = 0
+        try:
+            with open(self._local_file_path(), 'r', encoding='utf-8', newline='') as f:
+                csv_reader = csv.DictReader(f, delimiter=self.config.delimiter or ',')
+                batch = []
+                for row in csv_reader:
+                    batch.append(self._clean_row(row))
+                    if len(batch) >= batch_size:
+                        total += len(batch)
+                        yield batch
+                        batch = []
+                if batch:
+                    total += len(batch)
+                    yield batch
+
+            logger.info(f"Streamed {total} rows from CSV")
 
-        schemas = []
-        first_row = sample_data[0]
+        except Exception as e:
+            logger.error(f"CSV fetch failed: {str(e)}")
+            raise
 
-        for column_name in first_row.keys():
-            # Get sample values for type inference
-            sample_values = [row.get(column_name) for row in sample_data[:100]]
-            column_type = self._infer_column_type(sample_values)
+    def _local_file_path(self) -> str:
+        """Resolve the uploaded file or configured path for local reads"""
+        if self.config.uploaded_file_id:
+            from pathlib import Path
+            upload_dir = Path("/app/uploads/catalog-files")
+            file_pattern = f"{self.config.uploaded_file_id}.*"
+            matching_files = list(upload_dir.glob(file_pattern))
 
-            # Check if column has null values
-            nullable = any(v is None or str(v).strip() == "" for v in sample_values)
+            if not matching_files:
+                raise FileNotFoundError(f"Uploaded file with ID {self.config.uploaded_file_id} not found")
 
-            schema = ColumnSchema(
-                name=column_name,
-                type=column_type,
-                nullable=nullable,
-                description=f"Column from CSV: {column_name}"
-            )
-            schemas.append(schema)
+            return str(matching_files[0])
+
+        # Read from file path (in production, handle file storage properly)
+        return self.config.file_path
 
-        return schemas
+    @staticmethod
+    def _clean_row(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert empty strings to None"""
+        return {
+            key: value if value is not None and value.strip() else None
+            for key, value in row.items()
+        }
 
 
 class JSONConnector(BaseConnector):
     """Connector for JSON APIs and files"""
 
+    schema_description = "Column from JSON"
+    sort_schema_columns = True
+
     async def validate_config(self) -> List[str]:
         """Validate JSON configuration"""
         errors = []
@@ -385,40 +575,9 @@ class JSONConnector(BaseConnector):
             logger.error(f"JSON fetch failed: {str(e)}")
             raise
 
-    async def infer_schema(self) -> List[ColumnSchema]:
-        """Infer schema from JSON data"""
-        sample_data = await self.fetch_data()
-
-        if not sample_data:
-            return []
-
-        # Flatten nested objects and collect all keys
-        all_keys = set()
-        flattened_data = []
-
-        for row in sample_data[:100]:  # Sample first 100 rows
-            flat_row = self._flatten_dict(row)
-            flattened_data.append(flat_row)
-            all_keys.update(flat_row.keys())
-
-        schemas = []
-        for key in sorted(all_keys):
-            # Get sample values for type inference
-            sample_values = [row.get(key) for row in flattened_data]
-            column_type = self._infer_column_type(sample_values)
-
-            # Check if column has null values
-            nullable = any(v is None for v in sample_values)
-
-            schema = ColumnSchema(
-                name=key,
-                type=column_type,
-                nullable=nullable,
-                description=f"Column from JSON: {key}"
-            )
-            schemas.append(schema)
-
-        return schemas
+    def schema_rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Flatten nested objects so nested keys become dotted columns"""
+        return [self._flatten_dict(row) for row in rows]
 
     def _flatten_dict(self, d: Dict[str, Any], parent_key: str = '', sep: str = '.') -> Dict[str, Any]:
         """Flatten nested dictionary"""
@@ -438,6 +597,8 @@ class JSONConnector(BaseConnector):
 class ExcelConnector(BaseConnector):
     """Connector for Excel files (XLS/XLSX)"""
 
+    schema_description = "Column from Excel"
+
     async def validate_config(self) -> List[str]:
         """Validate Excel configuration"""
         errors = []
@@ -529,34 +690,6 @@ class ExcelConnector(BaseConnector):
             logger.error(f"Excel fetch failed: {str(e)}")
             raise
 
-    async def infer_schema(self) -> List[ColumnSchema]:
-        """Infer schema from Excel data"""
-        sample_data = await self.fetch_data()
-
-        if not sample_data:
-            return []
-
-        schemas = []
-        first_row = sample_data[0]
-
-        for column_name in first_row.keys():
-            # Get sample values for type inference
-            sample_values = [row.get(column_name) for row in sample_data[:100]]
-            column_type = self._infer_column_type(sample_values)
-
-            # Check if column has null values
-            nullable = any(v is None for v in sample_values)
-
-            schema = ColumnSchema(
-                name=column_name,
-                type=column_type,
-                nullable=nullable,
-                description=f"Column from Excel: {column_name}"
-            )
-            schemas.append(schema)
-
-        return schemas
-
 
 class ConnectorFactory:
     """Factory for creating appropriate connectors based on source type"""
@@ -614,11 +747,14 @@ class CatalogSyncService:
                     duration_seconds=0
                 )
 
-            # Fetch data
-            data = await connector.fetch_data()
+            # Fetch data and infer schema in the same pass over the source
+            data = []
+            sampler = connector.new_schema_sampler()
+            async for batch in connector.iter_batches():
+                sampler.observe(connector.schema_rows(batch))
+                data.extend(batch)
 
-            # Infer schema from the fetched data
-            inferred_schema = await connector.infer_schema()
+            inferred_schema = connector.build_schema(sampler)
 
             # Update catalog schema
             catalog.schema = inferred_schema
@@ -642,6 +778,10 @@ class CatalogSyncService:
             catalog.status = CatalogStatus.ACTIVE
             await catalog.save()
 
+            # Schema may have changed, so plans compiled against it are stale
+            from .catalog_permission_service import CatalogPermissionService
+            CatalogPermissionService.invalidate_permission_plans(catalog_id)
+
             logger.info(f"Updated catalog schema with {len(inferred_schema)} columns")
 
             logger.info(f"Successfully synced catalog {catalog_id}: {len(data)} rows")
@@ -691,8 +831,11 @@ class CatalogSyncService:
             source_config = SourceConfig(**config)
             connector = ConnectorFactory.create_connector(source_type, source_config)
 
-            data = await connector.fetch_data()
-            return data[:limit]
+            # Only the first batch is read; streaming sources stop there
+            async with aclosing(connector.iter_batches(batch_size=limit)) as batches:
+                async for batch in batches:
+                    return batch[:limit]
+            return []
         except Exception as e:
             logger.error(f"Data preview failed: {str(e)}")
             raise
\ No newline at end of file
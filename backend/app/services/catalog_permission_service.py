@@ -5,16 +5,222 @@ This service handles permission checking, group-based access control,
 and integration with Keycloak groups.
 """
 
-from typing import Dict, Any, List, Set, Optional
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Set, Optional, Tuple, Callable, Iterable, Iterator
 from ..models.catalog import Catalog, PermissionRule
 from ..core.logging_config import get_workflow_logger
 
 logger = get_workflow_logger(__name__)
 
+# Upper bound on compiled plans kept in memory (LRU eviction beyond this).
+PLAN_CACHE_MAX_ENTRIES = 1024
+
+RowPredicate = Callable[[Dict[str, Any]], bool]
+
+
+@dataclass(frozen=True)
+class CatalogPermissionPlan:
+    """
+    Compiled permissions of one catalog for one set of user groups.
+
+    Built once per (catalog version, group set) and reused across requests,
+    so the rule loops in the Catalog model only run on a cache miss.
+    """
+    can_view: bool
+    visible_columns: Tuple[str, ...]
+    row_filters: Dict[str, Any] = field(default_factory=dict)
+    max_rows: Optional[int] = None
+    row_predicate: Optional[RowPredicate] = None
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        """Check a raw (unprojected) row against the compiled row filters"""
+        return self.row_predicate is None or self.row_predicate(row)
+
+    def project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep only the columns visible under this plan"""
+        return {col: row[col] for col in self.visible_columns if col in row}
+
+    def apply(self, rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Lazily filter and project rows; max_rows is left to the caller"""
+        predicate = self.row_predicate
+        columns = self.visible_columns
+        for row in rows:
+            if predicate is None or predicate(row):
+                yield {col: row[col] for col in columns if col in row}
+
+
+def _compile_value_test(condition: Any) -> Callable[[Any], bool]:
+    """Compile a MongoDB-style condition into a test over a single value"""
+    if not isinstance(condition, dict):
+        return lambda value: value == condition
+
+    tests: List[Callable[[Any], bool]] = []
+    for op, op_value in condition.items():
+        if op == "$eq":
+            tests.append(lambda value, expected=op_value: value == expected)
+        elif op == "$ne":
+            tests.append(lambda value, expected=op_value: value != expected)
+        elif op == "$in":
+            tests.append(lambda value, allowed=op_value: value in allowed)
+        elif op == "$nin":
+            tests.append(lambda value, denied=op_value: value not in denied)
+        elif op == "$and" and isinstance(op_value, list):
+            tests.extend(_compile_value_test(sub) for sub in op_value)
+        # Unknown operators are ignored, as in CatalogService._apply_row_filters
+
+    if not tests:
+        return lambda value: True
+    if len(tests) == 1:
+        return tests[0]
+    return lambda value: all(test(value) for test in tests)
+
+
+def compile_row_predicate(conditions: List[Tuple[str, Any]]) -> Optional[RowPredicate]:
+    """
+    Compile (field, condition) pairs into a single row predicate.
+
+    All conditions must hold (AND), and a row missing a filtered field never
+    matches. Returns None when there is nothing to filter.
+    """
+    if not conditions:
+        return None
+
+    field_tests = [(name, _compile_value_test(condition)) for name, condition in conditions]
+
+    def predicate(row: Dict[str, Any]) -> bool:
+        for name, test in field_tests:
+            if name not in row or not test(row[name]):
+                return False
+        return True
+
+    return predicate
+
+
+_plan_cache: "OrderedDict[Tuple[Any, ...], CatalogPermissionPlan]" = OrderedDict()
+
+
+def _plan_cache_key(catalog: Catalog, user_groups: Iterable[str]) -> Tuple[Any, ...]:
+    # updated_at is bumped on permission/schema edits and last_sync on data
+    # syncs, so a stale plan is never served even across API replicas.
+    return (
+        catalog.catalog_id,
+        catalog.updated_at,
+        catalog.last_sync,
+        tuple(sorted(set(user_groups))),
+    )
+
+
+def build_permission_plan(catalog: Catalog, user_groups: Iterable[str]) -> CatalogPermissionPlan:
+    """Compile the permission rules of a catalog for the given groups"""
+    groups = set(user_groups)
+    all_columns = [col.name for col in catalog.schema]
+
+    if not catalog.permissions:
+        return CatalogPermissionPlan(can_view=True, visible_columns=tuple(all_columns))
+
+    applicable = [
+        rule for rule in catalog.permissions
+        if rule.group_id in groups and rule.can_view
+    ]
+    if not applicable:
+        return CatalogPermissionPlan(can_view=False, visible_columns=())
+
+    if any(not rule.visible_columns for rule in applicable):
+        visible_columns = tuple(all_columns)
+    else:
+        # Keep schema order, then any granted column missing from the schema
+        granted = []
+        for rule in applicable:
+            for col in rule.visible_columns:
+                if col not in granted:
+                    granted.append(col)
+        granted_set = set(granted)
+        ordered = [col for col in all_columns if col in granted_set]
+        ordered.extend(col for col in granted if col not in ordered)
+        visible_columns = tuple(ordered)
+
+    conditions = [
+        (name, condition)
+        for rule in applicable
+        for name, condition in (rule.row_filters or {}).items()
+    ]
+
+    row_filters: Dict[str, Any] = {}
+    for name, condition in conditions:
+        if name in row_filters:
+            existing = row_filters[name]
+            if isinstance(existing, dict) and "$and" in existing:
+                existing["$and"].append(condition)
+            else:
+                row_filters[name] = {"$and": [existing, condition]}
+        else:
+            row_filters[name] = condition
+
+    max_rows_values = [rule.max_rows for rule in applicable if rule.max_rows is not None]
+
+    return CatalogPermissionPlan(
+        can_view=True,
+        visible_columns=visible_columns,
+        row_filters=row_filters,
+        max_rows=min(max_rows_values) if max_rows_values else None,
+        row_predicate=compile_row_predicate(conditions)
+    )
+
 
 class CatalogPermissionService:
     """Service for managing catalog permissions and access control"""
 
+    @staticmethod
+    def get_permission_plan(catalog: Catalog, user_groups: List[str]) -> CatalogPermissionPlan:
+        """Get the compiled permission plan for user groups, cached per catalog version"""
+        key = _plan_cache_key(catalog, user_groups)
+        plan = _plan_cache.get(key)
+        if plan is not None:
+            _plan_cache.move_to_end(key)
+            return plan
+
+        plan = build_permission_plan(catalog, user_groups)
+        _plan_cache[key] = plan
+        if len(_plan_cache) > PLAN_CACHE_MAX_ENTRIES:
+            _plan_cache.popitem(last=False)
+        return plan
+
+    @staticmethod
+    def invalidate_permission_plans(catalog_id: Optional[str] = None) -> None:
+        """Drop cached plans for a catalog, or for every catalog when no ID is given"""
+        if catalog_id is None:
+            _plan_cache.clear()
+            return
+
+        for key in [key for key in _plan_cache if key[0] == catalog_id]:
+            del _plan_cache[key]
+
+    @staticmethod
+    def accessible_catalogs_query(user_groups: List[str]) -> Dict[str, Any]:
+        """MongoDB filter matching catalogs visible to any of the user groups"""
+        return {
+            "$or": [
+                {"permissions": {"$size": 0}},
+                {
+                    "permissions": {
+                        "$elemMatch": {
+                            "group_id": {"$in": list(user_groups)},
+                            "can_view": True
+                        }
+                    }
+                }
+            ]
+        }
+
+    @staticmethod
+    async def _save_permissions(catalog: Catalog) -> None:
+        """Persist permission changes and drop plans compiled from the old rules"""
+        catalog.updated_at = datetime.utcnow()
+        await catalog.save()
+        CatalogPermissionService.invalidate_permission_plans(catalog.catalog_id)
+
     @staticmethod
     async def add_permission_rule(
         catalog_id: str,
@@ -45,7 +251,7 @@ class CatalogPermissionService:
         )
         catalog.permissions.append(new_rule)
 
-        await catalog.save()
+        await CatalogPermissionService._save_permissions(catalog)
         logger.info(f"Added permission rule for group {group_id} on catalog {catalog_id}")
         return catalog
 
@@ -64,7 +270,7 @@ class CatalogPermissionService:
         ]
 
         if len(catalog.permissions) < original_count:
-            await catalog.save()
+            await CatalogPermissionService._save_permissions(catalog)
             logger.info(f"Removed permission rule for group {group_id} on catalog {catalog_id}")
         else:
             logger.warning(f"No permission rule found for group {group_id} on catalog {catalog_id}")
@@ -88,7 +294,7 @@ class CatalogPermissionService:
             new_rules.append(rule)
 
         catalog.permissions = new_rules
-        await catalog.save()
+        await CatalogPermissionService._save_permissions(catalog)
         logger.info(f"Updated {len(new_rules)} permission rules for catalog {catalog_id}")
         return catalog
 
@@ -98,56 +304,12 @@ class CatalogPermissionService:
         user_groups: List[str]
     ) -> Dict[str, Any]:
         """Get effective permissions for user based on their groups"""
-        if not catalog.permissions:
-            # No permissions defined = accessible to all with all columns
-            all_columns = [col.name for col in catalog.schema]
-            return {
-                "can_view": True,
-                "visible_columns": all_columns,
-                "row_filters": {},
-                "max_rows": None
-            }
-
-        # Check if user has any access
-        has_access = False
-        visible_columns = set()
-        combined_row_filters = {}
-        max_rows = None
-
-        for rule in catalog.permissions:
-            if rule.group_id in user_groups and rule.can_view:
-                has_access = True
-
-                # Collect visible columns
-                if not rule.visible_columns:  # Empty list means all columns
-                    visible_columns = {col.name for col in catalog.schema}
-                else:
-                    visible_columns.update(rule.visible_columns)
-
-                # Combine row filters
-                if rule.row_filters:
-                    for field, condition in rule.row_filters.items():
-                        if field in combined_row_filters:
-                            # Combine with AND logic
-                            if isinstance(combined_row_filters[field], dict) and "$and" in combined_row_filters[field]:
-                                combined_row_filters[field]["$and"].append(condition)
-                            else:
-                                combined_row_filters[field] = {
-                                    "$and": [combined_row_filters[field], condition]
-                                }
-                        else:
-                            combined_row_filters[field] = condition
-
-                # Apply most restrictive max_rows
-                if rule.max_rows is not None:
-                    if max_rows is None or rule.max_rows < max_rows:
-                        max_rows = rule.max_rows
-
+        plan = CatalogPermissionService.get_permission_plan(catalog, user_groups)
         return {
-            "can_view": has_access,
-            "visible_columns": list(visible_columns),
-            "row_filters": combined_row_filters,
-            "max_rows": max_rows
+            "can_view": plan.can_view,
+            "visible_columns": list(plan.visible_columns),
+            "row_filters": dict(plan.row_filters),
+            "max_rows": plan.max_rows
         }
 
     @staticmethod
@@ -157,7 +319,10 @@ class CatalogPermissionService:
     ) -> List[Catalog]:
         """Get all catalogs accessible to user"""
         if all_catalogs is None:
-            all_catalogs = await Catalog.find().to_list()
+            # Let MongoDB match permissions.group_id instead of loading every catalog
+            return await Catalog.find(
+                CatalogPermissionService.accessible_catalogs_query(user_groups)
+            ).to_list()
 
         accessible_catalogs = []
         for catalog in all_catalogs:
@@ -209,8 +374,8 @@ class CatalogPermissionService:
         column_name: str
     ) -> bool:
         """Check if user has permission to view specific column"""
-        visible_columns = catalog.get_visible_columns_for_user(user_groups)
-        return column_name in visible_columns
+        plan = CatalogPermissionService.get_permission_plan(catalog, user_groups)
+        return column_name in plan.visible_columns
 
     @staticmethod
     async def get_permission_summary(catalog: Catalog) -> Dict[str, Any]:
@@ -8,7 +8,7 @@ for catalogs that can be used in workflows.
 import asyncio
 import logging
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
 from beanie import PydanticObjectId
 from beanie.operators import In, And, Or
 from pymongo.errors import DuplicateKeyError
@@ -22,10 +22,14 @@ from ..models.catalog import (
     PermissionRule,
     SyncResult
 )
+from .catalog_permission_service import CatalogPermissionService, CatalogPermissionPlan
 from ..core.logging_config import get_workflow_logger
 
 logger = get_workflow_logger(__name__)
 
+# Rows read from MongoDB per cursor batch when exporting catalog data
+EXPORT_BATCH_SIZE = 500
+
 
 class CatalogNotFoundError(Exception):
     """Raised when a catalog is not found"""
@@ -122,22 +126,11 @@ class CatalogService:
         if tags:
             query_filters.append(In(Catalog.tags, tags))
 
-        # Build query
-        if query_filters:
-            query = And(*query_filters)
-        else:
-            query = {}
-
-        # Get all catalogs matching filters
-        all_catalogs = await Catalog.find(query).skip(skip).limit(limit).to_list()
-
-        # Filter by user permissions
-        accessible_catalogs = []
-        for catalog in all_catalogs:
-            if catalog.is_accessible_by_user(user_groups):
-                accessible_catalogs.append(catalog)
+        # Filter by user permissions in the query itself so skip/limit page
+        # over accessible catalogs only
+        query_filters.append(CatalogPermissionService.accessible_catalogs_query(user_groups))
 
-        return accessible_catalogs
+        return await Catalog.find(And(*query_filters)).skip(skip).limit(limit).to_list()
 
     @staticmethod
     async def update_catalog(
@@ -163,6 +156,7 @@ class CatalogService:
         catalog.updated_at = datetime.utcnow()
 
         await catalog.save()
+        CatalogPermissionService.invalidate_permission_plans(catalog_id)
         logger.info(f"Updated catalog: {catalog_id} by {updated_by}")
         return catalog
 
@@ -176,6 +170,7 @@ class CatalogService:
 
         # Delete catalog
         await catalog.delete()
+        CatalogPermissionService.invalidate_permission_plans(catalog_id)
 
         logger.info(f"Deleted catalog: {catalog_id} by {deleted_by}")
         return True
@@ -195,7 +190,8 @@ class CatalogService:
         catalog = await CatalogService.get_catalog(catalog_id)
 
         # Check user access
-        if not catalog.is_accessible_by_user(user_groups):
+        plan = CatalogPermissionService.get_permission_plan(catalog, user_groups)
+        if not plan.can_view:
             raise CatalogPermissionError(f"User lacks access to catalog '{catalog_id}'")
 
         # Get catalog data
@@ -207,20 +203,11 @@ class CatalogService:
         if not data:
             return [], 0
 
-        # Apply user permissions
-        visible_columns = catalog.get_visible_columns_for_user(user_groups)
-        row_filters = catalog.get_row_filters_for_user(user_groups)
-        max_rows = catalog.get_max_rows_for_user(user_groups)
-
-        # Filter columns
-        filtered_data = []
-        for row in data:
-            filtered_row = {col: row.get(col) for col in visible_columns if col in row}
-            filtered_data.append(filtered_row)
-
-        # Apply row filters (basic implementation)
-        if row_filters:
-            filtered_data = CatalogService._apply_row_filters(filtered_data, row_filters)
+        # Apply user permissions: row filters run on the raw row (so they may
+        # reference hidden columns), then rows are projected to visible columns
+        visible_columns = plan.visible_columns
+        max_rows = plan.max_rows
+        filtered_data = list(plan.apply(data))
 
         # Apply search
         if search:
@@ -249,6 +236,59 @@ class CatalogService:
 
         return paginated_data, total_count
 
+    @staticmethod
+    async def get_export_plan(catalog_id: str, user_groups: List[str]) -> CatalogPermissionPlan:
+        """Resolve the permission plan for an export, failing before any row is read"""
+        catalog = await CatalogService.get_catalog(catalog_id)
+
+        plan = CatalogPermissionService.get_permission_plan(catalog, user_groups)
+        if not plan.can_view:
+            raise CatalogPermissionError(f"User lacks access to catalog '{catalog_id}'")
+
+        return plan
+
+    @staticmethod
+    async def stream_catalog_rows(
+        catalog_id: str,
+        plan: CatalogPermissionPlan,
+        batch_size: int = EXPORT_BATCH_SIZE
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream permission-filtered catalog rows in batches.
+
+        Rows are unwound server-side and read through a cursor, so only one
+        batch is held in memory at a time. The plan's max_rows cap applies
+        to the whole stream.
+        """
+        pipeline = [
+            {"$match": {"catalog_id": catalog_id}},
+            {"$unwind": "$data"},
+            {"$replaceRoot": {"newRoot": "$data"}}
+        ]
+        cursor = CatalogData.get_motor_collection().aggregate(pipeline, batchSize=batch_size)
+
+        remaining = plan.max_rows
+        batch: List[Dict[str, Any]] = []
+        try:
+            async for row in cursor:
+                if remaining is not None and remaining <= 0:
+                    break
+                if not plan.matches(row):
+                    continue
+
+                batch.append(plan.project(row))
+                if remaining is not None:
+                    remaining -= 1
+
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        finally:
+            await cursor.close()
+
+        if batch:
+            yield batch
+
     @staticmethod
     def _apply_row_filters(data: List[Dict[str, Any]], filters: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Apply row-level filters to data"""
@@ -341,10 +381,11 @@ class CatalogService:
         catalog = await CatalogService.get_catalog(catalog_id)
 
         # Check user access
-        if not catalog.is_accessible_by_user(user_groups):
+        plan = CatalogPermissionService.get_permission_plan(catalog, user_groups)
+        if not plan.can_view:
             raise CatalogPermissionError(f"User lacks access to catalog '{catalog_id}'")
 
-        visible_columns = catalog.get_visible_columns_for_user(user_groups)
+        visible_columns = plan.visible_columns
 
         # Return only visible column schemas
         visible_schema = []
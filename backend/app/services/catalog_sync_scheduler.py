@@ -0,0 +1,257 @@
+"""
+Background scheduler for catalog data syncs.
+
+Catalogs are refreshed from their sources every `source_config.refresh_rate_minutes`
+without an admin having to trigger it. Syncs run in a bounded pool of
+asyncio workers, concurrent requests for the same catalog share one run
+(single-flight), and a lease on the catalog document keeps several API
+replicas from syncing the same catalog at once. Catalogs whose syncs fail
+are retried with exponential backoff instead of on every tick, so a source
+that is down is not hammered.
+"""
+
+import asyncio
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from ..core.config import settings
+from ..core.logging_config import get_workflow_logger
+from ..models.catalog import Catalog, CatalogStatus, CatalogSyncSchedule, SourceType, SyncResult
+
+logger = get_workflow_logger(__name__)
+
+# Catalog statuses the scheduler refreshes on their interval
+SCHEDULED_STATUSES = [CatalogStatus.ACTIVE.value, CatalogStatus.ERROR.value]
+
+
+@dataclass
+class CatalogSyncStats:
+    """Running sync metrics for one catalog"""
+    runs: int = 0
+    failures: int = 0
+    total_rows: int = 0
+    total_duration_seconds: float = 0.0
+    last_rows: int = 0
+    last_duration_seconds: float = 0.0
+    last_rows_per_second: float = 0.0
+    last_finished_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+    def record(self, result: SyncResult) -> None:
+        self.runs += 1
+        self.last_duration_seconds = result.duration_seconds
+        self.last_finished_at = datetime.utcnow()
+        if result.success:
+            self.last_rows = result.rows_synced
+            self.total_rows += result.rows_synced
+            self.total_duration_seconds += result.duration_seconds
+            self.last_rows_per_second = (
+                result.rows_synced / result.duration_seconds
+                if result.duration_seconds > 0 else float(result.rows_synced)
+            )
+            self.last_error = None
+        else:
+            self.failures += 1
+            self.last_error = result.error_message
+
+
+class CatalogSyncScheduler:
+    """Runs catalog syncs on their refresh interval with bounded concurrency"""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        poll_interval_seconds: Optional[int] = None,
+        lease_seconds: Optional[int] = None
+    ):
+        self.max_concurrency = max_concurrency or settings.CATALOG_SYNC_MAX_CONCURRENCY
+        self.poll_interval_seconds = poll_interval_seconds or settings.CATALOG_SYNC_POLL_SECONDS
+        self.lease_seconds = lease_seconds or settings.CATALOG_SYNC_LEASE_SECONDS
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+        self._should_stop = False
+        self.stats: Dict[str, CatalogSyncStats] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._loop_task is not None and not self._loop_task.done()
+
+    async def start(self) -> None:
+        """Start the periodic scheduling loop"""
+        if self.running:
+            logger.warning("Catalog sync scheduler already running")
+            return
+
+        self._should_stop = False
+        self._loop_task = asyncio.create_task(self._scheduler_loop())
+        logger.info(
+            f"Catalog sync scheduler started (workers={self.max_concurrency}, "
+            f"poll={self.poll_interval_seconds}s)"
+        )
+
+    async def stop(self) -> None:
+        """Stop scheduling and cancel in-flight syncs"""
+        self._should_stop = True
+        tasks = [task for task in [self._loop_task, *self._inflight.values()] if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+        self._inflight.clear()
+        logger.info("Catalog sync scheduler stopped")
+
+    def trigger_sync(self, catalog_id: str) -> bool:
+        """
+        Schedule a sync without waiting for it.
+
+        Returns False when a sync for the catalog is already in flight.
+        """
+        if catalog_id in self._inflight:
+            return False
+        self._start_sync_task(catalog_id)
+        return True
+
+    async def request_sync(self, catalog_id: str) -> SyncResult:
+        """Sync a catalog, joining the in-flight run if there is one"""
+        task = self._inflight.get(catalog_id) or self._start_sync_task(catalog_id)
+        # Shield so a cancelled request does not abort a sync others may share
+        return await asyncio.shield(task)
+
+    def is_syncing(self, catalog_id: str) -> bool:
+        return catalog_id in self._inflight
+
+    def get_status(self) -> Dict[str, Any]:
+        """Snapshot of scheduler state and per-catalog sync metrics"""
+        return {
+            "running": self.running,
+            "max_concurrency": self.max_concurrency,
+            "poll_interval_seconds": self.poll_interval_seconds,
+            "in_flight": sorted(self._inflight),
+            "catalogs": {
+                catalog_id: asdict(stats) for catalog_id, stats in self.stats.items()
+            }
+        }
+
+    def _start_sync_task(self, catalog_id: str) -> asyncio.Task:
+        task = asyncio.create_task(self._run_sync(catalog_id))
+        self._inflight[catalog_id] = task
+        task.add_done_callback(lambda _: self._inflight.pop(catalog_id, None))
+        return task
+
+    async def _run_sync(self, catalog_id: str) -> SyncResult:
+        from .catalog_connectors import CatalogSyncService
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphore:
+            if not await self._acquire_lease(catalog_id):
+                logger.info(f"Catalog {catalog_id} is being synced by another worker, skipping")
+                return SyncResult(
+                    success=False,
+                    error_message="Sync already in progress"
+                )
+
+            result = None
+            try:
+                result = await CatalogSyncService.sync_catalog_data(catalog_id)
+            finally:
+                await self._release_lease(catalog_id, result)
+
+        self.stats.setdefault(catalog_id, CatalogSyncStats()).record(result)
+        logger.info(
+            f"Catalog {catalog_id} sync finished: success={result.success}, "
+            f"rows={result.rows_synced}, duration={result.duration_seconds:.2f}s"
+        )
+        return result
+
+    async def _acquire_lease(self, catalog_id: str) -> bool:
+        """Claim the catalog for this worker unless another holds a live lease"""
+        now = datetime.utcnow()
+        claimed = await Catalog.get_motor_collection().find_one_and_update(
+            {
+                "catalog_id": catalog_id,
+                "$or": [
+                    {"sync_lease_until": None},
+                    {"sync_lease_until": {"$lt": now}}
+                ]
+            },
+            {"$set": {"sync_lease_until": now + timedelta(seconds=self.lease_seconds)}},
+            projection={"_id": 1}
+        )
+        return claimed is not None
+
+    async def _release_lease(self, catalog_id: str, result: Optional[SyncResult] = None) -> None:
+        """Release the lease, recording the attempt when the sync ran"""
+        update: Dict[str, Any] = {"$set": {"sync_lease_until": None}}
+        if result is not None:
+            update["$set"]["last_sync_attempt"] = datetime.utcnow()
+            if result.success:
+                update["$set"]["sync_failures"] = 0
+            else:
+                update["$inc"] = {"sync_failures": 1}
+        try:
+            await Catalog.get_motor_collection().update_one(
+                {"catalog_id": catalog_id},
+                update
+            )
+        except Exception as e:
+            logger.error(f"Failed to release sync lease for catalog {catalog_id}: {str(e)}")
+
+    async def _scheduler_loop(self) -> None:
+        while not self._should_stop:
+            try:
+                for catalog_id in await self.find_due_catalogs():
+                    self.trigger_sync(catalog_id)
+
+                from .catalog_connectors import sql_pool_registry
+                await sql_pool_registry.close_idle()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Catalog sync scheduler tick failed: {str(e)}")
+
+            await asyncio.sleep(self.poll_interval_seconds)
+
+    async def find_due_catalogs(self, now: Optional[datetime] = None) -> List[str]:
+        """IDs of catalogs whose refresh interval has elapsed"""
+        now = now or datetime.utcnow()
+        catalogs = await Catalog.find(
+            {"status": {"$in": SCHEDULED_STATUSES}}
+        ).project(CatalogSyncSchedule).to_list()
+        return [
+            catalog.catalog_id for catalog in catalogs
+            if self.is_due(catalog, now) and catalog.catalog_id not in self._inflight
+        ]
+
+    @staticmethod
+    def is_due(catalog: CatalogSyncSchedule, now: datetime) -> bool:
+        """
+        Whether a catalog should be refreshed from its source now.
+
+        After N consecutive failures the interval is refresh_rate * 2^(N-1),
+        capped at CATALOG_SYNC_MAX_BACKOFF_MINUTES, counted from the last attempt.
+        """
+        # Uploaded files never change upstream, so there is nothing to refresh
+        if catalog.source_type == SourceType.CSV_UPLOAD or catalog.source_config.uploaded_file_id:
+            return False
+
+        refresh_minutes = catalog.source_config.refresh_rate_minutes
+        if not refresh_minutes or refresh_minutes <= 0:
+            return False
+
+        last_attempt = catalog.last_sync_attempt or catalog.last_sync
+        if last_attempt is None:
+            return True
+
+        interval = refresh_minutes
+        if catalog.sync_failures > 0:
+            max_backoff = max(settings.CATALOG_SYNC_MAX_BACKOFF_MINUTES, refresh_minutes)
+            interval = min(refresh_minutes * 2 ** min(catalog.sync_failures - 1, 20), max_backoff)
+
+        return last_attempt + timedelta(minutes=interval) <= now
+
+
+catalog_sync_scheduler = CatalogSyncScheduler()
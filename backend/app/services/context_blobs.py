@@ -0,0 +1,161 @@
+"""
+Content-addressed storage for binary fields of submitted workflow data.
+
+Citizen portals submit files as `{base64, filename, content_type}` dicts in
+JSON bodies. Kept in `WorkflowInstance.context`, every executor tick reloaded
+and re-saved them until an S3UploadOperator cleaned them up (or the executor's
+blob strip dropped them). submit-data now moves such fields into a blob store
+before the first write, keyed by the SHA-256 of their content so resubmitting
+the same file stores it once, and the context keeps a small reference:
+
+    {"filename", "content_type", "size", "blob_sha256", "blob_backend",
+     "s3_key", "s3_bucket"}   # s3_key/s3_bucket only for the S3 backend
+
+S3UploadOperator copies S3 blobs to their final key like pending uploads
+(without deleting the shared blob); other operators resolve references
+lazily with `context_blobs.load`.
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import os
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from ..core.logging_config import get_workflow_logger
+from . import s3_storage
+
+logger = get_workflow_logger(__name__)
+
+BLOB_PREFIX = "blobs/sha256"
+
+# Keys holding the encoded content of a submitted file dict
+CONTENT_KEYS = ("base64", "content")
+
+# Submitted data is small and shallow; don't walk pathological payloads
+MAX_DEPTH = 8
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, dict) and bool(value.get("blob_sha256"))
+
+
+def blob_key(digest: str) -> str:
+    return f"{BLOB_PREFIX}/{digest[:2]}/{digest}"
+
+
+def _decode(encoded: str) -> Optional[bytes]:
+    """Decode a base64 string (optionally a data URL); None if it isn't base64"""
+    if encoded.startswith("data:") and "," in encoded[:100]:
+        encoded = encoded.split(",", 1)[1]
+    try:
+        return base64.b64decode(encoded, validate=False)
+    except (binascii.Error, ValueError):
+        return None
+
+
+class ContextBlobStore:
+    """Stores binary fields once by content hash and resolves references"""
+
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        min_bytes: Optional[int] = None,
+        local_root: Optional[str] = None
+    ):
+        self.backend = backend or settings.CONTEXT_BLOB_BACKEND
+        self.min_bytes = settings.CONTEXT_BLOB_MIN_BYTES if min_bytes is None else min_bytes
+        self.local_root = local_root or os.path.join(settings.DOCUMENT_STORAGE_PATH, "blobs")
+
+    def _local_path(self, digest: str) -> str:
+        return os.path.join(self.local_root, digest[:2], digest)
+
+    def store(self, content: bytes, content_type: str) -> Dict[str, Any]:
+        """Store content unless already present; returns the reference fields"""
+        digest = hashlib.sha256(content).hexdigest()
+        ref: Dict[str, Any] = {"blob_sha256": digest, "blob_backend": self.backend, "size": len(content)}
+
+        if self.backend == "local":
+            path = self._local_path(digest)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+            return ref
+
+        bucket = s3_storage.default_bucket()
+        key = blob_key(digest)
+        if not s3_storage.object_exists(bucket, key):
+            s3_storage.upload_bytes(bucket, key, content, content_type, metadata={"sha256": digest})
+        ref.update({"s3_key": key, "s3_bucket": bucket})
+        return ref
+
+    def load_sync(self, ref: Dict[str, Any]) -> bytes:
+        if ref.get("blob_backend") == "local":
+            with open(self._local_path(ref["blob_sha256"]), "rb") as f:
+                return f.read()
+        return s3_storage.download_bytes(ref["s3_bucket"], ref["s3_key"])
+
+    async def load(self, ref: Dict[str, Any]) -> bytes:
+        """Content of a blob reference"""
+        return await asyncio.to_thread(self.load_sync, ref)
+
+    async def _offload_file(self, file_data: Dict[str, Any]) -> bool:
+        # Only file dicts: a long "content" text field is not a binary
+        if not ("filename" in file_data or "content_type" in file_data):
+            return False
+        for content_key in CONTENT_KEYS:
+            encoded = file_data.get(content_key)
+            if isinstance(encoded, str) and len(encoded) >= self.min_bytes:
+                break
+        else:
+            return False
+
+        content = _decode(encoded)
+        if content is None:
+            return False
+
+        content_type = file_data.get("content_type") or "application/octet-stream"
+        ref = await asyncio.to_thread(self.store, content, content_type)
+        for key in CONTENT_KEYS:
+            file_data.pop(key, None)
+        file_data.update(ref)
+        return True
+
+    async def offload(self, node: Any, _depth: int = 0) -> int:
+        """
+        Replace large base64 file fields in submitted data with blob
+        references, in place. Returns the number of fields offloaded.
+        """
+        if _depth > MAX_DEPTH:
+            return 0
+
+        count = 0
+        if isinstance(node, dict):
+            if await self._offload_file(node):
+                return 1
+            for value in node.values():
+                count += await self.offload(value, _depth + 1)
+        elif isinstance(node, list):
+            for value in node:
+                count += await self.offload(value, _depth + 1)
+        return count
+
+
+context_blobs = ContextBlobStore()
+
+
+async def offload_submitted_blobs(data: Any, instance_id: str) -> None:
+    """Ingestion step for submit-data; failures keep the data inline"""
+    if not settings.CONTEXT_BLOB_OFFLOAD_ENABLED:
+        return
+    try:
+        count = await context_blobs.offload(data)
+        if count:
+            logger.info(f"Offloaded {count} binary field(s) of instance {instance_id} to the blob store")
+    except Exception as e:
+        logger.error(f"Blob offload failed for instance {instance_id}, keeping data inline: {str(e)}")
@@ -9,6 +9,43 @@ import logging
 from ..models.legal_entity import EntityType, LegalEntity, EntityRelationship
 from ..core.logging_config import set_workflow_context, get_workflow_context
 
+# Fields only needed by the entity detail view, dropped from list projections
+LIST_EXCLUDED_FIELDS = ["visualization_config", "entity_display_config", "used_in_workflows"]
+
+
+def slim_entities_pipeline(
+    query: Dict[str, Any],
+    skip: int,
+    limit: int,
+    data_value_max_bytes: int
+) -> List[Dict[str, Any]]:
+    """
+    Aggregation pipeline for one page of entities whose `data` keeps only
+    values up to `data_value_max_bytes` (strings by UTF-8 length, anything
+    else by BSON size). Heavy values such as base64 images never leave Mongo.
+    """
+    value_size = {
+        "$cond": [
+            {"$eq": [{"$type": "$$field.v"}, "string"]},
+            {"$strLenBytes": "$$field.v"},
+            {"$bsonSize": {"v": "$$field.v"}}
+        ]
+    }
+    return [
+        {"$match": query},
+        {"$sort": {"created_at": -1}},
+        {"$skip": skip},
+        {"$limit": limit},
+        {"$unset": LIST_EXCLUDED_FIELDS},
+        {"$set": {
+            "data": {"$arrayToObject": {"$filter": {
+                "input": {"$objectToArray": {"$ifNull": ["$data", {}]}},
+                "as": "field",
+                "cond": {"$lte": [value_size, data_value_max_bytes]}
+            }}}
+        }},
+    ]
+
 
 class EntityService:
     """Service for managing legal entities - completely agnostic"""
@@ -93,11 +130,16 @@ class EntityService:
         entity_type: Optional[str] = None,
         filters: Dict[str, Any] = None,
         skip: int = 0,
-        limit: int = 20
+        limit: int = 20,
+        data_value_max_bytes: Optional[int] = None
     ) -> List[LegalEntity]:
         """
         Find entities with flexible filtering.
         Filters can query any field in the data dict using MongoDB syntax.
+
+        For list views pass `data_value_max_bytes`: heavy `data` values and
+        detail-only fields are then excluded by Mongo instead of being
+        transferred and stripped in Python.
         """
         query = {}
         
@@ -128,7 +170,13 @@ class EntityService:
             "filters": filters
         })
 
-        results = await LegalEntity.find(query).sort([("created_at", -1)]).skip(skip).limit(limit).to_list()
+        if data_value_max_bytes is not None:
+            results = await LegalEntity.aggregate(
+                slim_entities_pipeline(query, skip, limit, data_value_max_bytes),
+                projection_model=LegalEntity
+            ).to_list()
+        else:
+            results = await LegalEntity.find(query).sort([("created_at", -1)]).skip(skip).limit(limit).to_list()
 
         logger.debug(f"Found {len(results)} entities", extra={
             "count": len(results),
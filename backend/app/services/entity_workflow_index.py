@@ -0,0 +1,98 @@
+"""
+Reverse index from entity type to the active workflows that accept it.
+
+Citizen portal entity endpoints used to list every active workflow definition
+per entity and scan `metadata["entity_types"]` linearly. Workflows only change
+when DAGs are registered, plugins are reloaded or an admin edits a workflow,
+so the index is built once from the definitions and each entity costs a
+single dictionary lookup. It is rebuilt whenever its source version moves
+(the DAGBag version and the public catalog generation) or after
+PUBLIC_CATALOG_MAX_AGE_SECONDS.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from ..core.config import settings
+from ..core.logging_config import get_workflow_logger
+from ..models.workflow import WorkflowDefinition
+
+logger = get_workflow_logger(__name__)
+
+
+def build_entity_workflow_index(workflows: List[WorkflowDefinition]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group workflow summaries by every entity type they declare"""
+    index: Dict[str, List[Dict[str, Any]]] = {}
+    for w in workflows:
+        metadata = w.metadata or {}
+        entity_types = metadata.get("entity_types") or []
+        if not entity_types:
+            continue
+
+        summary = {
+            "workflow_id": w.workflow_id,
+            "name": w.name,
+            "description": w.description,
+            "category": w.category,
+            "estimatedDuration": metadata.get("estimated_duration", "10-20 min"),
+        }
+        for entity_type in dict.fromkeys(entity_types):
+            index.setdefault(entity_type, []).append(summary)
+    return index
+
+
+class EntityWorkflowIndex:
+    """Versioned, lazily rebuilt entity type -> workflows index"""
+
+    def __init__(self, max_age_seconds: Optional[int] = None):
+        self.max_age_seconds = max_age_seconds or settings.PUBLIC_CATALOG_MAX_AGE_SECONDS
+        self._loader: Optional[Callable[[], Awaitable[List[WorkflowDefinition]]]] = None
+        self._source_version: Callable[[], Hashable] = lambda: 0
+        self._index: Dict[str, List[Dict[str, Any]]] = {}
+        self._version: Optional[Hashable] = None
+        self._built_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def configure(
+        self,
+        loader: Callable[[], Awaitable[List[WorkflowDefinition]]],
+        source_version: Callable[[], Hashable]
+    ) -> None:
+        """Set the active-definition loader and the version of the data it reads"""
+        self._loader = loader
+        self._source_version = source_version
+        self._version = None
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._version is not None
+            and self._version == self._source_version()
+            and time.monotonic() - self._built_at < self.max_age_seconds
+        )
+
+    async def workflows_for(self, entity_type: str) -> List[Dict[str, Any]]:
+        """Active workflows accepting an entity type (copies, safe to mutate)"""
+        if not self._is_fresh():
+            async with self._lock:
+                # Another request may have rebuilt it while we waited
+                if not self._is_fresh():
+                    await self._build()
+        return [dict(w) for w in self._index.get(entity_type, [])]
+
+    async def _build(self) -> None:
+        if self._loader is None:
+            raise RuntimeError("Entity workflow index loader is not configured")
+
+        version = self._source_version()
+        workflows = await self._loader()
+        self._index = build_entity_workflow_index(workflows)
+        self._version = version
+        self._built_at = time.monotonic()
+        logger.info(
+            f"Built entity workflow index: {len(self._index)} entity types "
+            f"from {len(workflows)} workflows"
+        )
+
+
+entity_workflow_index = EntityWorkflowIndex()
@@ -0,0 +1,116 @@
+"""
+Keyset (cursor) pagination for workflow instance lists.
+
+Back-office lists are ordered newest first by (created_at, _id). Instead of
+skip(), which makes Mongo walk every preceding document, a page is requested
+with an opaque cursor holding the sort key of the last row already seen, so
+any page costs O(page size) on the (created_at, _id) indexes. Rows are
+projected to InstanceSummary, so page cost does not depend on context size.
+Totals are counted once per filter and cached for COUNT_CACHE_TTL_SECONDS,
+so scrolling does not recount the collection on every page.
+"""
+
+import base64
+import binascii
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from beanie import PydanticObjectId
+
+from ..models.workflow import InstanceSummary, WorkflowInstance
+
+# Sort order shared by every keyset-paginated instance list
+KEYSET_SORT = [("created_at", -1), ("_id", -1)]
+
+COUNT_CACHE_TTL_SECONDS = 30
+COUNT_CACHE_MAX_ENTRIES = 1024
+
+
+def encode_cursor(created_at: datetime, document_id: Any) -> str:
+    """Opaque token for the position right after a row"""
+    payload = json.dumps({"t": created_at.isoformat(), "id": str(document_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, PydanticObjectId]:
+    """Sort key encoded in a cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), PydanticObjectId(payload["id"])
+    except (binascii.Error, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor}") from e
+
+
+def keyset_query(query: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+    """Restrict a query to rows sorted after the cursor position"""
+    if not cursor:
+        return query
+    created_at, document_id = decode_cursor(cursor)
+    after = {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": document_id}},
+    ]}
+    return {"$and": [query, after]} if query else after
+
+
+class InstanceCountCache:
+    """Short-lived cache of list totals keyed by filter"""
+
+    def __init__(self, ttl_seconds: int = COUNT_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._counts: Dict[str, Tuple[float, int]] = {}
+
+    async def count(self, query: Dict[str, Any]) -> int:
+        key = json.dumps(query, sort_keys=True, default=str)
+        now = time.monotonic()
+        cached = self._counts.get(key)
+        if cached and now - cached[0] < self.ttl_seconds:
+            return cached[1]
+
+        if query:
+            total = await WorkflowInstance.find(query).count()
+        else:
+            # Unfiltered totals come from collection metadata
+            total = await WorkflowInstance.get_motor_collection().estimated_document_count()
+
+        if len(self._counts) >= COUNT_CACHE_MAX_ENTRIES:
+            self._counts = {k: v for k, v in self._counts.items() if now - v[0] < self.ttl_seconds}
+            if len(self._counts) >= COUNT_CACHE_MAX_ENTRIES:
+                self._counts.clear()
+        self._counts[key] = (now, total)
+        return total
+
+
+instance_counts = InstanceCountCache()
+
+
+async def paginate_instances(
+    query: Dict[str, Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0
+) -> Tuple[List[InstanceSummary], Optional[str], int]:
+    """
+    One page of instance summaries newest first, the cursor for the next
+    page (None on the last page) and the cached total for the filter.
+
+    `skip` is honoured only without a cursor, for clients still paging by
+    number; raises ValueError for a malformed cursor.
+    """
+    page_query = keyset_query(query, cursor)
+    find = WorkflowInstance.find(page_query).sort(KEYSET_SORT)
+    if not cursor and skip:
+        find = find.skip(skip)
+    rows = await find.limit(limit + 1).project(InstanceSummary).to_list()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    total = await instance_counts.count(query)
+    return rows, next_cursor, total
@@ -0,0 +1,79 @@
+"""
+Maintained search terms for workflow instances.
+
+Back-office search used to discover every context key in the collection and
+regex-match each of them (or JSON.stringify the context with $where), i.e.
+full collection scans on every keystroke. Instead the executor stores, on
+each save, the normalized tokens of the instance id, workflow and short
+scalar context values in `WorkflowInstance.search_terms`, a multikey index.
+A query matches instances having a term that starts with each query token,
+which is an anchored, indexed range scan per token.
+"""
+
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .workflow_search import normalize_text
+
+# Longer strings are documents, images or free text, not search keys
+MAX_VALUE_LENGTH = 256
+MAX_SEARCH_TERMS = 512
+MAX_CONTEXT_DEPTH = 3
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def search_tokens(text: Any) -> List[str]:
+    """Accent- and case-folded alphanumeric tokens of a value"""
+    return [token for token in _NON_WORD.split(normalize_text(str(text))) if token]
+
+
+def _context_values(value: Any, depth: int) -> Iterable[Any]:
+    if isinstance(value, dict):
+        if depth >= MAX_CONTEXT_DEPTH:
+            return
+        for key, nested in value.items():
+            # Underscore keys hold operator internals (raw payloads, blobs)
+            if isinstance(key, str) and key.startswith("_"):
+                continue
+            yield from _context_values(nested, depth + 1)
+    elif isinstance(value, list):
+        if depth >= MAX_CONTEXT_DEPTH:
+            return
+        for nested in value:
+            yield from _context_values(nested, depth + 1)
+    elif isinstance(value, bool) or value is None:
+        return
+    elif isinstance(value, (int, float)):
+        yield value
+    elif isinstance(value, str) and len(value) <= MAX_VALUE_LENGTH:
+        yield value
+
+
+def build_search_terms(
+    instance_id: str,
+    workflow_id: str,
+    context: Optional[Dict[str, Any]] = None,
+    workflow_name: Optional[str] = None
+) -> List[str]:
+    """Sorted, de-duplicated search terms for an instance"""
+    terms: Set[str] = set()
+    for value in (instance_id, workflow_id, workflow_name):
+        if value:
+            terms.update(search_tokens(value))
+
+    for value in _context_values(context or {}, 0):
+        if len(terms) >= MAX_SEARCH_TERMS:
+            break
+        terms.update(search_tokens(value))
+
+    return sorted(terms)[:MAX_SEARCH_TERMS]
+
+
+def search_filter(search: str) -> Optional[Dict[str, Any]]:
+    """Mongo filter matching instances with a term prefixed by every query token"""
+    tokens = list(dict.fromkeys(search_tokens(search)))
+    if not tokens:
+        return None
+    clauses = [{"search_terms": {"$regex": f"^{re.escape(token)}"}} for token in tokens]
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
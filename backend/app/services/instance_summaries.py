@@ -0,0 +1,45 @@
+"""
+Per-workflow data shared by instance list rows.
+
+List endpoints render InstanceSummary projections; the workflow name and
+step total each row needs come from the workflow metadata cache filled by
+register_dag. Workflows not registered in this process (e.g. retired DAGs
+that still have instances) are looked up once per page for all of them.
+"""
+
+from typing import Any, Dict, Iterable
+
+from ..models.workflow import WorkflowDefinition, WorkflowStep
+from .workflow_metadata import workflow_metadata
+
+
+async def workflow_list_info(workflow_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Name and total step count per workflow (only for known definitions)"""
+    ids = list(dict.fromkeys(workflow_ids))
+    info: Dict[str, Dict[str, Any]] = {}
+    for workflow_id in ids:
+        metadata = workflow_metadata.get(workflow_id)
+        if metadata is not None:
+            info[workflow_id] = {"name": metadata.name, "total_steps": metadata.total_steps}
+
+    ids = workflow_metadata.missing(ids)
+    if not ids:
+        return info
+
+    definitions = await WorkflowDefinition.find({"workflow_id": {"$in": ids}}).to_list()
+    step_counts = await WorkflowStep.aggregate([
+        {"$match": {"workflow_id": {"$in": ids}}},
+        {"$group": {"_id": "$workflow_id", "total_steps": {"$sum": 1}}},
+    ]).to_list()
+    totals = {row["_id"]: row["total_steps"] for row in step_counts}
+
+    for d in definitions:
+        info[d.workflow_id] = {"name": d.name, "total_steps": totals.get(d.workflow_id, 0)}
+    return info
+
+
+def progress_percentage(completed_steps: int, total_steps: int) -> float:
+    """Completed share of a workflow's steps, capped at 100"""
+    if total_steps <= 0 or not completed_steps:
+        return 0
+    return min(completed_steps / total_steps * 100, 100)
@@ -0,0 +1,219 @@
+"""
+Push channel for workflow instance state changes.
+
+The citizen and admin UIs used to poll the track endpoints, each poll
+rebuilding the DAG instance and walking every task state. Instead the
+executor publishes a small update whenever an instance advances a step,
+changes status or starts waiting for input, and the stream endpoints relay
+them to clients as Server-Sent Events.
+
+Updates fan out through Redis pub/sub (channel `instance-updates:<id>`) so
+any API replica can serve a stream for instances executed elsewhere. Each
+process keeps one pattern subscription and dispatches to its local
+subscribers; without Redis, updates are delivered in-process only.
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+
+import redis.asyncio as redis
+
+from ..core.config import settings
+from ..core.logging_config import get_workflow_logger
+from ..models.workflow import WorkflowInstance
+from .workflow_metadata import workflow_metadata
+
+logger = get_workflow_logger(__name__)
+
+CHANNEL_PREFIX = "instance-updates:"
+
+# Updates buffered per subscriber before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = 64
+
+# Instance statuses after which no further updates are expected
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+
+def instance_update(
+    event: str,
+    instance_id: str,
+    status: str,
+    current_step: Optional[str],
+    completed_steps: int,
+    total_steps: int,
+    previous_step: Optional[str] = None,
+    waiting_for: Optional[str] = None,
+    updated_at: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Payload pushed to instance streams (fetch /track for forms and details)"""
+    return {
+        "event": event,
+        "instance_id": instance_id,
+        "status": status,
+        "current_step": current_step,
+        "previous_step": previous_step,
+        "completed_steps": completed_steps,
+        "total_steps": total_steps,
+        "progress_percentage": round(completed_steps / total_steps * 100, 2) if total_steps else 0,
+        "requires_input": waiting_for is not None,
+        "waiting_for": waiting_for,
+        "updated_at": (updated_at or datetime.utcnow()).isoformat(),
+    }
+
+
+async def load_instance_snapshot(instance_id: str) -> Dict[str, Any]:
+    """Current state of an instance in update form, without loading its context"""
+    doc = await WorkflowInstance.get_motor_collection().find_one(
+        {"instance_id": instance_id},
+        projection={
+            "_id": 0,
+            "workflow_id": 1,
+            "status": 1,
+            "current_step": 1,
+            "updated_at": 1,
+            "completed_step_count": {"$size": {"$ifNull": ["$completed_steps", []]}},
+            "waiting_for": "$context.waiting_for",
+        }
+    ) or {}
+    metadata = workflow_metadata.get(doc.get("workflow_id", ""))
+    # Paused instances are waiting on their current step (see reconstruct_instance_from_db)
+    waiting = doc.get("status") == "paused" and doc.get("current_step")
+    return instance_update(
+        event="snapshot",
+        instance_id=instance_id,
+        status=doc.get("status", "unknown"),
+        current_step=doc.get("current_step"),
+        completed_steps=doc.get("completed_step_count", 0),
+        total_steps=metadata.total_steps if metadata else 0,
+        waiting_for=(doc.get("waiting_for") or "input") if waiting else None,
+        updated_at=doc.get("updated_at")
+    )
+
+
+class InstanceUpdateBroker:
+    """Publishes instance updates and fans them out to local subscribers"""
+
+    def __init__(self, redis_url: Optional[str] = None, use_redis: Optional[bool] = None):
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.use_redis = settings.INSTANCE_UPDATES_USE_REDIS if use_redis is None else use_redis
+        self._client: Optional[redis.Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    async def _get_client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.from_url(self.redis_url, decode_responses=True)
+        return self._client
+
+    async def publish(self, instance_id: str, update: Dict[str, Any]) -> None:
+        """Publish an update; never raises (tracking must not break execution)"""
+        if self.use_redis:
+            try:
+                client = await self._get_client()
+                await client.publish(f"{CHANNEL_PREFIX}{instance_id}", json.dumps(update, default=str))
+                return
+            except Exception as e:
+                logger.warning(f"Redis publish failed for instance {instance_id}, delivering locally: {str(e)}")
+        self._dispatch(instance_id, update)
+
+    def _dispatch(self, instance_id: str, update: Dict[str, Any]) -> None:
+        for queue in self._subscribers.get(instance_id, ()):
+            if queue.full():
+                # Slow consumer: keep the newest state
+                queue.get_nowait()
+            queue.put_nowait(update)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = None
+            try:
+                client = await self._get_client()
+                pubsub = client.pubsub()
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    instance_id = message["channel"][len(CHANNEL_PREFIX):]
+                    if instance_id in self._subscribers:
+                        self._dispatch(instance_id, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Instance update listener failed, reconnecting: {str(e)}")
+                await asyncio.sleep(1)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+    def _ensure_listener(self) -> None:
+        if self.use_redis and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.create_task(self._listen())
+
+    @asynccontextmanager
+    async def subscribe(self, instance_id: str) -> AsyncIterator[asyncio.Queue]:
+        """Queue receiving this instance's updates while the context is open"""
+        self._ensure_listener()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(instance_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(instance_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[instance_id]
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+instance_updates = InstanceUpdateBroker()
+
+
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event"""
+    lines = [f"event: {event}"] if event else []
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def stream_instance_updates(
+    instance_id: str,
+    is_disconnected: Callable[[], Awaitable[bool]],
+    load_snapshot: Callable[[str], Awaitable[Dict[str, Any]]] = load_instance_snapshot,
+    heartbeat_seconds: Optional[float] = None
+) -> AsyncIterator[str]:
+    """
+    SSE body for one instance: the current state, then every update, with
+    keepalive comments in between. Ends once the instance reaches a terminal
+    status or the client disconnects.
+    """
+    heartbeat = heartbeat_seconds or settings.INSTANCE_STREAM_HEARTBEAT_SECONDS
+    async with instance_updates.subscribe(instance_id) as queue:
+        # Load the snapshot only once subscribed, so no transition is missed
+        initial = await load_snapshot(instance_id)
+        yield sse_event(initial, initial.get("event"))
+        if initial.get("status") in TERMINAL_STATUSES:
+            return
+
+        while not await is_disconnected():
+            try:
+                update = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield sse_event(update, update.get("event"))
+            if update.get("status") in TERMINAL_STATUSES:
+                return
@@ -1,13 +1,20 @@
 """
 Keycloak synchronization service for users, teams, and roles
+
+Admin API calls share one pooled HTTP client and a cached admin token that is
+refreshed shortly before it expires. Bulk syncs stream records from Mongo and
+Keycloak page by page and run up to KEYCLOAK_SYNC_CONCURRENCY calls at once
+(a shared limit, also across nested listings such as groups and members);
+incremental syncs only push users and teams updated since the last run.
 """
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
 from datetime import datetime
 import asyncio
 import httpx
 from ..models.user import UserModel, UserRole
 from ..models.team import TeamModel
+from ..models.sync_state import KeycloakSyncState
 from ..auth.provider import keycloak
 from ..core.config import settings
 import os
@@ -36,6 +43,18 @@ class KeycloakSyncService:
         # Cache for admin token
         self._admin_token = None
         self._admin_token_expires = None
+        self._token_lock = asyncio.Lock()
+
+        # Pooled client for all admin API calls
+        self._client: Optional[httpx.AsyncClient] = None
+        # Bounds in-flight admin requests across nested concurrent runs, so
+        # they never queue for a pool connection (the pool has twice as many)
+        self._request_slots = asyncio.Semaphore(max(1, settings.KEYCLOAK_SYNC_CONCURRENCY))
+
+        # Realm roles rarely change; avoid listing them for every user synced
+        self._realm_roles: Optional[List[Dict[str, Any]]] = None
+        self._realm_roles_expires: float = 0
+        self._realm_roles_ttl = 300  # seconds
 
         # Cache for identity providers list (short TTL)
         self._idp_cache: Optional[List[Dict[str, str]]] = None
@@ -44,17 +63,36 @@ class KeycloakSyncService:
 
         logger.info(f"KeycloakSyncService initialized for realm: {self.realm}")
 
-    async def _get_admin_token(self) -> str:
-        """Get admin access token for Keycloak management"""
-        now = datetime.utcnow()
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Pooled HTTP client for the Keycloak admin API"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                verify=False,
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=settings.KEYCLOAK_SYNC_CONCURRENCY * 2)
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
-        # Check if token is still valid
-        if (self._admin_token and self._admin_token_expires and
-            now.timestamp() < self._admin_token_expires):
+    async def _get_admin_token(self, force: bool = False) -> str:
+        """Get admin access token for Keycloak management"""
+        # Check if token is still valid (it is refreshed 60 seconds before expiry)
+        if (not force and self._admin_token and self._admin_token_expires and
+            datetime.utcnow().timestamp() < self._admin_token_expires):
             return self._admin_token
 
-        # Get new admin token
-        async with httpx.AsyncClient(verify=False, timeout=30.0) as client:
+        async with self._token_lock:
+            # Another request may have refreshed it while we waited
+            now = datetime.utcnow()
+            if (not force and self._admin_token and self._admin_token_expires and
+                now.timestamp() < self._admin_token_expires):
+                return self._admin_token
+
             logger.info("Getting new Keycloak admin token")
 
             token_data = {
@@ -67,7 +105,7 @@ class KeycloakSyncService:
             if self.admin_client_secret:
                 token_data["client_secret"] = self.admin_client_secret
 
-            response = await client.post(
+            response = await self.http.post(
                 self.admin_token_url,
                 data=token_data,
                 headers={"Content-Type": "application/x-www-form-urlencoded"}
@@ -87,34 +125,120 @@ class KeycloakSyncService:
             logger.info("Admin token obtained successfully")
             return self._admin_token
 
-    async def _make_admin_request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Tuple[int, Dict]:
+    async def _make_admin_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Any] = None,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[int, Any]:
         """Make authenticated request to Keycloak admin API"""
-        token = await self._get_admin_token()
-        url = f"{self.admin_realm_url}{endpoint}"
+        if method.upper() not in ("GET", "POST", "PUT", "DELETE"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
 
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
+        url = f"{self.admin_realm_url}{endpoint}"
+        for attempt in range(2):
+            token = await self._get_admin_token(force=attempt > 0)
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json"
+            }
+            body = data if data is not None else {}
+            async with self._request_slots:
+                response = await self.http.request(
+                    method.upper(),
+                    url,
+                    headers=headers,
+                    params=params,
+                    json=body if method.upper() in ("POST", "PUT") else None
+                )
+            # A token revoked or expired early gets one refresh and retry
+            if response.status_code != 401:
+                break
 
-        async with httpx.AsyncClient(verify=False, timeout=30.0) as client:
-            if method.upper() == "GET":
-                response = await client.get(url, headers=headers)
-            elif method.upper() == "POST":
-                response = await client.post(url, headers=headers, json=data or {})
-            elif method.upper() == "PUT":
-                response = await client.put(url, headers=headers, json=data or {})
-            elif method.upper() == "DELETE":
-                response = await client.delete(url, headers=headers)
+        try:
+            result_data = response.json() if response.content else {}
+        except ValueError:
+            result_data = {}
+
+        return response.status_code, result_data
+
+    async def _paginate(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a Keycloak admin listing page by page (first/max)"""
+        page_size = settings.KEYCLOAK_SYNC_PAGE_SIZE
+        first = 0
+        while True:
+            status_code, page = await self._make_admin_request(
+                "GET", endpoint, params={**(params or {}), "first": first, "max": page_size}
+            )
+            if status_code != 200:
+                raise Exception(f"Failed to list {endpoint} from Keycloak: HTTP {status_code}")
+            if not isinstance(page, list):
+                return
+            for item in page:
+                yield item
+            if len(page) < page_size:
+                return
+            first += page_size
+
+    async def _run_concurrently(
+        self,
+        items: Union[AsyncIterable[Any], Iterable[Any]],
+        worker: Callable[[Any], Awaitable[None]]
+    ) -> int:
+        """
+        Run worker over items with bounded concurrency, streaming the input.
+        Workers handle their own errors; anything they raise is logged and
+        counted so a failing worker never stalls the producer. Returns the
+        number of items whose worker raised.
+        """
+        concurrency = max(1, settings.KEYCLOAK_SYNC_CONCURRENCY)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+        done = object()
+        failures = 0
+
+        async def consume():
+            nonlocal failures
+            while True:
+                item = await queue.get()
+                if item is done:
+                    return
+                try:
+                    await worker(item)
+                except Exception as e:
+                    logger.error(f"Keycloak sync worker failed: {e}")
+                    failures += 1
+
+        consumers = [asyncio.create_task(consume()) for _ in range(concurrency)]
+        try:
+            if isinstance(items, AsyncIterable):
+                async for item in items:
+                    await queue.put(item)
             else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+                for item in items:
+                    await queue.put(item)
+            for _ in consumers:
+                await queue.put(done)
+            await asyncio.gather(*consumers)
+        finally:
+            for task in consumers:
+                task.cancel()
+        return failures
+
+    async def _get_realm_roles(self) -> Optional[List[Dict[str, Any]]]:
+        """Realm roles, cached for a short TTL"""
+        now = datetime.utcnow().timestamp()
+        if self._realm_roles is not None and now < self._realm_roles_expires:
+            return self._realm_roles
 
-            try:
-                result_data = response.json() if response.content else {}
-            except:
-                result_data = {}
+        status_code, realm_roles = await self._make_admin_request("GET", "/roles")
+        if status_code != 200:
+            logger.error(f"Failed to get realm roles: {status_code}")
+            return None
 
-            return response.status_code, result_data
+        self._realm_roles = realm_roles
+        self._realm_roles_expires = now + self._realm_roles_ttl
+        return realm_roles
 
     async def get_identity_providers(self) -> List[Dict[str, str]]:
         """Get enabled identity providers configured for the citizen realm.
@@ -227,10 +351,9 @@ class KeycloakSyncService:
         """Sync user roles to Keycloak"""
         try:
             # Get available roles in Keycloak
-            status_code, realm_roles = await self._make_admin_request("GET", "/roles")
+            realm_roles = await self._get_realm_roles()
 
-            if status_code != 200:
-                logger.error(f"Failed to get realm roles: {status_code}")
+            if realm_roles is None:
                 return False
 
             # Map MuniStream roles to Keycloak roles
@@ -384,16 +507,34 @@ class KeycloakSyncService:
             logger.error(f"Error syncing user team memberships: {e}")
             return False
 
-    async def sync_all_users(self) -> Dict[str, int]:
-        """Sync all users from MuniStream to Keycloak"""
-        logger.info("Starting full user sync to Keycloak")
-
-        results = {"success": 0, "failed": 0, "total": 0}
-
-        users = await UserModel.find_all().to_list()
-        results["total"] = len(users)
-
-        for user in users:
+    async def _changed_since_watermark(self, sync_type: str, incremental: bool) -> Tuple[Dict[str, Any], KeycloakSyncState]:
+        """Query selecting records to sync, and the sync state holding the watermark"""
+        state = await KeycloakSyncState.find_one(KeycloakSyncState.sync_type == sync_type)
+        if state is None:
+            state = KeycloakSyncState(sync_type=sync_type)
+        if incremental and state.watermark:
+            return {"updated_at": {"$gt": state.watermark}}, state
+        return {}, state
+
+    async def _save_watermark(self, state: KeycloakSyncState, started_at: datetime, results: Dict[str, Any]) -> None:
+        """Advance the watermark only after a clean run, so failures are retried"""
+        if results["failed"] == 0:
+            state.watermark = started_at
+        state.last_run_at = datetime.utcnow()
+        state.last_results = results
+        await state.save()
+
+    async def sync_all_users(self, incremental: bool = False) -> Dict[str, Any]:
+        """Sync all users (or only those changed since the last sync) from MuniStream to Keycloak"""
+        query, state = await self._changed_since_watermark("users", incremental)
+        mode = "incremental" if query else "full"
+        logger.info(f"Starting {mode} user sync to Keycloak")
+
+        results = {"success": 0, "failed": 0, "total": 0, "mode": mode}
+        started_at = datetime.utcnow()
+
+        async def sync_one(user: UserModel):
+            results["total"] += 1
             try:
                 success = await self.sync_user_to_keycloak(user)
                 if success:
@@ -405,19 +546,23 @@ class KeycloakSyncService:
                 logger.error(f"Error syncing user {user.email}: {e}")
                 results["failed"] += 1
 
+        await self._run_concurrently(UserModel.find(query), sync_one)
+        await self._save_watermark(state, started_at, results)
+
         logger.info(f"User sync completed: {results}")
         return results
 
-    async def sync_all_teams(self) -> Dict[str, int]:
-        """Sync all teams from MuniStream to Keycloak groups"""
-        logger.info("Starting full team sync to Keycloak")
-
-        results = {"success": 0, "failed": 0, "total": 0}
+    async def sync_all_teams(self, incremental: bool = False) -> Dict[str, Any]:
+        """Sync all teams (or only those changed since the last sync) from MuniStream to Keycloak groups"""
+        query, state = await self._changed_since_watermark("teams", incremental)
+        mode = "incremental" if query else "full"
+        logger.info(f"Starting {mode} team sync to Keycloak")
 
-        teams = await TeamModel.find_all().to_list()
-        results["total"] = len(teams)
+        results = {"success": 0, "failed": 0, "total": 0, "mode": mode}
+        started_at = datetime.utcnow()
 
-        for team in teams:
+        async def sync_one(team: TeamModel):
+            results["total"] += 1
             try:
                 success = await self.sync_team_to_keycloak_group(team)
                 if success:
@@ -428,6 +573,9 @@ class KeycloakSyncService:
                 logger.error(f"Error syncing team {team.name}: {e}")
                 results["failed"] += 1
 
+        await self._run_concurrently(TeamModel.find(query), sync_one)
+        await self._save_watermark(state, started_at, results)
+
         logger.info(f"Team sync completed: {results}")
         return results
 
@@ -440,28 +588,24 @@ class KeycloakSyncService:
             "groups": {"imported": 0, "updated": 0, "failed": 0}
         }
 
-        try:
-            # Import users
-            status_code, keycloak_users = await self._make_admin_request("GET", "/users")
-
-            if status_code == 200:
-                for kc_user in keycloak_users:
-                    try:
-                        await self._import_user_from_keycloak(kc_user, results)
-                    except Exception as e:
-                        logger.error(f"Error importing user {kc_user.get('email', 'unknown')}: {e}")
-                        results["users"]["failed"] += 1
+        async def import_user(kc_user: Dict):
+            try:
+                await self._import_user_from_keycloak(kc_user, results)
+            except Exception as e:
+                logger.error(f"Error importing user {kc_user.get('email', 'unknown')}: {e}")
+                results["users"]["failed"] += 1
 
-            # Import groups
-            status_code, keycloak_groups = await self._make_admin_request("GET", "/groups")
+        async def import_group(kc_group: Dict):
+            try:
+                await self._import_group_from_keycloak(kc_group, results)
+            except Exception as e:
+                logger.error(f"Error importing group {kc_group.get('name', 'unknown')}: {e}")
+                results["groups"]["failed"] += 1
 
-            if status_code == 200:
-                for kc_group in keycloak_groups:
-                    try:
-                        await self._import_group_from_keycloak(kc_group, results)
-                    except Exception as e:
-                        logger.error(f"Error importing group {kc_group.get('name', 'unknown')}: {e}")
-                        results["groups"]["failed"] += 1
+        try:
+            # Import users, then groups, page by page
+            await self._run_concurrently(self._paginate("/users"), import_user)
+            await self._run_concurrently(self._paginate("/groups"), import_group)
 
         except Exception as e:
             logger.error(f"Error during Keycloak import: {e}")
@@ -558,12 +702,13 @@ class KeycloakSyncService:
             local_users_count = await UserModel.count()
             local_teams_count = await TeamModel.count()
 
-            # Get Keycloak counts
-            status_code, kc_users = await self._make_admin_request("GET", "/users")
-            kc_users_count = len(kc_users) if status_code == 200 else 0
+            # Get Keycloak counts (without listing every record)
+            status_code, kc_users_count = await self._make_admin_request("GET", "/users/count")
+            if status_code != 200 or not isinstance(kc_users_count, int):
+                kc_users_count = 0
 
-            status_code, kc_groups = await self._make_admin_request("GET", "/groups")
-            kc_groups_count = len(kc_groups) if status_code == 200 else 0
+            status_code, kc_groups = await self._make_admin_request("GET", "/groups/count")
+            kc_groups_count = kc_groups.get("count", 0) if status_code == 200 and isinstance(kc_groups, dict) else 0
 
             return {
                 "status": "connected",
@@ -593,13 +738,7 @@ class KeycloakSyncService:
     async def get_all_keycloak_users(self) -> List[Dict[str, Any]]:
         """Get all users from Keycloak realm"""
         try:
-            status_code, users_data = await self._make_admin_request("GET", "/users")
-
-            if status_code == 200:
-                return users_data if isinstance(users_data, list) else []
-            else:
-                logger.error(f"Failed to get users from Keycloak: HTTP {status_code}")
-                return []
+            return [user async for user in self._paginate("/users")]
 
         except Exception as e:
             logger.error(f"Error getting users from Keycloak: {e}")
@@ -608,25 +747,15 @@ class KeycloakSyncService:
     async def get_all_keycloak_groups(self) -> List[Dict[str, Any]]:
         """Get all groups from Keycloak realm"""
         try:
-            status_code, groups_data = await self._make_admin_request("GET", "/groups")
+            groups = [group async for group in self._paginate("/groups")]
 
-            if status_code == 200:
-                groups = groups_data if isinstance(groups_data, list) else []
-
-                # For each group, get member details with roles
-                for group in groups:
-                    group_id = group.get('id')
-                    if group_id:
-                        # Get group members with their roles
-                        members_with_roles = await self.get_group_members_with_roles(group_id)
-                        group['members'] = members_with_roles
-                    else:
-                        group['members'] = []
-
-                return groups
-            else:
-                logger.error(f"Failed to get groups from Keycloak: HTTP {status_code}")
-                return []
+            # For each group, get member details with roles
+            async def load_members(group: Dict[str, Any]):
+                group_id = group.get('id')
+                group['members'] = await self.get_group_members_with_roles(group_id) if group_id else []
+
+            await self._run_concurrently(groups, load_members)
+            return groups
 
         except Exception as e:
             logger.error(f"Error getting groups from Keycloak: {e}")
@@ -635,32 +764,25 @@ class KeycloakSyncService:
     async def get_group_members_with_roles(self, group_id: str) -> List[Dict[str, Any]]:
         """Get group members with their realm roles"""
         try:
-            # Get group members
-            member_status, members_data = await self._make_admin_request("GET", f"/groups/{group_id}/members")
-
-            if member_status != 200:
-                logger.error(f"Failed to get group members: HTTP {member_status}")
-                return []
-
-            members = members_data if isinstance(members_data, list) else []
-            members_with_roles = []
-
-            # For each member, get their roles
-            for member in members:
-                user_id = member.get('id')
-                if user_id:
-                    # Get user's realm roles
-                    roles_status, roles_data = await self._make_admin_request("GET", f"/users/{user_id}/role-mappings/realm")
-
-                    if roles_status == 200:
-                        user_roles = roles_data if isinstance(roles_data, list) else []
-                        member['realmRoles'] = [role.get('name') for role in user_roles if role.get('name')]
-                    else:
-                        member['realmRoles'] = []
-
-                    members_with_roles.append(member)
-
-            return members_with_roles
+            members = [member async for member in self._paginate(f"/groups/{group_id}/members")]
+            members = [member for member in members if member.get('id')]
+
+            # Get each member's realm roles concurrently
+            async def load_roles(member: Dict[str, Any]):
+                member['realmRoles'] = []
+                try:
+                    roles_status, roles_data = await self._make_admin_request(
+                        "GET", f"/users/{member['id']}/role-mappings/realm"
+                    )
+                except Exception as e:
+                    logger.error(f"Error getting realm roles for user {member['id']}: {e}")
+                    return
+                if roles_status == 200:
+                    user_roles = roles_data if isinstance(roles_data, list) else []
+                    member['realmRoles'] = [role.get('name') for role in user_roles if role.get('name')]
+
+            await self._run_concurrently(members, load_roles)
+            return members
 
         except Exception as e:
             logger.error(f"Error getting group members with roles for group {group_id}: {e}")
@@ -0,0 +1,363 @@
+"""
+Aggregation-pipeline analytics for workflow and step performance.
+
+All metrics are computed inside MongoDB with $group/$facet pipelines so the
+performance API never loads raw instances or step executions into Python.
+Duration distributions use Mongo 7's approximate $percentile plus a fixed
+bucket histogram, and every query accepts an optional time window.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from ..models.workflow import WorkflowInstance, StepExecution
+from ..core.logging_config import get_workflow_logger
+
+logger = get_workflow_logger(__name__)
+
+# Percentiles reported for durations (p50, p90, p95)
+DURATION_PERCENTILES = [0.5, 0.9, 0.95]
+
+# Lower bounds (seconds) of the duration histogram buckets
+DURATION_BUCKETS_SECONDS = [0, 1, 5, 30, 60, 300, 3600, 86400]
+
+# Instance statuses counted as active in overall stats
+ACTIVE_INSTANCE_STATUSES = ["running", "awaiting_input"]
+
+# Most frequent errors reported per step
+TOP_ERRORS_PER_STEP = 5
+
+
+def parse_time_window(
+    start_date: Optional[str],
+    end_date: Optional[str]
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Parse YYYY-MM-DD window bounds.
+
+    The end date is inclusive, so the returned upper bound is the start of
+    the following day. Raises ValueError on malformed dates.
+    """
+    start = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
+    end = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) if end_date else None
+    return start, end
+
+
+def window_match(field: str, start: Optional[datetime], end: Optional[datetime]) -> Dict[str, Any]:
+    """Match clause restricting a timestamp field to [start, end)"""
+    bounds: Dict[str, Any] = {}
+    if start:
+        bounds["$gte"] = start
+    if end:
+        bounds["$lt"] = end
+    return {field: bounds} if bounds else {}
+
+
+def _duration_bucket_expr(field: str = "$duration_seconds") -> Dict[str, Any]:
+    """Expression mapping a duration to the lower bound of its histogram bucket"""
+    branches = [
+        {"case": {"$gte": [field, lower]}, "then": lower}
+        for lower in reversed(DURATION_BUCKETS_SECONDS)
+    ]
+    return {"$switch": {"branches": branches, "default": None}}
+
+
+def _count_if(condition: Dict[str, Any]) -> Dict[str, Any]:
+    return {"$sum": {"$cond": [condition, 1, 0]}}
+
+
+def _queue_time_stages(step_ids: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """
+    Stages setting `previous_completed_at` on each matched execution.
+
+    For a workflow-wide query every execution of the matched instances is
+    already in the pipeline, so a window over each instance suffices. For
+    specific steps only their executions are matched (index-backed) and the
+    previous execution of the same instance is looked up per row, instead
+    of windowing over the whole collection.
+    """
+    if step_ids is None:
+        return [{"$setWindowFields": {
+            "partitionBy": "$instance_id",
+            "sortBy": {"started_at": 1},
+            "output": {"previous_completed_at": {"$shift": {"output": "$completed_at", "by": -1}}}
+        }}]
+    return [
+        {"$lookup": {
+            "from": StepExecution.Settings.name,
+            "localField": "instance_id",
+            "foreignField": "instance_id",
+            "let": {"started_at": "$started_at"},
+            "pipeline": [
+                {"$match": {"$expr": {"$lt": ["$started_at", "$$started_at"]}}},
+                {"$sort": {"started_at": -1}},
+                {"$limit": 1},
+                {"$project": {"_id": 0, "completed_at": 1}}
+            ],
+            "as": "previous"
+        }},
+        {"$set": {"previous_completed_at": {"$first": "$previous.completed_at"}}},
+        {"$unset": "previous"},
+    ]
+
+
+def step_metrics_pipeline(
+    match: Dict[str, Any],
+    step_ids: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Per-step execution metrics in one pass.
+
+    Queue time is the gap between the previous step of the same instance
+    completing and this step starting (see _queue_time_stages).
+
+    Produces three facets: `summary` (one document per step with counts,
+    duration and queue time stats, percentiles and slow-execution count),
+    `histogram` (counts per step and duration bucket) and `errors` (top
+    failure messages per step, truncated to 100 characters for grouping).
+    """
+    if step_ids is not None:
+        match = {**match, "step_id": {"$in": list(step_ids)}}
+    return [
+        {"$match": match},
+        *_queue_time_stages(step_ids),
+        {"$set": {"queue_ms": {"$cond": [
+            {"$and": ["$previous_completed_at", "$started_at"]},
+            {"$max": [0, {"$subtract": ["$started_at", "$previous_completed_at"]}]},
+            None
+        ]}}},
+        # Average per step, used to flag executions slower than twice the mean
+        {"$setWindowFields": {
+            "partitionBy": "$step_id",
+            "output": {"step_avg_duration": {"$avg": "$duration_seconds"}}
+        }},
+        {"$facet": {
+            "summary": [
+                {"$group": {
+                    "_id": "$step_id",
+                    "total": {"$sum": 1},
+                    "successful": _count_if({"$eq": ["$status", "completed"]}),
+                    "avg_duration": {"$avg": "$duration_seconds"},
+                    "min_duration": {"$min": "$duration_seconds"},
+                    "max_duration": {"$max": "$duration_seconds"},
+                    "avg_queue_ms": {"$avg": "$queue_ms"},
+                    "percentiles": {"$percentile": {
+                        "input": "$duration_seconds",
+                        "p": DURATION_PERCENTILES,
+                        "method": "approximate"
+                    }},
+                    "slow": _count_if({"$gt": [
+                        "$duration_seconds",
+                        {"$multiply": ["$step_avg_duration", 2]}
+                    ]})
+                }}
+            ],
+            "histogram": [
+                {"$match": {"duration_seconds": {"$ne": None}}},
+                {"$group": {
+                    "_id": {"step_id": "$step_id", "bucket": _duration_bucket_expr()},
+                    "count": {"$sum": 1}
+                }}
+            ],
+            "errors": [
+                {"$match": {"status": "failed", "error_message": {"$nin": [None, ""]}}},
+                {"$group": {
+                    "_id": {
+                        "step_id": "$step_id",
+                        "error": {"$substrCP": ["$error_message", 0, 100]}
+                    },
+                    "count": {"$sum": 1}
+                }},
+                {"$sort": {"count": -1}}
+            ]
+        }}
+    ]
+
+
+def instance_summary_pipeline(match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Instance counts and completion-time stats for a workflow"""
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "completed": _count_if({"$eq": ["$status", "completed"]}),
+            "avg_duration": {"$avg": "$duration_seconds"},
+            "percentiles": {"$percentile": {
+                "input": "$duration_seconds",
+                "p": DURATION_PERCENTILES,
+                "method": "approximate"
+            }}
+        }}
+    ]
+
+
+def instance_stats_pipeline(match: Dict[str, Any], today: datetime) -> List[Dict[str, Any]]:
+    """Overall instance statistics, grouped by status and workflow, in one pass"""
+    return [
+        {"$match": match},
+        {"$facet": {
+            "totals": [
+                {"$group": {
+                    "_id": None,
+                    "total": {"$sum": 1},
+                    "completed_today": _count_if({"$gte": ["$completed_at", today]}),
+                    "avg_duration": {"$avg": "$duration_seconds"}
+                }}
+            ],
+            "by_status": [
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+            ],
+            "by_workflow": [
+                {"$group": {"_id": "$workflow_id", "count": {"$sum": 1}}}
+            ]
+        }}
+    ]
+
+
+def _ms(seconds: Optional[float]) -> float:
+    return round((seconds or 0) * 1000, 2)
+
+
+def build_step_metrics(
+    summary: Dict[str, Any],
+    histogram: List[Dict[str, Any]],
+    errors: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Shape one step's facet output into the performance API format"""
+    total = summary["total"]
+    successful = summary["successful"]
+    percentiles = summary.get("percentiles") or [None] * len(DURATION_PERCENTILES)
+
+    error_total = sum(e["count"] for e in errors)
+    common_errors = [
+        {
+            "error": e["_id"]["error"],
+            "count": e["count"],
+            "percentage": (e["count"] / error_total) * 100
+        }
+        for e in errors[:TOP_ERRORS_PER_STEP]
+    ]
+
+    duration_histogram = [
+        {"min_seconds": h["_id"]["bucket"], "count": h["count"]}
+        for h in sorted(histogram, key=lambda h: h["_id"]["bucket"])
+    ]
+
+    return {
+        "step_id": summary["_id"],
+        "total_executions": total,
+        "successful_executions": successful,
+        "success_rate": round((successful / total) * 100, 2) if total else 0,
+        "average_duration_ms": _ms(summary.get("avg_duration")),
+        "min_duration_ms": _ms(summary.get("min_duration")),
+        "max_duration_ms": _ms(summary.get("max_duration")),
+        "p50_duration_ms": _ms(percentiles[0]),
+        "p90_duration_ms": _ms(percentiles[1]),
+        "p95_duration_ms": _ms(percentiles[2]),
+        "average_queue_time_ms": round(summary.get("avg_queue_ms") or 0, 2),
+        "common_errors": common_errors,
+        "bottleneck_indicators": {
+            "slow_executions": summary.get("slow", 0),
+            "duration_histogram": duration_histogram
+        }
+    }
+
+
+class PerformanceAnalyticsService:
+    """Runs the analytics pipelines and shapes their results"""
+
+    @staticmethod
+    async def get_steps_metrics(
+        step_ids: Optional[List[str]] = None,
+        workflow_id: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Metrics for the given steps (or every step of a workflow), keyed by step_id"""
+        match: Dict[str, Any] = window_match("started_at", start, end)
+        if workflow_id:
+            match["workflow_id"] = workflow_id
+
+        result = await StepExecution.aggregate(
+            step_metrics_pipeline(match, step_ids),
+            allowDiskUse=True
+        ).to_list()
+        facets = result[0] if result else {"summary": [], "histogram": [], "errors": []}
+
+        histograms: Dict[str, List[Dict[str, Any]]] = {}
+        for row in facets["histogram"]:
+            histograms.setdefault(row["_id"]["step_id"], []).append(row)
+
+        errors: Dict[str, List[Dict[str, Any]]] = {}
+        for row in facets["errors"]:
+            errors.setdefault(row["_id"]["step_id"], []).append(row)
+
+        return {
+            summary["_id"]: build_step_metrics(
+                summary,
+                histograms.get(summary["_id"], []),
+                errors.get(summary["_id"], [])
+            )
+            for summary in facets["summary"]
+        }
+
+    @staticmethod
+    async def get_instance_summary(
+        workflow_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Instance totals and completion-time stats for one workflow"""
+        match = {"workflow_id": workflow_id, **window_match("started_at", start, end)}
+        result = await WorkflowInstance.aggregate(instance_summary_pipeline(match)).to_list()
+
+        if not result:
+            return {
+                "total_instances": 0,
+                "completed_instances": 0,
+                "average_completion_time_ms": 0.0,
+                "p50_completion_time_ms": 0.0,
+                "p90_completion_time_ms": 0.0,
+                "p95_completion_time_ms": 0.0
+            }
+
+        summary = result[0]
+        percentiles = summary.get("percentiles") or [None] * len(DURATION_PERCENTILES)
+        return {
+            "total_instances": summary["total"],
+            "completed_instances": summary["completed"],
+            "average_completion_time_ms": _ms(summary.get("avg_duration")),
+            "p50_completion_time_ms": _ms(percentiles[0]),
+            "p90_completion_time_ms": _ms(percentiles[1]),
+            "p95_completion_time_ms": _ms(percentiles[2])
+        }
+
+    @staticmethod
+    async def get_instance_stats(
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Overall workflow statistics for the /stats endpoint"""
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        match = window_match("started_at", start, end)
+
+        result = await WorkflowInstance.aggregate(instance_stats_pipeline(match, today)).to_list()
+        facets = result[0] if result else {"totals": [], "by_status": [], "by_workflow": []}
+
+        totals = facets["totals"][0] if facets["totals"] else {}
+        by_status = {row["_id"]: row["count"] for row in facets["by_status"]}
+        by_workflow = {row["_id"]: row["count"] for row in facets["by_workflow"]}
+
+        finished = by_status.get("completed", 0) + by_status.get("failed", 0)
+        success_rate = by_status.get("completed", 0) / finished if finished else 0
+
+        return {
+            "total_instances": totals.get("total", 0),
+            "active_instances": sum(by_status.get(s, 0) for s in ACTIVE_INSTANCE_STATUSES),
+            "completed_today": totals.get("completed_today", 0),
+            "avg_completion_time_hours": round((totals.get("avg_duration") or 0) / 3600, 2),
+            "success_rate": round(success_rate, 2),
+            "by_workflow": by_workflow,
+            "by_status": by_status
+        }
@@ -0,0 +1,169 @@
+"""
+Materialized public workflow catalog.
+
+Citizen portal catalog endpoints used to list every active workflow and
+rebuild its public representation on each request. The catalog only changes
+when DAGs are registered, plugins are reloaded or an admin edits a workflow,
+so it is built once per locale into an immutable snapshot. Rendered
+responses are memoized on the snapshot with a strong ETag, and a snapshot is
+rebuilt when the DAGBag version moves, on explicit invalidation, or after
+PUBLIC_CATALOG_MAX_AGE_SECONDS (which bounds staleness across replicas).
+Each snapshot carries the full-text search index for its locale; callers
+normalize locales to the supported ones and at most MAX_LOCALES are kept.
+"""
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from ..core.config import settings
+from ..core.logging_config import get_workflow_logger
+from .workflow_search import WorkflowSearchIndex
+
+logger = get_workflow_logger(__name__)
+
+# Rendered responses memoized per snapshot (bounds free-form search keys)
+MAX_RENDERED_RESPONSES = 256
+
+# Locale snapshots kept at once; the least recently built is evicted beyond it
+MAX_LOCALES = 8
+
+
+@dataclass
+class CatalogEntry:
+    """One active workflow in its public representation"""
+    workflow_id: str
+    workflow_type: str
+    data: Dict[str, Any]
+
+
+@dataclass
+class PublicCatalogSnapshot:
+    """Immutable per-locale catalog plus memoized rendered responses"""
+    locale: str
+    source_version: Tuple[int, int]
+    entries: List[CatalogEntry]
+    search_index: Optional[WorkflowSearchIndex] = None
+    built_at: float = field(default_factory=time.monotonic)
+    _rendered: Dict[Any, Tuple[bytes, str]] = field(default_factory=dict, repr=False)
+
+    def render(self, key: Any, build: Callable[["PublicCatalogSnapshot"], Any]) -> Tuple[bytes, str]:
+        """JSON body and strong ETag for a response derived from this snapshot"""
+        cached = self._rendered.get(key)
+        if cached is not None:
+            return cached
+
+        body = JSONResponse(jsonable_encoder(build(self))).body
+        rendered = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        if len(self._rendered) < MAX_RENDERED_RESPONSES:
+            self._rendered[key] = rendered
+        return rendered
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        (tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates
+    )
+
+
+class PublicWorkflowCatalog:
+    """Per-locale snapshot cache of the public workflow catalog"""
+
+    def __init__(self, max_age_seconds: Optional[int] = None):
+        self.max_age_seconds = max_age_seconds or settings.PUBLIC_CATALOG_MAX_AGE_SECONDS
+        self._builder: Optional[Callable[[str], Awaitable[List[CatalogEntry]]]] = None
+        self._source_version: Callable[[], int] = lambda: 0
+        self._generation = 0
+        self._snapshots: Dict[str, PublicCatalogSnapshot] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def configure(
+        self,
+        builder: Callable[[str], Awaitable[List[CatalogEntry]]],
+        source_version: Callable[[], int]
+    ) -> None:
+        """Set the entry builder and the version of the data it reads"""
+        self._builder = builder
+        self._source_version = source_version
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Mark every snapshot stale; they are rebuilt on next access"""
+        self._generation += 1
+
+    @property
+    def generation(self) -> int:
+        """Bumped on every explicit invalidation"""
+        return self._generation
+
+    def _current_version(self) -> Tuple[int, int]:
+        return (self._generation, self._source_version())
+
+    def _is_fresh(self, snapshot: Optional[PublicCatalogSnapshot]) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.source_version == self._current_version()
+            and time.monotonic() - snapshot.built_at < self.max_age_seconds
+        )
+
+    async def get(self, locale: str) -> PublicCatalogSnapshot:
+        """Current snapshot for a locale, building it if stale"""
+        snapshot = self._snapshots.get(locale)
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        lock = self._locks.setdefault(locale, asyncio.Lock())
+        async with lock:
+            # Another request may have rebuilt it while we waited
+            snapshot = self._snapshots.get(locale)
+            if self._is_fresh(snapshot):
+                return snapshot
+            return await self._build(locale)
+
+    async def rebuild(self, locales: Optional[List[str]] = None) -> None:
+        """Eagerly rebuild snapshots (defaults to every locale built so far)"""
+        self.invalidate()
+        for locale in locales or list(self._snapshots) or ["es"]:
+            try:
+                await self.get(locale)
+            except Exception as e:
+                logger.error(f"Failed to rebuild public workflow catalog for {locale}: {str(e)}")
+
+    async def _build(self, locale: str) -> PublicCatalogSnapshot:
+        if self._builder is None:
+            raise RuntimeError("Public workflow catalog builder is not configured")
+
+        version = self._current_version()
+        started = time.monotonic()
+        entries = await self._builder(locale)
+        snapshot = PublicCatalogSnapshot(
+            locale=locale,
+            source_version=version,
+            entries=entries,
+            search_index=WorkflowSearchIndex.build((e.data for e in entries), locale)
+        )
+        self._snapshots.pop(locale, None)
+        self._snapshots[locale] = snapshot
+        while len(self._snapshots) > MAX_LOCALES:
+            evicted = next(iter(self._snapshots))
+            del self._snapshots[evicted]
+            lock = self._locks.get(evicted)
+            if lock is not None and not lock.locked():
+                del self._locks[evicted]
+        logger.info(
+            f"Built public workflow catalog for {locale}: {len(entries)} workflows "
+            f"in {time.monotonic() - started:.2f}s"
+        )
+        return snapshot
+
+
+public_workflow_catalog = PublicWorkflowCatalog()
@@ -8,17 +8,25 @@ procesarlos.
 """
 from __future__ import annotations
 
+import asyncio
 import os
 import re
 import unicodedata
 import uuid
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 
 import boto3
+from botocore.exceptions import ClientError
 
 _S3_CLIENT: Optional["boto3.client"] = None
 
+# Tamaño de cada lectura del Body al servir descargas: acota la memoria por
+# descarga sin importar el tamaño del objeto.
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+_BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
 
 def get_s3_client():
     """Devuelve un cliente boto3 S3 cacheado, configurado igual que el
@@ -131,6 +139,60 @@ def copy_object(
     }
 
 
+def single_byte_range(range_header: Optional[str]) -> Optional[str]:
+    """Devuelve el header `Range` si pide un solo rango de bytes válido
+    (`bytes=0-99`, `bytes=100-`, `bytes=-500`), para pasarlo tal cual al
+    GetObject. Multi-rangos y unidades desconocidas se ignoran: S3 no los
+    soporta y el RFC 9110 permite responder el objeto completo."""
+    if not range_header:
+        return None
+    value = range_header.strip().replace(" ", "")
+    match = _BYTE_RANGE.match(value)
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if start and end and int(end) < int(start):
+        return None
+    return value
+
+
+async def iter_body(body: Any, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Itera el `StreamingBody` de un GetObject en chunks, leyendo en un
+    thread para no bloquear el event loop. Cierra el body al terminar o si
+    el cliente se desconecta a mitad de la descarga."""
+    try:
+        while True:
+            chunk = await asyncio.to_thread(body.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        body.close()
+
+
+def object_exists(bucket: str, key: str) -> bool:
+    """True si el objeto existe (HEAD). Otros errores se propagan."""
+    try:
+        get_s3_client().head_object(Bucket=bucket, Key=key)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+
+
+def download_bytes(bucket: str, key: str) -> bytes:
+    """Descarga un objeto completo a memoria (solo para blobs chicos)."""
+    resp = get_s3_client().get_object(Bucket=bucket, Key=key)
+    body = resp["Body"]
+    try:
+        return body.read()
+    finally:
+        body.close()
+
+
 def delete_object(bucket: str, key: str) -> None:
     """Borra un objeto. Errores silenciosos — el caller decide qué hacer si
     no se pudo limpiar (típicamente solo loggear)."""
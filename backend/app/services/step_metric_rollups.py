@@ -0,0 +1,311 @@
+"""
+Incrementally maintained workflow/step metric rollups.
+
+The executor records every task status change here (a waiting task re-polled
+while still waiting is not recorded again), with durations measured from the
+step's first start. Outcomes are merged in memory and flushed as
+$inc/$min/$max upserts into `step_metric_rollups`, one
+document per (workflow_id, step_id, granularity, bucket_start), at minute,
+hour and day granularity. Each bucket keeps outcome counts, duration sum and
+sum of squares, and a log-bucketed duration sketch whose counts add up across
+buckets, so dashboards read O(buckets) documents instead of rescanning raw
+executions and still get percentiles within SKETCH_RELATIVE_ACCURACY.
+"""
+
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from ..models.workflow import StepMetricRollup
+from ..core.logging_config import get_workflow_logger
+
+logger = get_workflow_logger(__name__)
+
+# Bucket size and retention per granularity (None keeps buckets forever)
+ROLLUP_GRANULARITIES: Dict[str, timedelta] = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+ROLLUP_RETENTION: Dict[str, Optional[timedelta]] = {
+    "minute": timedelta(days=2),
+    "hour": timedelta(days=90),
+    "day": None,
+}
+
+# Longest window served from each granularity when none is requested
+_GRANULARITY_MAX_WINDOW = [
+    ("minute", timedelta(hours=6)),
+    ("hour", timedelta(days=7)),
+]
+
+# Task outcomes tracked by the rollups; terminal ones also record durations
+TERMINAL_OUTCOMES = ("completed", "failed", "skipped")
+ROLLUP_OUTCOMES = TERMINAL_OUTCOMES + ("waiting", "retried")
+
+# Duration sketch: log buckets with bounded relative error
+SKETCH_RELATIVE_ACCURACY = 0.02
+SKETCH_MIN_SECONDS = 0.001
+_SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+_SKETCH_LOG_GAMMA = math.log(_SKETCH_GAMMA)
+
+DURATION_PERCENTILES = [0.5, 0.9, 0.95]
+
+
+def sketch_key(seconds: float) -> str:
+    """Sketch bucket holding a duration (stored as a string for Mongo field names)"""
+    return str(math.ceil(math.log(max(seconds, SKETCH_MIN_SECONDS)) / _SKETCH_LOG_GAMMA))
+
+
+def sketch_quantiles(sketch: Dict[str, int], quantiles: List[float]) -> List[Optional[float]]:
+    """Estimate duration quantiles (seconds) from a merged sketch"""
+    buckets = sorted((int(key), count) for key, count in sketch.items() if count > 0)
+    total = sum(count for _, count in buckets)
+    if not total:
+        return [None] * len(quantiles)
+
+    results = []
+    for q in quantiles:
+        rank = q * (total - 1)
+        cumulative = 0
+        for index, count in buckets:
+            cumulative += count
+            if cumulative > rank:
+                results.append(2 * _SKETCH_GAMMA ** index / (_SKETCH_GAMMA + 1))
+                break
+    return results
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its bucket"""
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup granularity: {granularity}")
+
+
+def choose_granularity(since: Optional[datetime], until: Optional[datetime]) -> str:
+    """Coarsest granularity that still resolves the requested window well"""
+    if since is None:
+        return "day"
+    window = (until or datetime.utcnow()) - since
+    for granularity, max_window in _GRANULARITY_MAX_WINDOW:
+        if window <= max_window:
+            return granularity
+    return "day"
+
+
+@dataclass
+class RollupDelta:
+    """Pending increments for one rollup bucket"""
+    outcomes: Dict[str, int] = field(default_factory=dict)
+    duration_count: int = 0
+    duration_sum: float = 0.0
+    duration_sum_sq: float = 0.0
+    duration_min: Optional[float] = None
+    duration_max: Optional[float] = None
+    sketch: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, outcome: str, duration_seconds: Optional[float]) -> None:
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        if outcome not in TERMINAL_OUTCOMES or duration_seconds is None:
+            return
+        self.duration_count += 1
+        self.duration_sum += duration_seconds
+        self.duration_sum_sq += duration_seconds * duration_seconds
+        self.duration_min = duration_seconds if self.duration_min is None else min(self.duration_min, duration_seconds)
+        self.duration_max = duration_seconds if self.duration_max is None else max(self.duration_max, duration_seconds)
+        key = sketch_key(duration_seconds)
+        self.sketch[key] = self.sketch.get(key, 0) + 1
+
+    def to_update(self, granularity: str, start: datetime, now: datetime) -> Dict[str, Any]:
+        """Mongo update document applying this delta with upsert"""
+        inc: Dict[str, Any] = dict(self.outcomes)
+        inc["executions"] = sum(self.outcomes.get(outcome, 0) for outcome in TERMINAL_OUTCOMES)
+        if self.duration_count:
+            inc["duration_count"] = self.duration_count
+            inc["duration_sum"] = self.duration_sum
+            inc["duration_sum_sq"] = self.duration_sum_sq
+        for key, count in self.sketch.items():
+            inc[f"sketch.{key}"] = count
+
+        retention = ROLLUP_RETENTION[granularity]
+        update: Dict[str, Any] = {
+            "$inc": inc,
+            "$set": {"updated_at": now},
+            "$setOnInsert": {"expires_at": start + retention if retention else None},
+        }
+        if self.duration_count:
+            update["$min"] = {"duration_min": self.duration_min}
+            update["$max"] = {"duration_max": self.duration_max}
+        return update
+
+
+@dataclass
+class StepRollupSummary:
+    """Merged metrics for one step across rollup buckets"""
+    step_id: str
+    completed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    waiting: int = 0
+    retried: int = 0
+    duration_count: int = 0
+    duration_sum: float = 0.0
+    duration_sum_sq: float = 0.0
+    duration_min: Optional[float] = None
+    duration_max: Optional[float] = None
+    sketch: Dict[str, int] = field(default_factory=dict)
+
+    def merge(self, bucket: Dict[str, Any]) -> None:
+        for outcome in ROLLUP_OUTCOMES:
+            setattr(self, outcome, getattr(self, outcome) + bucket.get(outcome, 0))
+        self.duration_count += bucket.get("duration_count", 0)
+        self.duration_sum += bucket.get("duration_sum", 0.0)
+        self.duration_sum_sq += bucket.get("duration_sum_sq", 0.0)
+        if bucket.get("duration_min") is not None:
+            self.duration_min = bucket["duration_min"] if self.duration_min is None else min(self.duration_min, bucket["duration_min"])
+        if bucket.get("duration_max") is not None:
+            self.duration_max = bucket["duration_max"] if self.duration_max is None else max(self.duration_max, bucket["duration_max"])
+        for key, count in (bucket.get("sketch") or {}).items():
+            self.sketch[key] = self.sketch.get(key, 0) + count
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = self.completed + self.failed + self.skipped
+        mean = self.duration_sum / self.duration_count if self.duration_count else 0.0
+        variance = (
+            max(self.duration_sum_sq / self.duration_count - mean * mean, 0.0)
+            if self.duration_count else 0.0
+        )
+        percentiles = [
+            # Clamp sketch estimates to the observed range
+            min(max(value, self.duration_min), self.duration_max) if value is not None else 0.0
+            for value in sketch_quantiles(self.sketch, DURATION_PERCENTILES)
+        ]
+        return {
+            "step_id": self.step_id,
+            "total_executions": total,
+            "completed_executions": self.completed,
+            "failed_executions": self.failed,
+            "skipped_executions": self.skipped,
+            "waiting_executions": self.waiting,
+            "retried_executions": self.retried,
+            "success_rate": round(self.completed / total * 100, 2) if total else 0.0,
+            "failure_rate": self.failed / total if total else 0.0,
+            "total_duration_seconds": self.duration_sum,
+            "avg_duration_seconds": mean,
+            "stddev_duration_seconds": math.sqrt(variance),
+            "min_duration_seconds": self.duration_min or 0.0,
+            "max_duration_seconds": self.duration_max or 0.0,
+            "p50_duration_seconds": percentiles[0],
+            "p90_duration_seconds": percentiles[1],
+            "p95_duration_seconds": percentiles[2],
+        }
+
+
+class StepMetricRollupService:
+    """Buffers executor outcomes and reads merged rollups"""
+
+    def __init__(self):
+        self._pending: Dict[Tuple[str, str, str, datetime], RollupDelta] = {}
+
+    @property
+    def pending_buckets(self) -> int:
+        return len(self._pending)
+
+    def record(
+        self,
+        workflow_id: str,
+        step_id: str,
+        outcome: str,
+        duration_seconds: Optional[float] = None,
+        timestamp: Optional[datetime] = None
+    ) -> None:
+        """Buffer one task outcome into every granularity's bucket"""
+        if outcome not in ROLLUP_OUTCOMES:
+            raise ValueError(f"Unknown rollup outcome: {outcome}")
+
+        timestamp = timestamp or datetime.utcnow()
+        for granularity in ROLLUP_GRANULARITIES:
+            key = (workflow_id, step_id, granularity, bucket_start(timestamp, granularity))
+            self._pending.setdefault(key, RollupDelta()).add(outcome, duration_seconds)
+
+    def build_operations(self, now: Optional[datetime] = None) -> List[UpdateOne]:
+        """Drain buffered deltas into upsert operations"""
+        now = now or datetime.utcnow()
+        pending, self._pending = self._pending, {}
+        return [
+            UpdateOne(
+                {
+                    "workflow_id": workflow_id,
+                    "step_id": step_id,
+                    "granularity": granularity,
+                    "bucket_start": start,
+                },
+                delta.to_update(granularity, start, now),
+                upsert=True
+            )
+            for (workflow_id, step_id, granularity, start), delta in pending.items()
+        ]
+
+    async def flush(self) -> int:
+        """Write buffered deltas; returns the number of buckets updated"""
+        operations = self.build_operations()
+        if not operations:
+            return 0
+
+        try:
+            await StepMetricRollup.get_motor_collection().bulk_write(operations, ordered=False)
+        except Exception as e:
+            # Metrics must never break workflow execution
+            logger.error(f"Failed to flush {len(operations)} step metric rollups: {str(e)}")
+            return 0
+        return len(operations)
+
+    async def summarize_steps(
+        self,
+        workflow_id: Optional[str] = None,
+        step_ids: Optional[List[str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        granularity: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Merged metrics per step over a time window, keyed by step_id.
+
+        Windows are aligned to bucket boundaries of the chosen granularity,
+        so `since` is rounded down to the start of its bucket.
+        """
+        granularity = granularity or choose_granularity(since, until)
+        query: Dict[str, Any] = {"granularity": granularity}
+        bounds: Dict[str, Any] = {}
+        if since:
+            bounds["$gte"] = bucket_start(since, granularity)
+        if until:
+            bounds["$lt"] = until
+        if bounds:
+            query["bucket_start"] = bounds
+        if workflow_id:
+            query["workflow_id"] = workflow_id
+        if step_ids is not None:
+            query["step_id"] = {"$in": list(step_ids)}
+
+        summaries: Dict[str, StepRollupSummary] = {}
+        cursor = StepMetricRollup.get_motor_collection().find(
+            query,
+            projection={"_id": 0, "expires_at": 0, "updated_at": 0}
+        )
+        async for bucket in cursor:
+            step_id = bucket["step_id"]
+            summaries.setdefault(step_id, StepRollupSummary(step_id=step_id)).merge(bucket)
+
+        return {step_id: summary.to_dict() for step_id, summary in summaries.items()}
+
+
+step_metric_rollups = StepMetricRollupService()
@@ -0,0 +1,95 @@
+"""
+In-memory workflow metadata for listings and progress.
+
+register_dag records, for each DAG, the values list rows and progress views
+need: the definition name, total step count, execution order and operator
+class per step. They are keyed by workflow_id and DAG version, so a page of
+instances needs no per-row WorkflowDefinition or WorkflowStep query.
+"""
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from ..workflows.dag import DAG
+
+
+def execution_order(tasks: Dict[str, Any]) -> Tuple[str, ...]:
+    """
+    Task ids in topological order of their downstream edges, ties broken by
+    definition order. Derived from the operators rather than dag.graph, which
+    is only populated by build_graph(); tasks on a cycle go last.
+    """
+    indegree = {task_id: 0 for task_id in tasks}
+    for task in tasks.values():
+        for downstream in task.downstream_tasks:
+            if downstream.task_id in indegree:
+                indegree[downstream.task_id] += 1
+
+    ready = deque(task_id for task_id, degree in indegree.items() if degree == 0)
+    order: List[str] = []
+    while ready:
+        task_id = ready.popleft()
+        order.append(task_id)
+        for downstream in tasks[task_id].downstream_tasks:
+            if downstream.task_id in indegree:
+                indegree[downstream.task_id] -= 1
+                if indegree[downstream.task_id] == 0:
+                    ready.append(downstream.task_id)
+
+    ordered = set(order)
+    return tuple(order) + tuple(task_id for task_id in tasks if task_id not in ordered)
+
+
+@dataclass(frozen=True)
+class WorkflowMetadata:
+    """Listing metadata of one workflow version"""
+    workflow_id: str
+    version: str
+    name: str
+    step_order: Tuple[str, ...]
+    operator_classes: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def total_steps(self) -> int:
+        return len(self.step_order)
+
+    @classmethod
+    def from_dag(cls, dag: "DAG", name: Optional[str] = None) -> "WorkflowMetadata":
+        return cls(
+            workflow_id=dag.dag_id,
+            version=dag.version,
+            name=name or dag.description or dag.dag_id,
+            step_order=execution_order(dag.tasks),
+            operator_classes={task_id: task.__class__.__name__ for task_id, task in dag.tasks.items()},
+        )
+
+
+class WorkflowMetadataCache:
+    """Workflow metadata by (workflow_id, version), plus the latest version"""
+
+    def __init__(self):
+        self._by_version: Dict[Tuple[str, str], WorkflowMetadata] = {}
+        self._latest: Dict[str, WorkflowMetadata] = {}
+
+    def register(self, dag: "DAG", name: Optional[str] = None) -> WorkflowMetadata:
+        """Record a DAG's metadata; the newest registration wins as latest"""
+        metadata = WorkflowMetadata.from_dag(dag, name)
+        self._by_version[(metadata.workflow_id, metadata.version)] = metadata
+        self._latest[metadata.workflow_id] = metadata
+        return metadata
+
+    def get(self, workflow_id: str, version: Optional[str] = None) -> Optional[WorkflowMetadata]:
+        """Metadata for a version if known, otherwise the latest registered"""
+        if version is not None:
+            metadata = self._by_version.get((workflow_id, version))
+            if metadata is not None:
+                return metadata
+        return self._latest.get(workflow_id)
+
+    def missing(self, workflow_ids: List[str]) -> List[str]:
+        return [workflow_id for workflow_id in workflow_ids if workflow_id not in self._latest]
+
+
+workflow_metadata = WorkflowMetadataCache()
@@ -0,0 +1,194 @@
+"""
+In-memory full-text search over the public workflow catalog.
+
+The index is built alongside each catalog snapshot, i.e. whenever DAGs are
+registered or plugins reloaded, so a query is a few dictionary lookups no
+matter how many workflows a tenant loads. Text is accent-folded and
+case-folded (our content is Spanish), stopwords are dropped per locale and
+plurals are lightly stemmed. Every term is also indexed by its prefixes of
+MIN_PREFIX_LENGTH or more characters (edge trigrams and up) so partial words
+match while the citizen is typing. Results are ranked by a field-weighted
+TF-IDF score.
+"""
+
+import bisect
+import math
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Relative weight of each searchable field
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "tags": 2.0,
+    "category": 1.5,
+    "description": 1.0,
+}
+
+# Score multiplier for a prefix match relative to an exact term match
+PREFIX_MATCH_WEIGHT = 0.6
+
+# Shortest prefix indexed for partial-word matching
+MIN_PREFIX_LENGTH = 3
+
+STOPWORDS = {
+    "es": {
+        "a", "al", "con", "de", "del", "el", "en", "la", "las", "lo", "los",
+        "o", "para", "por", "se", "su", "sus", "un", "una", "y",
+    },
+    "en": {
+        "a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with",
+    },
+}
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Case-fold and strip accents (e.g. "Trámite Año" -> "tramite ano")"""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(text).casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _stem(token: str) -> str:
+    # Plural folding: "licencias" -> "licencia", "tramites" -> "tramite"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: Optional[str], locale: str = "es", keep_stopwords: bool = False) -> List[str]:
+    """Normalized, stemmed search terms of a text, without stopwords"""
+    stopwords = set() if keep_stopwords else STOPWORDS.get(locale, STOPWORDS["es"])
+    return [
+        _stem(token)
+        for token in _NON_WORD.split(normalize_text(text))
+        if token and token not in stopwords
+    ]
+
+
+@dataclass
+class SearchDocument:
+    """An indexed workflow"""
+    data: Dict[str, Any]
+    category: str
+    sort_name: str
+
+
+@dataclass
+class WorkflowSearchIndex:
+    """Inverted index over workflow name, description, category and tags"""
+    locale: str
+    documents: List[SearchDocument] = field(default_factory=list)
+    # term -> {doc index: field-weighted term frequency}
+    postings: Dict[str, Dict[int, float]] = field(default_factory=dict)
+    # prefix (MIN_PREFIX_LENGTH+ chars) -> terms starting with it
+    prefixes: Dict[str, Set[str]] = field(default_factory=dict)
+    # sorted vocabulary, for prefixes shorter than MIN_PREFIX_LENGTH
+    vocabulary: List[str] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, workflows: Iterable[Dict[str, Any]], locale: str = "es") -> "WorkflowSearchIndex":
+        index = cls(locale=locale)
+        for data in workflows:
+            index._add(data)
+        index.vocabulary = sorted(index.postings)
+        return index
+
+    def _add(self, data: Dict[str, Any]) -> None:
+        doc_id = len(self.documents)
+        self.documents.append(SearchDocument(
+            data=data,
+            category=data.get("category") or "general",
+            sort_name=(data.get("name") or "").lower()
+        ))
+
+        fields = {
+            "name": data.get("name"),
+            "description": data.get("description"),
+            "category": data.get("category"),
+            "tags": " ".join(str(tag) for tag in data.get("tags") or []),
+        }
+        for field_name, text in fields.items():
+            for term in tokenize(text, self.locale):
+                doc_postings = self.postings.setdefault(term, {})
+                doc_postings[doc_id] = doc_postings.get(doc_id, 0.0) + FIELD_WEIGHTS[field_name]
+                for length in range(MIN_PREFIX_LENGTH, len(term) + 1):
+                    self.prefixes.setdefault(term[:length], set()).add(term)
+
+    def _idf(self, term: str) -> float:
+        return math.log(1 + len(self.documents) / len(self.postings[term]))
+
+    def _expand(self, query_term: str) -> Set[str]:
+        """Indexed terms that a query term matches as a prefix"""
+        if len(query_term) >= MIN_PREFIX_LENGTH:
+            return self.prefixes.get(query_term, set())
+        start = bisect.bisect_left(self.vocabulary, query_term)
+        matches = set()
+        for term in self.vocabulary[start:]:
+            if not term.startswith(query_term):
+                break
+            matches.add(term)
+        return matches
+
+    def _term_scores(self, query_term: str) -> Dict[int, float]:
+        """Best score per document for one query term"""
+        scores: Dict[int, float] = {}
+        for term in self._expand(query_term):
+            weight = 1.0 if term == query_term else PREFIX_MATCH_WEIGHT
+            idf = self._idf(term)
+            for doc_id, tf in self.postings[term].items():
+                score = weight * (1 + math.log(tf)) * idf
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+        return scores
+
+    def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        skip: int = 0,
+        limit: Optional[int] = None
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Rank workflows matching every query term.
+
+        Returns the total number of matches and the requested page. An empty
+        query lists every workflow (optionally within a category) by name.
+        """
+        # A query of only stopwords is most likely a word being typed ("de" ->
+        # "denuncia"), so keep them as prefixes rather than matching nothing
+        query_terms = list(dict.fromkeys(
+            tokenize(query, self.locale) or tokenize(query, self.locale, keep_stopwords=True)
+        ))
+
+        if query_terms:
+            scores: Optional[Dict[int, float]] = None
+            for query_term in query_terms:
+                term_scores = self._term_scores(query_term)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        doc_id: score + term_scores[doc_id]
+                        for doc_id, score in scores.items()
+                        if doc_id in term_scores
+                    }
+                if not scores:
+                    break
+            ranked = sorted(
+                (scores or {}).items(),
+                key=lambda item: (-item[1], self.documents[item[0]].sort_name)
+            )
+            doc_ids = [doc_id for doc_id, _ in ranked]
+        else:
+            doc_ids = sorted(range(len(self.documents)), key=lambda d: self.documents[d].sort_name)
+
+        if category:
+            doc_ids = [d for d in doc_ids if self.documents[d].category == category]
+
+        page = doc_ids[skip:skip + limit] if limit is not None else doc_ids[skip:]
+        return len(doc_ids), [self.documents[d].data for d in page]
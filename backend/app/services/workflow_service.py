@@ -16,6 +16,8 @@ from ..models.workflow import (
 from ..workflows.dag import DAG, DAGInstance, DAGBag, InstanceStatus
 from ..workflows.executor import DAGExecutor
 from ..workflows.operators.base import BaseOperator
+from .workflow_metadata import workflow_metadata
+from .instance_search import build_search_terms
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +90,7 @@ class WorkflowService:
             )
             await step.insert()
 
+        workflow_metadata.register(dag, name=workflow_def.name)
         return workflow_def
     
     def get_step_type_from_operator(self, operator: BaseOperator) -> str:
@@ -203,6 +206,9 @@ class WorkflowService:
         workflow_def.updated_by = updated_by
         
         await workflow_def.save()
+
+        from .public_workflow_catalog import public_workflow_catalog
+        public_workflow_catalog.invalidate()
         return workflow_def
     
     async def get_workflow_steps(self, workflow_id: str) -> List[WorkflowStep]:
@@ -248,6 +254,12 @@ class WorkflowService:
             context=dag_instance.context,
             completed_steps=list(dag_instance.completed_tasks),
             failed_steps=list(dag_instance.failed_tasks),
+            search_terms=build_search_terms(
+                dag_instance.instance_id,
+                dag_instance.dag.dag_id,
+                dag_instance.context,
+                workflow_name=f"{dag_instance.dag.name} {dag_instance.dag.description or ''}"
+            ),
             started_at=dag_instance.created_at
         )
         
@@ -478,12 +478,15 @@ class DAGBag:
     def __init__(self):
         self.dags: Dict[str, DAG] = {}
         self.instances: Dict[str, DAGInstance] = {}
+        # Bumped whenever the set of DAGs changes, so caches can detect it
+        self.version = 0
     
     def add_dag(self, dag: DAG):
         """Add DAG definition"""
         if dag.dag_id in self.dags:
             raise ValueError(f"DAG {dag.dag_id} already exists")
         self.dags[dag.dag_id] = dag
+        self.version += 1
     
     def get_dag(self, dag_id: str) -> Optional[DAG]:
         """Get DAG definition by ID"""
@@ -3,10 +3,11 @@ Simplified DAG Executor that always uses database as source of truth.
 No in-memory instance caching - always fetch fresh from database.
 """
 import copy
-from typing import Optional
+from typing import Any, Optional, Tuple
 from datetime import datetime
 import asyncio
 import logging
+import time
 from enum import Enum
 
 from .dag import InstanceStatus
@@ -16,6 +17,9 @@ from ..models.workflow import WorkflowInstance, EventType
 from .event_manager import WorkflowEventManager
 from ..core.config import settings
 from ..core.logging_config import set_workflow_context, clear_workflow_context
+from ..services.step_metric_rollups import step_metric_rollups
+from ..services.instance_search import build_search_terms
+from ..services.instance_updates import TERMINAL_STATUSES, instance_update, instance_updates
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +44,41 @@ _BASE64_IMAGE_PREFIXES = (
     "data:",     # data URL wrapper
 )
 
+# Task results mapped to the outcomes tracked in step metric rollups
+_ROLLUP_OUTCOMES = {
+    TaskStatus.CONTINUE: "completed",
+    TaskStatus.FAILED: "failed",
+    TaskStatus.SKIP: "skipped",
+    TaskStatus.WAITING: "waiting",
+    TaskStatus.RETRY: "retried",
+}
+
+
+def _rollup_outcome(
+    previous_status: Optional[str],
+    result: Any,
+    started_at: Any,
+    now: Optional[datetime] = None
+) -> Optional[Tuple[str, Optional[float]]]:
+    """
+    Rollup outcome and duration for a task execution, or None when the
+    attempt isn't a status change (a waiting task re-polled still waiting).
+    Durations run from the step's start time in its task state, so a step
+    that waited reports its whole span rather than the last poll.
+    """
+    outcome = _ROLLUP_OUTCOMES.get(result, "completed")
+    if outcome == "waiting" and previous_status == "waiting":
+        return None
+
+    if isinstance(started_at, str):
+        try:
+            started_at = datetime.fromisoformat(started_at)
+        except ValueError:
+            started_at = None
+    if not isinstance(started_at, datetime):
+        return outcome, None
+    return outcome, max(((now or datetime.utcnow()) - started_at).total_seconds(), 0.0)
+
 
 def _looks_like_image_base64(value: str) -> bool:
     """Cheap check: does this string start with a known image/PDF base64 prefix?"""
@@ -116,6 +155,8 @@ class DAGExecutor:
         # Performance metrics
         self._task_execution_times: dict[str, list[float]] = {}
         self._last_execution_time: dict[str, datetime] = {}
+        # Last (status, step, waiting_for, completed count) pushed to instance streams
+        self._pushed_state: dict[str, tuple] = {}
     
     async def start(self):
         """Start the executor"""
@@ -172,6 +213,7 @@ class DAGExecutor:
                 await self._execution_task
             except asyncio.CancelledError:
                 pass
+        await step_metric_rollups.flush()
         self.status = ExecutorStatus.STOPPED
         logger.info("DAG Executor stopped")
     
@@ -371,8 +413,14 @@ class DAGExecutor:
                 _strip_oversized_base64_blobs(snapshot)
                 db_instance.pre_task_context_snapshots[task_id] = snapshot
 
-            # Execute task with current context
+            # Execute task with current context. A task resumed from
+            # "waiting" keeps the start time of its first execution.
+            previous_state = dag_instance.task_states.get(task_id) or {}
+            previous_status = previous_state.get("status")
+            first_started_at = previous_state.get("started_at") if previous_status == "waiting" else None
             dag_instance.update_task_status(task_id, "executing")
+            if first_started_at:
+                dag_instance.task_states[task_id]["started_at"] = first_started_at
 
             # Run the task
 
@@ -442,6 +490,10 @@ class DAGExecutor:
                 })
 
                 result = TaskStatus.FAILED
+
+            rollup = _rollup_outcome(previous_status, result, dag_instance.task_states[task_id].get("started_at"))
+            if rollup:
+                step_metric_rollups.record(dag_instance.dag.dag_id, task_id, *rollup)
             
             # Update task status based on result
             # DEBUG: Log result handling
@@ -607,6 +659,7 @@ class DAGExecutor:
         new_status = self._map_status(dag_instance.status)
 
         await self._save_instance_state(dag_instance, db_instance, instance_id, new_status)
+        await step_metric_rollups.flush()
         
         # Log status change
         if old_status != new_status:
@@ -726,6 +779,7 @@ class DAGExecutor:
         dag_instance.context["workflow_id"] = dag_instance.dag.dag_id
 
         previous_step = db_instance.current_step
+        previous_status = db_instance.status
         new_step = dag_instance.current_task
 
         # Defensive sweep: capture/upload operators have a long history of
@@ -745,6 +799,12 @@ class DAGExecutor:
         db_instance.completed_steps = list(dag_instance.completed_tasks)
         db_instance.failed_steps = list(dag_instance.failed_tasks)
         db_instance.skipped_steps = list(dag_instance.skipped_tasks)
+        db_instance.search_terms = build_search_terms(
+            instance_id,
+            db_instance.workflow_id,
+            dag_instance.context,
+            workflow_name=f"{dag_instance.dag.name} {dag_instance.dag.description or ''}"
+        )
         db_instance.updated_at = datetime.utcnow()
 
         if new_status:
@@ -772,6 +832,51 @@ class DAGExecutor:
                     "Failed to publish STEP_ADVANCED for instance %s", instance_id
                 )
 
+        await self._push_instance_update(dag_instance, db_instance, previous_step, previous_status)
+
+    async def _push_instance_update(self, dag_instance, db_instance, previous_step, previous_status):
+        """Push step, status and waiting-for-input transitions to instance streams"""
+        instance_id = db_instance.instance_id
+        step = db_instance.current_step
+        waiting_for = None
+        state = dag_instance.task_states.get(step) if step else None
+        if state and state.get("status") == "waiting":
+            waiting_for = (
+                state.get("waiting_for")
+                or (state.get("output_data") or {}).get("waiting_for")
+                or dag_instance.context.get("waiting_for")
+                or "input"
+            )
+
+        pushed = (db_instance.status, step, waiting_for, len(db_instance.completed_steps))
+        if self._pushed_state.get(instance_id) == pushed:
+            return
+        if db_instance.status in TERMINAL_STATUSES:
+            self._pushed_state.pop(instance_id, None)
+        else:
+            self._pushed_state[instance_id] = pushed
+
+        if step != previous_step:
+            event = "step_advanced"
+        elif db_instance.status != previous_status:
+            event = "status_changed"
+        elif waiting_for:
+            event = "waiting_for_input"
+        else:
+            event = "updated"
+
+        await instance_updates.publish(instance_id, instance_update(
+            event=event,
+            instance_id=instance_id,
+            status=db_instance.status,
+            current_step=step,
+            previous_step=previous_step,
+            completed_steps=len(db_instance.completed_steps),
+            total_steps=len(dag_instance.dag.tasks),
+            waiting_for=waiting_for,
+            updated_at=db_instance.updated_at
+        ))
+
     async def _execute_retry_workflow_reset(self, dag_instance, db_instance, instance_id,
                                           next_task_id, failed_task_id, recovery_data, recovery_action):
         """
@@ -20,6 +20,7 @@ import numpy as np
 
 from .base import BaseOperator, TaskResult
 from ...core.config import settings
+from ...services.context_blobs import context_blobs, is_blob_ref
 
 logger = logging.getLogger(__name__)
 
@@ -149,6 +150,10 @@ Please extract the information and return only the JSON result, no additional te
         # Check if we have direct file content (base64 or bytes)
         file_content = file_data.get('base64', '') or file_data.get('content', '')
 
+        # Blob offloaded from the submitted data by submit-data
+        if not file_content and is_blob_ref(file_data):
+            file_content = await context_blobs.load(file_data)
+
         # If no direct content, try to download from S3
         if not file_content:
             s3_url = file_data.get('url')
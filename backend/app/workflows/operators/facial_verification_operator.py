@@ -21,6 +21,7 @@ from datetime import datetime
 from typing import Dict, Any, List, Optional, Union
 
 from .base import BaseOperator, TaskResult, TaskStatus
+from ...services.context_blobs import context_blobs, is_blob_ref
 
 # Import DeepFace with error handling
 try:
@@ -113,7 +114,7 @@ class FacialVerificationOperator(BaseOperator):
             logger.info(f"[FACIAL_VERIFICATION] Starting facial verification using {self.model_name}")
 
             # Extract source image
-            source_image = self._extract_image_from_context(context, self.source_image_key)
+            source_image = await self._extract_image_from_context(context, self.source_image_key)
             if source_image is None:
                 return TaskResult(
                     status=TaskStatus.FAILED,
@@ -123,7 +124,7 @@ class FacialVerificationOperator(BaseOperator):
             # Extract target images
             target_images = {}
             for target_key in self.target_image_keys:
-                target_image = self._extract_image_from_context(context, target_key)
+                target_image = await self._extract_image_from_context(context, target_key)
                 if target_image is not None:
                     target_images[target_key] = target_image
                 else:
@@ -208,8 +209,11 @@ class FacialVerificationOperator(BaseOperator):
                 error=error_msg
             )
 
-    def _extract_image_from_context(self, context: Dict[str, Any], key: str) -> Optional[str]:
-        """Extract base64 image from context using dot notation"""
+    async def _extract_image_from_context(self, context: Dict[str, Any], key: str) -> Optional[str]:
+        """
+        Extract base64 image from context using dot notation. Images that
+        submit-data offloaded to the blob store are loaded and re-encoded.
+        """
         try:
             # Support dot notation for nested keys
             current_value = context
@@ -222,6 +226,9 @@ class FacialVerificationOperator(BaseOperator):
                     logger.error(f"[FACIAL_VERIFICATION] Part '{part}' not found in context path {key}")
                     return None
 
+            if is_blob_ref(current_value):
+                current_value = base64.b64encode(await context_blobs.load(current_value)).decode('ascii')
+
             # Handle different possible image data formats
             if isinstance(current_value, str):
                 # Clean base64 string
@@ -233,9 +240,11 @@ class FacialVerificationOperator(BaseOperator):
                     return None
             elif isinstance(current_value, dict):
                 # Look for common image data keys
-                for image_key in ['image_data', 'content', 'data', 'front_image', 'back_image']:
+                for image_key in ['image_data', 'base64', 'content', 'data', 'front_image', 'back_image']:
                     if image_key in current_value:
                         image_data = current_value[image_key]
+                        if is_blob_ref(image_data):
+                            image_data = base64.b64encode(await context_blobs.load(image_data)).decode('ascii')
                         if isinstance(image_data, str):
                             cleaned_base64 = self._clean_base64_string(image_data)
                             if cleaned_base64 and len(cleaned_base64) > 100:
@@ -208,8 +208,8 @@ class IDCaptureOperator(ImageCaptureOperator):
             capture_metadata_raw = document_input.get('metadata', {})
 
             # Use base class methods for extraction - exactly like SelfieOperator!
-            front_data, front_file_metadata = self.extract_image_from_formdata(front_data_raw)
-            back_data, back_file_metadata = self.extract_image_from_formdata(back_data_raw)
+            front_data, front_file_metadata = await self.load_image_from_formdata(front_data_raw)
+            back_data, back_file_metadata = await self.load_image_from_formdata(back_data_raw)
             capture_metadata = self.parse_metadata(capture_metadata_raw)
 
             # Merge file metadata into capture metadata
@@ -26,6 +26,7 @@ import cv2
 import numpy as np
 
 from .base import BaseOperator, TaskResult, TaskStatus
+from ...services.context_blobs import context_blobs, is_blob_ref
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +76,22 @@ class ImageCaptureOperator(BaseOperator):
             # Direct string/bytes data
             return image_data_raw, {}
 
+    async def load_image_from_formdata(self, image_data_raw: Any) -> tuple[Union[str, bytes], Dict[str, Any]]:
+        """
+        Like extract_image_from_formdata, also resolving images that submit-data
+        offloaded to the blob store. Resolved images are returned as base64 so
+        callers see the same shape as an inline submission.
+        """
+        if is_blob_ref(image_data_raw):
+            content = await context_blobs.load(image_data_raw)
+            file_metadata = {
+                'filename': image_data_raw.get('filename'),
+                'content_type': image_data_raw.get('content_type'),
+                'file_size': image_data_raw.get('size')
+            }
+            return base64.b64encode(content).decode('ascii'), file_metadata
+        return self.extract_image_from_formdata(image_data_raw)
+
     def convert_to_bytes(self, image_data: Union[str, bytes]) -> Optional[bytes]:
         """Convert base64 string or bytes to bytes"""
         if isinstance(image_data, str):
@@ -14,6 +14,7 @@ from datetime import datetime, timedelta
 
 from .base import BaseOperator, TaskResult, TaskStatus
 from ..polling_strategy import PollingConfig
+from ...services.context_blobs import context_blobs, is_blob_ref
 
 logger = logging.getLogger(__name__)
 
@@ -494,7 +495,15 @@ class OpenProjectAssignmentOperator(BaseOperator):
 
     def _normalize_file_info(self, data: Dict, source_key: str) -> Optional[Dict]:
         """Normalize file info from various operator formats."""
-        if "content" in data or "base64" in data:
+        if is_blob_ref(data):
+            return {
+                "type": "blob",
+                "ref": data,
+                "filename": data.get("filename") or data.get("name") or f"file_from_{source_key}",
+                "content_type": data.get("content_type") or "application/octet-stream",
+                "source": source_key
+            }
+        elif "content" in data or "base64" in data:
             return {
                 "type": "base64",
                 "content": data.get("content") or data.get("base64"),
@@ -614,6 +623,8 @@ class OpenProjectAssignmentOperator(BaseOperator):
             # Get file content based on type
             if file_info["type"] == "base64":
                 file_content = base64.b64decode(file_info["content"])
+            elif file_info["type"] == "blob":
+                file_content = await context_blobs.load(file_info["ref"])
             elif file_info["type"] == "url":
                 # Download from URL
                 async with aiohttp.ClientSession() as session:
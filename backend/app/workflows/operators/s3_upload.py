@@ -3,12 +3,14 @@ S3Upload Operator for uploading files to Amazon S3.
 Handles file uploads from citizen portals and stores them in S3 buckets.
 """
 import os
+import base64
 import boto3
 import hashlib
 import mimetypes
 import re
 import unicodedata
-from typing import Dict, Any, Optional, List, Union
+from botocore.config import Config
+from typing import Dict, Any, Iterator, Optional, List, Union
 from datetime import datetime
 from pathlib import Path
 import tempfile
@@ -18,6 +20,19 @@ from concurrent.futures import ThreadPoolExecutor
 
 from .base import BaseOperator, TaskResult, TaskStatus
 from ...core.config import settings
+from ...services.context_blobs import context_blobs, is_blob_ref
+
+# Archivos de un mismo paso que se suben a la vez
+MAX_CONCURRENT_UPLOADS = 4
+# A partir de este tamaño se usa multipart upload en vez de un put_object
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+# Tamaño de cada parte (S3 exige >= 5 MB salvo la última); múltiplo de 3
+# para que cada parte corresponda a un tramo entero de base64
+MULTIPART_PART_SIZE = 8 * 1024 * 1024 - (8 * 1024 * 1024) % 3
+# Partes en vuelo por archivo: acota la memoria a ~N partes por upload
+MAX_CONCURRENT_PARTS = 4
+
+_NON_BASE64 = re.compile(r"[^A-Za-z0-9+/=]")
 
 
 def _sanitize_filename(filename: str) -> str:
@@ -35,6 +50,43 @@ def _sanitize_filename(filename: str) -> str:
     return cleaned or "file"
 
 
+def _normalize_base64(encoded: str) -> str:
+    """Quita saltos de línea/espacios como lo hace b64decode, sin copiar el
+    string en el caso común de base64 limpio."""
+    if _NON_BASE64.search(encoded):
+        encoded = _NON_BASE64.sub("", encoded)
+    if len(encoded) % 4:
+        raise ValueError("Incorrect base64 padding")
+    return encoded
+
+
+def _decoded_size(encoded: str) -> int:
+    """Tamaño en bytes del contenido de un base64 normalizado, sin decodificarlo."""
+    return len(encoded) // 4 * 3 - encoded[-2:].count("=")
+
+
+def _iter_base64_parts(encoded: str, part_size: int = MULTIPART_PART_SIZE) -> Iterator[bytes]:
+    """Decodifica un base64 normalizado parte por parte, para que el archivo
+    completo nunca exista decodificado en memoria."""
+    step = part_size // 3 * 4
+    for start in range(0, len(encoded), step):
+        yield base64.b64decode(encoded[start:start + step])
+
+
+def _iter_bytes_parts(content: bytes, part_size: int = MULTIPART_PART_SIZE) -> Iterator[bytes]:
+    for start in range(0, len(content), part_size):
+        yield content[start:start + part_size]
+
+
+def _iter_file_parts(path: str, part_size: int = MULTIPART_PART_SIZE) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(part_size)
+            if not chunk:
+                return
+            yield chunk
+
+
 class S3UploadOperator(BaseOperator):
     """
     Operator for uploading files to Amazon S3.
@@ -124,7 +176,9 @@ class S3UploadOperator(BaseOperator):
         return boto3.client(
             's3',
             region_name=aws_region,
-            endpoint_url=endpoint_url
+            endpoint_url=endpoint_url,
+            # One connection per concurrent part upload
+            config=Config(max_pool_connections=MAX_CONCURRENT_UPLOADS * MAX_CONCURRENT_PARTS)
         )
 
     def _validate_file(self, file_data: Dict[str, Any]) -> Optional[str]:
@@ -341,6 +395,145 @@ class S3UploadOperator(BaseOperator):
             if isinstance(aggregate, dict):
                 strip(aggregate)
 
+    def _put_params(self, s3_key: str, content_type: str, metadata: Dict[str, str]) -> Dict[str, Any]:
+        """Parameters shared by put_object and create_multipart_upload"""
+        params = {
+            'Bucket': self.bucket_name,
+            'Key': s3_key,
+            'ContentType': content_type,
+            'Metadata': metadata,
+            'StorageClass': self.storage_class,
+            'ACL': self.acl
+        }
+
+        # Only add ServerSideEncryption for real AWS S3 (not MinIO)
+        endpoint_url = os.getenv("S3_ENDPOINT_URL")
+        if not endpoint_url or "amazonaws.com" in endpoint_url:
+            params['ServerSideEncryption'] = self.server_side_encryption
+        return params
+
+    def _object_url(self, s3_key: str) -> str:
+        """Public URL, or a presigned URL valid for 7 days"""
+        if self.make_public:
+            return f"https://{self.bucket_name}.s3.amazonaws.com/{s3_key}"
+        return self.s3_client.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.bucket_name, 'Key': s3_key},
+            ExpiresIn=604800  # 7 days
+        )
+
+    async def _multipart_upload_to_s3(
+        self,
+        parts: Iterator[bytes],
+        size: int,
+        s3_key: str,
+        content_type: str,
+        metadata: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """
+        Upload a large file as a multipart upload with parallel parts.
+
+        Parts are pulled from ``parts`` only when an upload slot is free, so at
+        most MAX_CONCURRENT_PARTS parts of this file are held in memory. The
+        multipart upload is aborted if any part fails.
+
+        Args:
+            parts: Iterator yielding the file content part by part
+            size: Total file size in bytes
+            s3_key: S3 object key
+            content_type: MIME content type
+            metadata: Metadata dictionary
+
+        Returns:
+            Upload result dictionary (same shape as ``_upload_file_to_s3``)
+        """
+        loop = asyncio.get_event_loop()
+        print(f"      Starting multipart upload to bucket: {self.bucket_name}")
+        print(f"      S3 key: {s3_key} ({size} bytes)")
+
+        upload_id = None
+        try:
+            created = await loop.run_in_executor(
+                self.executor,
+                lambda: self.s3_client.create_multipart_upload(**self._put_params(s3_key, content_type, metadata))
+            )
+            upload_id = created["UploadId"]
+
+            slots = asyncio.Semaphore(MAX_CONCURRENT_PARTS)
+            completed_parts: List[Dict[str, Any]] = []
+
+            async def upload_part(part_number: int, body: bytes) -> None:
+                try:
+                    response = await loop.run_in_executor(
+                        self.executor,
+                        lambda: self.s3_client.upload_part(
+                            Bucket=self.bucket_name,
+                            Key=s3_key,
+                            UploadId=upload_id,
+                            PartNumber=part_number,
+                            Body=body
+                        )
+                    )
+                    completed_parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+                finally:
+                    slots.release()
+
+            pending = []
+            part_number = 0
+            while True:
+                await slots.acquire()
+                # Decoding/reading the next part happens off the event loop too
+                body = await loop.run_in_executor(self.executor, next, parts, None)
+                if body is None:
+                    slots.release()
+                    break
+                part_number += 1
+                pending.append(asyncio.ensure_future(upload_part(part_number, body)))
+                if any(task.done() and task.exception() for task in pending):
+                    break
+            for outcome in await asyncio.gather(*pending, return_exceptions=True):
+                if isinstance(outcome, Exception):
+                    raise outcome
+
+            response = await loop.run_in_executor(
+                self.executor,
+                lambda: self.s3_client.complete_multipart_upload(
+                    Bucket=self.bucket_name,
+                    Key=s3_key,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": sorted(completed_parts, key=lambda p: p["PartNumber"])}
+                )
+            )
+            print(f"      Multipart upload successful ({part_number} parts). ETag: {response.get('ETag', 'unknown')}")
+
+            return {
+                "success": True,
+                "s3_key": s3_key,
+                "bucket": self.bucket_name,
+                "url": self._object_url(s3_key),
+                "etag": response.get('ETag', '').strip('"'),
+                "version_id": response.get('VersionId'),
+                "size": size
+            }
+
+        except Exception as e:
+            print(f"      ❌ S3 multipart upload failed: {str(e)}")
+            if upload_id:
+                try:
+                    await loop.run_in_executor(
+                        self.executor,
+                        lambda: self.s3_client.abort_multipart_upload(
+                            Bucket=self.bucket_name, Key=s3_key, UploadId=upload_id
+                        )
+                    )
+                except Exception as abort_error:
+                    print(f"      ⚠️ Could not abort multipart upload {upload_id}: {abort_error}")
+            return {
+                "success": False,
+                "error": str(e),
+                "s3_key": s3_key
+            }
+
     def _upload_file_to_s3(
         self,
         file_content: bytes,
@@ -364,43 +557,19 @@ class S3UploadOperator(BaseOperator):
         print(f"      S3 key: {s3_key}")
         print(f"      Content size: {len(file_content)} bytes")
         try:
-            # Prepare upload parameters
-            put_params = {
-                'Bucket': self.bucket_name,
-                'Key': s3_key,
-                'Body': file_content,
-                'ContentType': content_type,
-                'Metadata': metadata,
-                'StorageClass': self.storage_class,
-                'ACL': self.acl
-            }
-
-            # Only add ServerSideEncryption for real AWS S3 (not MinIO)
-            endpoint_url = os.getenv("S3_ENDPOINT_URL")
-            if not endpoint_url or "amazonaws.com" in endpoint_url:
-                put_params['ServerSideEncryption'] = self.server_side_encryption
+            put_params = self._put_params(s3_key, content_type, metadata)
+            put_params['Body'] = file_content
 
             # Upload to S3
             print(f"      Calling S3 put_object...")
             response = self.s3_client.put_object(**put_params)
             print(f"      S3 upload successful! ETag: {response.get('ETag', 'unknown')}")
 
-            # Generate URL
-            if self.make_public:
-                url = f"https://{self.bucket_name}.s3.amazonaws.com/{s3_key}"
-            else:
-                # Generate presigned URL (valid for 7 days)
-                url = self.s3_client.generate_presigned_url(
-                    'get_object',
-                    Params={'Bucket': self.bucket_name, 'Key': s3_key},
-                    ExpiresIn=604800  # 7 days
-                )
-
             return {
                 "success": True,
                 "s3_key": s3_key,
                 "bucket": self.bucket_name,
-                "url": url,
+                "url": self._object_url(s3_key),
                 "etag": response.get('ETag', '').strip('"'),
                 "version_id": response.get('VersionId'),
                 "size": len(file_content)
@@ -423,11 +592,14 @@ class S3UploadOperator(BaseOperator):
         tmp_s3_bucket: str,
         filename: str,
         context: Dict[str, Any],
+        delete_source: bool = True,
     ) -> Dict[str, Any]:
         """Mueve un archivo pre-subido por `submit-data` (vivía en
         `tmp/<instance>/<task>/<field>/...`) al destino final del operador.
         Devuelve el mismo shape que `_process_file_upload` para que el
-        caller no se entere de qué rama tomó."""
+        caller no se entere de qué rama tomó. Los blobs content-addressed
+        (`context_blobs`) se comparten entre envíos: se copian sin borrarlos
+        (`delete_source=False`)."""
         from ...services import s3_storage
 
         s3_key = self._generate_s3_key(filename, context)
@@ -473,29 +645,21 @@ class S3UploadOperator(BaseOperator):
             }
 
         # Best-effort cleanup del tmp; si falla no rompe el upload.
-        try:
-            await loop.run_in_executor(
-                self.executor,
-                lambda: s3_storage.delete_object(tmp_s3_bucket, tmp_s3_key),
-            )
-        except Exception as e:
-            print(f"⚠️ Could not delete tmp object {tmp_s3_key}: {e}")
-
-        if self.make_public:
-            url = f"https://{self.bucket_name}.s3.amazonaws.com/{s3_key}"
-        else:
-            url = self.s3_client.generate_presigned_url(
-                'get_object',
-                Params={'Bucket': self.bucket_name, 'Key': s3_key},
-                ExpiresIn=604800,
-            )
+        if delete_source:
+            try:
+                await loop.run_in_executor(
+                    self.executor,
+                    lambda: s3_storage.delete_object(tmp_s3_bucket, tmp_s3_key),
+                )
+            except Exception as e:
+                print(f"⚠️ Could not delete tmp object {tmp_s3_key}: {e}")
 
         return {
             "success": True,
             "filename": filename,
             "s3_key": s3_key,
             "bucket": self.bucket_name,
-            "url": url,
+            "url": self._object_url(s3_key),
             "size": file_data.get("size", 0),
         }
 
@@ -544,20 +708,40 @@ class S3UploadOperator(BaseOperator):
                 tmp_s3_bucket=tmp_s3_bucket,
                 filename=filename,
                 context=context,
+                delete_source=not is_blob_ref(file_data),
             )
 
         # Get file content - check both 'content' and 'base64' keys
         file_content = file_data.get("content") or file_data.get("base64")
+        if not file_content and is_blob_ref(file_data):
+            # Blob offloaded by submit-data to the local store
+            try:
+                file_content = await context_blobs.load(file_data)
+            except Exception as e:
+                print(f"❌ Could not load blob {file_data.get('blob_sha256')}: {e}")
+                return {
+                    "filename": filename,
+                    "success": False,
+                    "error": f"Failed to load stored file: {str(e)}"
+                }
         print(f"   Content type: {type(file_content)}")
         print(f"   Content length: {len(file_content) if file_content else 'None'}")
 
+        # Large files are uploaded in parts, decoded/read one part at a time
+        parts: Optional[Iterator[bytes]] = None
+        size = 0
+
         if isinstance(file_content, str):
             # Base64 encoded content
-            print(f"   Decoding base64 content...")
-            import base64
             try:
-                file_content = base64.b64decode(file_content)
-                print(f"   Decoded to {len(file_content)} bytes")
+                encoded = _normalize_base64(file_content)
+                size = _decoded_size(encoded)
+                if size >= MULTIPART_THRESHOLD:
+                    parts = _iter_base64_parts(encoded)
+                else:
+                    print(f"   Decoding base64 content...")
+                    file_content = base64.b64decode(encoded)
+                    print(f"   Decoded to {len(file_content)} bytes")
             except Exception as e:
                 print(f"❌ Base64 decode failed: {e}")
                 return {
@@ -565,14 +749,22 @@ class S3UploadOperator(BaseOperator):
                     "success": False,
                     "error": f"Failed to decode base64 content: {str(e)}"
                 }
-        elif not isinstance(file_content, bytes):
+        elif isinstance(file_content, bytes):
+            size = len(file_content)
+            if size >= MULTIPART_THRESHOLD:
+                parts = _iter_bytes_parts(file_content)
+        else:
             # Try to read from file path
             file_path = file_data.get("path")
             print(f"   Trying to read from file path: {file_path}")
             if file_path and os.path.exists(file_path):
-                async with aiofiles.open(file_path, 'rb') as f:
-                    file_content = await f.read()
-                print(f"   Read {len(file_content)} bytes from file")
+                size = os.path.getsize(file_path)
+                if size >= MULTIPART_THRESHOLD:
+                    parts = _iter_file_parts(file_path)
+                else:
+                    async with aiofiles.open(file_path, 'rb') as f:
+                        file_content = await f.read()
+                    print(f"   Read {len(file_content)} bytes from file")
             else:
                 print(f"❌ No valid file content or path provided")
                 print(f"   Available file_data keys: {list(file_data.keys())}")
@@ -606,10 +798,16 @@ class S3UploadOperator(BaseOperator):
 
         # Upload to S3 in thread pool to avoid blocking
         print(f"   Uploading to S3: {s3_key}")
-        print(f"   Content size: {len(file_content)} bytes")
+        print(f"   Content size: {size} bytes")
         print(f"   Content type: {content_type}")
         print(f"   Metadata: {metadata}")
 
+        if parts is not None:
+            result = await self._multipart_upload_to_s3(parts, size, s3_key, content_type, metadata)
+            print(f"   S3 upload result: {result}")
+            result["filename"] = filename
+            return result
+
         loop = asyncio.get_event_loop()
         result = await loop.run_in_executor(
             self.executor,
@@ -639,8 +837,8 @@ class S3UploadOperator(BaseOperator):
             # Initialize S3 client
             self.s3_client = self._init_s3_client()
 
-            # Create a new executor for this execution
-            self.executor = ThreadPoolExecutor(max_workers=5)
+            # Create a new executor for this execution: one thread per part in flight
+            self.executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_UPLOADS * MAX_CONCURRENT_PARTS)
 
             # Get files from context - support nested keys for task output data
             is_grouped = "[]" in self.file_source
@@ -681,12 +879,14 @@ class S3UploadOperator(BaseOperator):
 
             print(f"☁️ S3UploadOperator: Processing {len(files_data)} file(s) asynchronously")
 
-            # Process uploads asynchronously
-            tasks = [
-                self._process_file_upload(file_data, context)
-                for file_data in files_data
-            ]
-            results = await asyncio.gather(*tasks)
+            # Process uploads concurrently, MAX_CONCURRENT_UPLOADS files at a time
+            upload_slots = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
+
+            async def upload(file_data: Dict[str, Any]) -> Dict[str, Any]:
+                async with upload_slots:
+                    return await self._process_file_upload(file_data, context)
+
+            results = await asyncio.gather(*(upload(file_data) for file_data in files_data))
 
             # Process results
             successful_uploads = [r for r in results if r.get("success")]
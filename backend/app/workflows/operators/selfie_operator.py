@@ -180,7 +180,7 @@ class SelfieOperator(ImageCaptureOperator):
             capture_metadata_raw = selfie_input.get('metadata', {})
 
             # Use base class methods for extraction and parsing
-            image_data, file_metadata = self.extract_image_from_formdata(image_data_raw)
+            image_data, file_metadata = await self.load_image_from_formdata(image_data_raw)
             capture_metadata = self.parse_metadata(capture_metadata_raw)
 
             # Merge file metadata into capture metadata
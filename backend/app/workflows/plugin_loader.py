@@ -19,6 +19,7 @@ import yaml
 import json
 
 from ..services.workflow_service import workflow_service
+from ..services.workflow_metadata import workflow_metadata
 from .dag import DAG
 
 
@@ -467,6 +468,7 @@ class WorkflowPluginManager:
                             
                         # Add DAG to the DAGBag
                         workflow_service.dag_bag.add_dag(dag)
+                        workflow_metadata.register(dag)
                         workflow_ids_loaded.add(dag.dag_id)
                         total_loaded += 1
                         print(f"   ✅ Registered DAG: {dag.dag_id}")
@@ -0,0 +1,93 @@
+"""
+Unit tests for single-pass assignment statistics.
+
+These tests run without Mongo:
+- assignment_stats_pipeline: every breakdown is a branch of one $facet
+- AssignmentStatsCache: one aggregation per filter within the TTL
+- AssignmentService.get_assignment_statistics: derived from the facets
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services import assignment_stats as stats_module
+from app.services.assignment_service import AssignmentService
+from app.services.assignment_stats import AssignmentStatsCache, assignment_stats_pipeline
+
+FACETS = {
+    "by_status": [{"_id": "pending_review", "count": 3}, {"_id": "under_review", "count": 2}, {"_id": "completed", "count": 5}],
+    "by_user": [{"_id": "u1", "count": 4}],
+    "by_team": [{"_id": "t1", "count": 10}],
+    "by_workflow_type": [{"_id": "admin", "count": 10}],
+    "by_assignment_type": [{"_id": "automatic", "count": 6}, {"_id": "manual", "count": 2}],
+    "completed_today": [{"count": 1}],
+    "overdue": [],
+}
+
+
+class _FakeCursor:
+    def __init__(self, result):
+        self._result = result
+
+    async def to_list(self):
+        return self._result
+
+
+@pytest.fixture
+def aggregations(monkeypatch):
+    calls = []
+
+    def fake_aggregate(pipeline):
+        calls.append(pipeline)
+        return _FakeCursor([FACETS])
+
+    monkeypatch.setattr(stats_module.WorkflowInstance, "aggregate", fake_aggregate)
+    return calls
+
+
+def test_pipeline_is_one_match_and_facet():
+    pipeline = assignment_stats_pipeline({"assigned_team_id": "t1"}, datetime(2026, 1, 1), datetime(2025, 12, 30))
+
+    assert pipeline[0] == {"$match": {"assigned_team_id": "t1"}}
+    assert set(pipeline[1]["$facet"]) == {
+        "by_status", "by_user", "by_team", "by_workflow_type", "by_assignment_type", "completed_today", "overdue"
+    }
+
+
+@pytest.mark.asyncio
+async def test_cache_serves_repeat_filters_from_one_aggregation(aggregations):
+    cache = AssignmentStatsCache(ttl_seconds=60)
+
+    stats = await cache.get({"assigned_team_id": "t1"})
+    assert stats["by_status"]["completed"] == 5
+    assert stats["completed_today"] == 1
+    assert stats["overdue"] == 0
+
+    await cache.get({"assigned_team_id": "t1"})
+    assert len(aggregations) == 1
+    await cache.get({"assigned_team_id": "t1"}, use_cache=False)
+    await cache.get({"assigned_team_id": "t2"})
+    assert len(aggregations) == 3
+
+
+@pytest.mark.asyncio
+async def test_service_statistics_come_from_the_facets(aggregations, monkeypatch):
+    monkeypatch.setattr(stats_module.assignment_stats, "_stats", {})
+
+    stats = await AssignmentService().get_assignment_statistics()
+
+    assert stats["automatic_assignments"] == 6
+    assert stats["manual_assignments"] == 2
+    assert stats["assigned_instances"] == 3
+    assert stats["in_progress_instances"] == 2
+    assert stats["automation_rate"] == 0.75
+    assert len(aggregations) == 1
@@ -0,0 +1,210 @@
+"""
+Unit tests for the aggregated workload model of AssignmentService.
+
+These tests run without Mongo:
+- workload_pipeline: one $facet aggregation for team and user counts
+- WorkloadSnapshot: loads teams once and keeps counts current in memory
+- auto_assign_instance: a bulk run costs a fixed number of queries
+- bulk_auto_assign: balanced batch solve, one bulk_write and one audit insert
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services import assignment_service as assignment_module
+from app.services.assignment_service import (
+    ACTIVE_ASSIGNMENT_STATUSES,
+    AssignmentRule,
+    AssignmentService,
+    AssignmentStrategy,
+    UNASSIGNED_QUERY,
+    WorkloadSnapshot,
+    workload_pipeline,
+)
+
+
+class _FakeCursor:
+    def __init__(self, result):
+        self._result = result
+
+    async def to_list(self):
+        return self._result
+
+
+def _team(team_id, members=2):
+    return SimpleNamespace(team_id=team_id, members=[object()] * members, specializations=[])
+
+
+def _user(user_id, *team_ids):
+    return SimpleNamespace(id=user_id, team_ids=list(team_ids), max_concurrent_tasks=5, specializations=[])
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    calls = []
+    teams = [_team("t1"), _team("t2")]
+    users = [_user("u1", "t1"), _user("u2", "t1"), _user("u3", "t2")]
+
+    def fake_team_find(query):
+        calls.append("teams")
+        return _FakeCursor(teams)
+
+    def fake_user_find(query):
+        calls.append("users")
+        return _FakeCursor(users)
+
+    def fake_aggregate(pipeline):
+        calls.append("workload")
+        return _FakeCursor([{
+            "teams": [{"_id": "t1", "active": 4}],
+            "users": [{"_id": "u1", "active": 3, "in_progress": 1, "total": 4}],
+        }])
+
+    monkeypatch.setattr(assignment_module.TeamModel, "find", fake_team_find)
+    monkeypatch.setattr(assignment_module.UserModel, "find", fake_user_find)
+    monkeypatch.setattr(assignment_module.WorkflowInstance, "aggregate", fake_aggregate)
+    return calls
+
+
+def test_pipeline_counts_teams_and_users_in_one_pass():
+    pipeline = workload_pipeline(["t1"], ["u1"])
+
+    assert len(pipeline) == 2
+    facets = pipeline[1]["$facet"]
+    assert facets["teams"][0]["$match"]["assignment_status"] == {"$in": ACTIVE_ASSIGNMENT_STATUSES}
+    assert set(facets["users"][1]["$group"]) == {"_id", "total", "active", "in_progress"}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_loads_once_and_tracks_assignments(queries):
+    snapshot = WorkloadSnapshot()
+    teams = [_team("t1"), _team("t2")]
+
+    await snapshot.load(teams)
+    await snapshot.load(teams)
+    assert queries == ["users", "workload"]
+
+    assert snapshot.team_workload(teams[0]) == 2.0
+    assert snapshot.team_workload(teams[1]) == 0.0
+    assert [u.id for u in snapshot.team_users["t1"]] == ["u1", "u2"]
+    assert snapshot.user_workload(_user("u1")).in_progress_instances == 1
+
+    snapshot.record_assignment("t2", "u3")
+    assert snapshot.team_workload(teams[1]) == 0.5
+    assert snapshot.user_workload(_user("u3")).total_assigned == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_run_balances_users_with_constant_queries(queries, monkeypatch):
+    service = AssignmentService()
+    service.default_rules["default"] = AssignmentRule(
+        strategy=AssignmentStrategy.WORKLOAD_BASED,
+        prefer_team_assignment=False,
+        max_instances_per_user=5
+    )
+
+    assigned = []
+
+    async def fake_execute(instance, team_id, user_id, rule, confidence):
+        assigned.append((team_id, user_id))
+        return True
+
+    monkeypatch.setattr(service, "_execute_assignment", fake_execute)
+
+    workload = WorkloadSnapshot()
+    for n in range(4):
+        instance = SimpleNamespace(instance_id=f"i-{n}")
+        assert await service.auto_assign_instance(instance, None, workload)
+
+    assert queries == ["teams", "users", "workload"]
+    # u1 already carries 4 assignments, so the others are filled first
+    assert [user for _, user in assigned] == ["u3", "u2", "u3", "u2"]
+
+
+class _FakeCollection:
+    def __init__(self, matched=None, docs=()):
+        self.writes = []
+        self.matched = matched
+        self.docs = list(docs)
+
+    async def bulk_write(self, operations, ordered=True):
+        self.writes.append(operations)
+        matched = len(operations) if self.matched is None else self.matched
+        return SimpleNamespace(matched_count=matched)
+
+    async def find(self, query, projection=None):
+        for doc in self.docs:
+            yield doc
+
+
+class _FakeAuditLog:
+    inserted = []
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    @classmethod
+    async def insert_many(cls, logs):
+        cls.inserted.append(logs)
+
+
+@pytest.fixture
+def bulk(queries, monkeypatch):
+    collection = _FakeCollection()
+    _FakeAuditLog.inserted = []
+    monkeypatch.setattr(assignment_module.WorkflowInstance, "get_motor_collection", lambda: collection)
+    monkeypatch.setattr(assignment_module, "WorkflowAuditLog", _FakeAuditLog)
+    return collection
+
+
+def _summary(n):
+    return SimpleNamespace(id=f"oid-{n}", instance_id=f"i-{n}", workflow_id="licencia")
+
+
+@pytest.mark.asyncio
+async def test_bulk_assign_balances_teams_in_one_write(bulk, queries):
+    service = AssignmentService()
+
+    outcomes = await service.bulk_auto_assign([_summary(n) for n in range(6)], {}, actor="admin-1")
+
+    # t1 starts with 4 open instances over 2 members, t2 with none
+    assert [o.team_id for o in outcomes] == ["t2"] * 4 + ["t1", "t2"]
+    assert all(o.success for o in outcomes)
+    assert queries == ["teams", "users", "workload"]
+
+    assert len(bulk.writes) == 1
+    operation = bulk.writes[0][0]
+    assert operation._filter == {"_id": "oid-0", **UNASSIGNED_QUERY}
+    assert operation._doc["$set"]["assigned_team_id"] == "t2"
+
+    assert len(_FakeAuditLog.inserted) == 1
+    assert [log.instance_id for log in _FakeAuditLog.inserted[0]] == [f"i-{n}" for n in range(6)]
+
+
+@pytest.mark.asyncio
+async def test_bulk_assign_respects_user_caps_and_concurrent_assignments(bulk, queries):
+    service = AssignmentService()
+    service.default_rules["default"] = AssignmentRule(
+        strategy=AssignmentStrategy.WORKLOAD_BASED,
+        prefer_team_assignment=False,
+        max_instances_per_user=2
+    )
+    bulk.matched = 3
+    bulk.docs = [{"instance_id": "i-0", "assigned_at": None}]
+
+    outcomes = await service.bulk_auto_assign([_summary(n) for n in range(6)], {}, actor="admin-1")
+
+    # u1 is at its cap already; u2 and u3 take two each, the rest cannot be placed
+    assert sorted(o.user_id for o in outcomes if o.user_id) == ["u2", "u2", "u3"]
+    assert outcomes[0].error == "Instance was assigned concurrently"
+    assert [o.error for o in outcomes[4:]] == ["No suitable assignment found"] * 2
+    assert len(_FakeAuditLog.inserted[0]) == 3
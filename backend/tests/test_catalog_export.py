@@ -0,0 +1,140 @@
+"""
+Unit tests for streamed catalog exports.
+
+These tests run without Mongo (the aggregation cursor is faked):
+- _encode_csv / _encode_ndjson: header order, quoting and non-string values
+- CatalogService.stream_catalog_rows: row filters, column projection, max_rows
+- a closed response (client disconnect) closes the Mongo cursor
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.api.endpoints.catalogs import _encode_csv, _encode_ndjson
+from app.services import catalog_service as service_module
+from app.services.catalog_permission_service import CatalogPermissionPlan, compile_row_predicate
+from app.services.catalog_service import CatalogService
+
+ROWS = [
+    {"id": i, "estado": "Jalisco" if i % 2 else "Sonora", "nombre": f"Municipio {i}", "secreto": "x"}
+    for i in range(10)
+]
+
+
+class _FakeCursor:
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._rows)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def cursor(monkeypatch):
+    cursor = _FakeCursor(ROWS)
+
+    class _FakeCollection:
+        def aggregate(self, pipeline, batchSize=None):
+            return cursor
+
+    monkeypatch.setattr(service_module.CatalogData, "get_motor_collection", classmethod(lambda cls: _FakeCollection()))
+    return cursor
+
+
+def _plan(row_filters=None, max_rows=None):
+    return CatalogPermissionPlan(
+        can_view=True,
+        visible_columns=("id", "nombre"),
+        row_filters=row_filters or {},
+        max_rows=max_rows,
+        row_predicate=compile_row_predicate(list((row_filters or {}).items())),
+    )
+
+
+async def _batches(*batches):
+    for batch in batches:
+        yield batch
+
+
+async def _collect(body):
+    return b"".join([chunk async for chunk in body]).decode("utf-8")
+
+
+@pytest.mark.asyncio
+async def test_csv_keeps_column_order_and_quotes_values():
+    rows = [
+        {"nombre": 'Tlaquepaque, "San Pedro"', "id": 1, "activo": True},
+        {"id": 2.5, "nombre": "Línea\nnueva"},
+    ]
+
+    text = await _collect(_encode_csv(_batches(rows[:1], rows[1:]), ["id", "nombre", "activo"]))
+
+    assert text.splitlines()[0] == "id,nombre,activo"
+    assert list(csv.reader(io.StringIO(text)))[1:] == [
+        ["1", 'Tlaquepaque, "San Pedro"', "True"],
+        ["2.5", "Línea\nnueva", ""],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_serializes_one_row_per_line():
+    rows = [{"id": 1, "nombre": "Zapopán", "alta": datetime(2026, 1, 2)}, {"id": None}]
+
+    text = await _collect(_encode_ndjson(_batches(rows)))
+
+    lines = text.splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"id": 1, "nombre": "Zapopán", "alta": "2026-01-02 00:00:00"},
+        {"id": None},
+    ]
+    assert "Zapopán" in lines[0]
+
+
+@pytest.mark.asyncio
+async def test_stream_applies_row_filters_and_projection(cursor):
+    batches = [b async for b in CatalogService.stream_catalog_rows("municipios", _plan({"estado": "Jalisco"}), batch_size=2)]
+
+    rows = [row for batch in batches for row in batch]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert rows == [{"id": i, "nombre": f"Municipio {i}"} for i in (1, 3, 5, 7, 9)]
+    assert cursor.closed
+
+
+@pytest.mark.asyncio
+async def test_stream_truncates_at_max_rows(cursor):
+    batches = [b async for b in CatalogService.stream_catalog_rows("municipios", _plan(max_rows=3), batch_size=2)]
+
+    assert [row["id"] for batch in batches for row in batch] == [0, 1, 2]
+    assert cursor.closed
+
+
+@pytest.mark.asyncio
+async def test_closing_the_response_closes_the_cursor(cursor):
+    body = _encode_ndjson(CatalogService.stream_catalog_rows("municipios", _plan(), batch_size=2))
+
+    assert await body.__anext__()
+    await body.aclose()
+
+    assert cursor.closed
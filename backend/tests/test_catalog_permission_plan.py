@@ -0,0 +1,151 @@
+"""
+Unit tests for compiled catalog permission plans.
+
+These tests exercise the pure plan-building logic (no Mongo):
+- build_permission_plan: visible columns, row predicate and row cap per group set
+- CatalogPermissionService.get_permission_plan: caching per catalog version
+- CatalogPermissionService.accessible_catalogs_query: Mongo pushdown filter
+"""
+
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.models.catalog import PermissionRule
+from app.services import catalog_permission_service as cps_module
+from app.services.catalog_permission_service import (
+    CatalogPermissionService,
+    build_permission_plan,
+)
+
+
+def _catalog(permissions, columns=("id", "name", "department", "salary")):
+    return SimpleNamespace(
+        catalog_id="employees",
+        schema=[SimpleNamespace(name=col) for col in columns],
+        permissions=permissions,
+        updated_at=datetime(2026, 1, 1),
+        last_sync=None,
+    )
+
+
+@pytest.fixture(autouse=True)
+def _clear_plan_cache():
+    CatalogPermissionService.invalidate_permission_plans()
+    yield
+    CatalogPermissionService.invalidate_permission_plans()
+
+
+def test_no_permissions_means_all_columns_visible():
+    plan = build_permission_plan(_catalog([]), ["public"])
+
+    assert plan.can_view is True
+    assert plan.visible_columns == ("id", "name", "department", "salary")
+    assert plan.row_predicate is None
+    assert plan.max_rows is None
+
+
+def test_user_without_matching_group_cannot_view():
+    catalog = _catalog([PermissionRule(group_id="admin")])
+
+    plan = build_permission_plan(catalog, ["public"])
+
+    assert plan.can_view is False
+    assert plan.visible_columns == ()
+
+
+def test_visible_columns_follow_schema_order_and_union_across_groups():
+    catalog = _catalog([
+        PermissionRule(group_id="reviewer", visible_columns=["name", "id"]),
+        PermissionRule(group_id="catastro", visible_columns=["department"]),
+    ])
+
+    plan = build_permission_plan(catalog, ["reviewer", "catastro"])
+
+    assert plan.visible_columns == ("id", "name", "department")
+
+
+def test_row_filters_run_on_raw_row_and_may_use_hidden_columns():
+    catalog = _catalog([
+        PermissionRule(
+            group_id="catastro",
+            visible_columns=["id", "name"],
+            row_filters={"department": {"$in": ["catastro"]}},
+            max_rows=5,
+        )
+    ])
+    rows = [
+        {"id": 1, "name": "Ana", "department": "catastro", "salary": 10},
+        {"id": 2, "name": "Luis", "department": "obras", "salary": 20},
+    ]
+
+    plan = build_permission_plan(catalog, ["catastro"])
+
+    assert list(plan.apply(rows)) == [{"id": 1, "name": "Ana"}]
+    assert plan.max_rows == 5
+
+
+def test_filters_on_same_field_from_several_groups_are_anded():
+    catalog = _catalog([
+        PermissionRule(group_id="a", row_filters={"department": {"$ne": "obras"}}, max_rows=50),
+        PermissionRule(group_id="b", row_filters={"department": {"$nin": ["rh"]}}, max_rows=10),
+    ])
+
+    plan = build_permission_plan(catalog, ["a", "b"])
+
+    assert plan.matches({"department": "catastro"})
+    assert not plan.matches({"department": "obras"})
+    assert not plan.matches({"department": "rh"})
+    assert not plan.matches({"name": "missing department"})
+    assert plan.row_filters == {"department": {"$and": [{"$ne": "obras"}, {"$nin": ["rh"]}]}}
+    assert plan.max_rows == 10
+
+
+def test_plan_is_cached_per_group_set_and_catalog_version():
+    catalog = _catalog([PermissionRule(group_id="reviewer", visible_columns=["id"])])
+    calls = []
+    original_build = cps_module.build_permission_plan
+
+    def counting_build(*args, **kwargs):
+        calls.append(args)
+        return original_build(*args, **kwargs)
+
+    cps_module.build_permission_plan = counting_build
+    try:
+        first = CatalogPermissionService.get_permission_plan(catalog, ["reviewer", "public"])
+        second = CatalogPermissionService.get_permission_plan(catalog, ["public", "reviewer"])
+        assert first is second
+        assert len(calls) == 1
+
+        catalog.updated_at = datetime(2026, 2, 1)
+        CatalogPermissionService.get_permission_plan(catalog, ["reviewer", "public"])
+        assert len(calls) == 2
+    finally:
+        cps_module.build_permission_plan = original_build
+
+
+def test_accessible_catalogs_query_matches_on_group_id():
+    query = CatalogPermissionService.accessible_catalogs_query(["reviewer", "public"])
+
+    assert query == {
+        "$or": [
+            {"permissions": {"$size": 0}},
+            {
+                "permissions": {
+                    "$elemMatch": {
+                        "group_id": {"$in": ["reviewer", "public"]},
+                        "can_view": True,
+                    }
+                }
+            },
+        ]
+    }
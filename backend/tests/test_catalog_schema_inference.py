@@ -0,0 +1,82 @@
+"""
+Unit tests for single-pass catalog schema inference.
+
+These tests exercise the pure inference logic (no network / database):
+- infer_column_type: vectorized type detection over sampled values
+- SchemaSampler: bounded per-column reservoirs and nullability tracking
+- BaseConnector.infer_schema: inference from already fetched rows
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.models.catalog import ColumnType, SourceConfig
+from app.services.catalog_connectors import (
+    JSONConnector,
+    SchemaSampler,
+    infer_column_type,
+)
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        ([1, "2", None, ""], ColumnType.INTEGER),
+        (["1.5", 2], ColumnType.FLOAT),
+        ([True, False], ColumnType.BOOLEAN),
+        (["true", "False"], ColumnType.BOOLEAN),
+        (["2024-01-31", "31/01/2024 10:00:00", datetime(2024, 1, 1)], ColumnType.DATETIME),
+        (["abc", 1], ColumnType.STRING),
+        ([None, "  "], ColumnType.STRING),
+    ],
+)
+def test_infer_column_type(values, expected):
+    assert infer_column_type(values) == expected
+
+
+def test_sampler_keeps_bounded_reservoir_per_column():
+    sampler = SchemaSampler(sample_size=10, seed=7)
+
+    for start in range(0, 5000, 500):
+        sampler.observe([{"id": i, "code": str(i)} for i in range(start, start + 500)])
+
+    assert sampler.rows_observed == 5000
+    assert all(len(sample) == 10 for sample in sampler._samples.values())
+    schema = {col.name: col for col in sampler.infer("Column from CSV")}
+    assert schema["id"].type == ColumnType.INTEGER
+    assert schema["id"].nullable is False
+    assert schema["code"].description == "Column from CSV: code"
+
+
+def test_sampler_marks_late_and_missing_columns_nullable():
+    sampler = SchemaSampler()
+
+    sampler.observe([{"a": 1}, {"a": 2, "b": "x"}, {"b": "y"}])
+
+    schema = {col.name: col for col in sampler.infer("Column")}
+    assert schema["a"].nullable is True
+    assert schema["b"].nullable is True
+
+
+@pytest.mark.asyncio
+async def test_infer_schema_uses_given_rows_without_refetching():
+    connector = JSONConnector(SourceConfig(url="http://example.invalid/data.json"))
+
+    async def fail_fetch():
+        raise AssertionError("source must not be re-read")
+
+    connector.fetch_data = fail_fetch
+
+    schema = await connector.infer_schema([{"zeta": 1, "owner": {"name": "Ana"}}])
+
+    assert [col.name for col in schema] == ["owner.name", "zeta"]
+    assert schema[0].description == "Column from JSON: owner.name"
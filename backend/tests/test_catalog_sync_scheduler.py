@@ -0,0 +1,141 @@
+"""
+Unit tests for the background catalog sync scheduler.
+
+These tests exercise scheduling decisions without Mongo or real sources:
+- CatalogSyncScheduler.is_due: per-catalog refresh intervals, backoff after failures
+- request_sync: concurrent requests for one catalog share a single run
+- stats: durations and row throughput are recorded per catalog
+- _release_lease: the attempt and failure count are recorded with the release
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.models.catalog import SourceType, SyncResult
+from app.services import catalog_connectors
+from app.services import catalog_sync_scheduler as scheduler_module
+from app.services.catalog_sync_scheduler import CatalogSyncScheduler
+
+
+NOW = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def _catalog(last_sync, refresh_rate_minutes=60, source_type=SourceType.SQL, uploaded_file_id=None,
+             last_sync_attempt=None, sync_failures=0):
+    return SimpleNamespace(
+        catalog_id="municipios",
+        source_type=source_type,
+        last_sync=last_sync,
+        last_sync_attempt=last_sync_attempt,
+        sync_failures=sync_failures,
+        source_config=SimpleNamespace(
+            refresh_rate_minutes=refresh_rate_minutes,
+            uploaded_file_id=uploaded_file_id,
+        ),
+    )
+
+
+def test_is_due_respects_refresh_interval():
+    assert CatalogSyncScheduler.is_due(_catalog(None), NOW)
+    assert CatalogSyncScheduler.is_due(_catalog(NOW - timedelta(minutes=61)), NOW)
+    assert not CatalogSyncScheduler.is_due(_catalog(NOW - timedelta(minutes=30)), NOW)
+
+
+def test_failing_catalogs_back_off_from_last_attempt():
+    last_success = NOW - timedelta(days=2)
+
+    def failing(minutes_since_attempt, failures):
+        return _catalog(
+            last_success,
+            last_sync_attempt=NOW - timedelta(minutes=minutes_since_attempt),
+            sync_failures=failures,
+        )
+
+    # A failed attempt resets the clock even though the last success is old
+    assert not CatalogSyncScheduler.is_due(failing(1, 1), NOW)
+    assert CatalogSyncScheduler.is_due(failing(61, 1), NOW)
+    assert not CatalogSyncScheduler.is_due(failing(119, 2), NOW)
+    assert CatalogSyncScheduler.is_due(failing(121, 2), NOW)
+    assert not CatalogSyncScheduler.is_due(failing(479, 4), NOW)
+    # Capped at CATALOG_SYNC_MAX_BACKOFF_MINUTES (one day)
+    assert CatalogSyncScheduler.is_due(failing(24 * 60, 30), NOW)
+
+
+def test_is_due_skips_uploads_and_disabled_refresh():
+    assert not CatalogSyncScheduler.is_due(_catalog(None, source_type=SourceType.CSV_UPLOAD), NOW)
+    assert not CatalogSyncScheduler.is_due(_catalog(None, uploaded_file_id="abc"), NOW)
+    assert not CatalogSyncScheduler.is_due(_catalog(None, refresh_rate_minutes=0), NOW)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_sync(monkeypatch):
+    scheduler = CatalogSyncScheduler(max_concurrency=2, poll_interval_seconds=60, lease_seconds=60)
+    calls = []
+    release = asyncio.Event()
+
+    async def fake_sync(catalog_id):
+        calls.append(catalog_id)
+        await release.wait()
+        return SyncResult(success=True, rows_synced=500, duration_seconds=2.0)
+
+    async def always_acquire(catalog_id):
+        return True
+
+    async def noop_release(catalog_id, result=None):
+        return None
+
+    monkeypatch.setattr(catalog_connectors.CatalogSyncService, "sync_catalog_data", staticmethod(fake_sync))
+    monkeypatch.setattr(scheduler, "_acquire_lease", always_acquire)
+    monkeypatch.setattr(scheduler, "_release_lease", noop_release)
+
+    first = asyncio.create_task(scheduler.request_sync("municipios"))
+    second = asyncio.create_task(scheduler.request_sync("municipios"))
+    await asyncio.sleep(0)
+    assert scheduler.trigger_sync("municipios") is False
+
+    release.set()
+    results = await asyncio.gather(first, second)
+
+    assert calls == ["municipios"]
+    assert results[0] is results[1]
+    assert not scheduler.is_syncing("municipios")
+    stats = scheduler.stats["municipios"]
+    assert stats.runs == 1
+    assert stats.last_rows_per_second == 250.0
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.updates = []
+
+    async def update_one(self, query, update):
+        self.updates.append(update)
+
+
+@pytest.mark.asyncio
+async def test_release_records_attempt_and_failures(monkeypatch):
+    scheduler = CatalogSyncScheduler(max_concurrency=1, poll_interval_seconds=60, lease_seconds=60)
+    collection = _FakeCollection()
+    monkeypatch.setattr(scheduler_module.Catalog, "get_motor_collection", classmethod(lambda cls: collection))
+
+    await scheduler._release_lease("municipios", SyncResult(success=False, error_message="down"))
+    await scheduler._release_lease("municipios", SyncResult(success=True, rows_synced=1))
+    await scheduler._release_lease("municipios")
+
+    failed, succeeded, released = collection.updates
+    assert failed["$inc"] == {"sync_failures": 1}
+    assert failed["$set"]["last_sync_attempt"] is not None
+    assert succeeded["$set"]["sync_failures"] == 0
+    assert "$inc" not in succeeded
+    assert released == {"$set": {"sync_lease_until": None}}
@@ -0,0 +1,98 @@
+"""
+Unit tests for content-addressed offloading of submitted binary fields.
+
+These tests run without S3 (local backend, or stubbed s3_storage calls):
+- offload: large base64 file dicts become references, everything else stays
+- store: identical content is stored once
+- load: references resolve back to the original bytes
+- FacialVerificationOperator: offloaded images are resolved before comparison
+"""
+
+import base64
+import hashlib
+import os
+import sys
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services import context_blobs as blobs_module
+from app.services.context_blobs import ContextBlobStore, is_blob_ref
+
+CONTENT = os.urandom(3000)
+ENCODED = base64.b64encode(CONTENT).decode()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ContextBlobStore(backend="local", min_bytes=1000, local_root=str(tmp_path))
+
+
+@pytest.mark.asyncio
+async def test_offload_replaces_large_files_with_references(store):
+    data = {
+        "name": "Ana",
+        "notes": {"content": "x" * 5000},
+        "ine": {"base64": ENCODED, "filename": "ine.jpg", "content_type": "image/jpeg"},
+        "owners": [{"photo": {"base64": f"data:image/png;base64,{ENCODED}", "filename": "p.png"}}],
+        "thumbnail": {"base64": ENCODED[:100], "filename": "t.jpg"},
+    }
+
+    assert await store.offload(data) == 2
+
+    ref = data["ine"]
+    assert is_blob_ref(ref)
+    assert "base64" not in ref
+    assert ref["filename"] == "ine.jpg"
+    assert ref["size"] == len(CONTENT)
+    assert ref["blob_sha256"] == hashlib.sha256(CONTENT).hexdigest()
+    assert data["owners"][0]["photo"]["blob_sha256"] == ref["blob_sha256"]
+    assert data["notes"] == {"content": "x" * 5000}
+    assert data["thumbnail"]["base64"] == ENCODED[:100]
+    assert await store.load(ref) == CONTENT
+
+
+@pytest.mark.asyncio
+async def test_s3_backend_stores_identical_content_once(monkeypatch):
+    uploads = []
+    existing = set()
+
+    def fake_upload(bucket, key, content, content_type, metadata=None):
+        uploads.append(key)
+        existing.add(key)
+
+    monkeypatch.setattr(blobs_module.s3_storage, "default_bucket", lambda: "bucket")
+    monkeypatch.setattr(blobs_module.s3_storage, "object_exists", lambda bucket, key: key in existing)
+    monkeypatch.setattr(blobs_module.s3_storage, "upload_bytes", fake_upload)
+    store = ContextBlobStore(backend="s3", min_bytes=1000)
+
+    first = {"a": {"base64": ENCODED, "filename": "a.pdf"}}
+    second = {"b": {"base64": ENCODED, "filename": "b.pdf"}}
+    await store.offload(first)
+    await store.offload(second)
+
+    digest = hashlib.sha256(CONTENT).hexdigest()
+    assert uploads == [f"blobs/sha256/{digest[:2]}/{digest}"]
+    assert first["a"]["s3_key"] == second["b"]["s3_key"] == uploads[0]
+    assert first["a"]["s3_bucket"] == "bucket"
+
+
+@pytest.mark.asyncio
+async def test_facial_verification_resolves_offloaded_images(store, monkeypatch):
+    from app.workflows.operators import facial_verification_operator as facial_module
+
+    context = {"selfie": {"base64": ENCODED, "filename": "selfie.jpg", "content_type": "image/jpeg"}}
+    context["ine"] = {"front_image": dict(context["selfie"])}
+    await store.offload(context)
+    assert is_blob_ref(context["selfie"]) and is_blob_ref(context["ine"]["front_image"])
+    monkeypatch.setattr(facial_module, "context_blobs", store)
+
+    operator = object.__new__(facial_module.FacialVerificationOperator)
+
+    assert await operator._extract_image_from_context(context, "selfie") == "data:image/jpeg," + ENCODED
+    assert await operator._extract_image_from_context(context, "ine") == "data:image/jpeg," + ENCODED
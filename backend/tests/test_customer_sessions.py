@@ -0,0 +1,120 @@
+"""
+Unit tests for the citizen session cache behind get_current_customer.
+
+Covers:
+- CustomerSessionCache: reuse within a session, new session / changed claims
+  detection, staleness, invalidation and returned copies
+- _sync_llavemx_profile: re-syncing unchanged claims reports no change
+- stream_instance: only the owning customer can stream an instance
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+from typing import Any, Dict
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.api.endpoints.public_auth import _sync_llavemx_profile, stream_instance
+from app.models.workflow import WorkflowInstance
+from app.auth.customer_sessions import CustomerSessionCache
+
+
+class FakeCustomer(BaseModel):
+    email: str
+    metadata: Dict[str, Any] = {}
+
+
+def _claims(**overrides):
+    claims = {"sub": "kc-1", "sid": "s-1", "email": "ana@example.com", "iat": 1, "exp": 2, "jti": "a"}
+    claims.update(overrides)
+    return claims
+
+
+def test_same_session_reuses_customer_across_token_refreshes():
+    cache = CustomerSessionCache(max_size=10, ttl_seconds=300)
+    cache.put("kc-1", _claims(), FakeCustomer(email="ana@example.com"))
+
+    refreshed = _claims(iat=100, exp=400, jti="b")
+    assert not cache.is_new_session("kc-1", refreshed)
+    customer = cache.get("kc-1", refreshed)
+    assert customer.email == "ana@example.com"
+
+    # Callers get a copy they may mutate freely
+    customer.metadata["x"] = 1
+    assert cache.get("kc-1", refreshed).metadata == {}
+
+
+def test_new_session_or_changed_claims_miss():
+    cache = CustomerSessionCache(max_size=10, ttl_seconds=300)
+    cache.put("kc-1", _claims(), FakeCustomer(email="ana@example.com"))
+
+    assert cache.get("kc-1", _claims(sid="s-2")) is None
+    assert cache.is_new_session("kc-1", _claims(sid="s-2"))
+
+    assert cache.get("kc-1", _claims(curp="ABCD")) is None
+    assert not cache.is_new_session("kc-1", _claims(curp="ABCD"))
+
+
+def test_stale_and_invalidated_entries_keep_the_session():
+    cache = CustomerSessionCache(max_size=10, ttl_seconds=0)
+    cache.put("kc-1", _claims(), FakeCustomer(email="ana@example.com"))
+    assert cache.get("kc-1", _claims()) is None
+    assert not cache.is_new_session("kc-1", _claims())
+
+    cache = CustomerSessionCache(max_size=10, ttl_seconds=300)
+    cache.put("kc-1", _claims(), FakeCustomer(email="ana@example.com"))
+    cache.invalidate("kc-1")
+    assert cache.get("kc-1", _claims()) is None
+    assert not cache.is_new_session("kc-1", _claims())
+
+
+def test_llavemx_resync_without_claim_changes_is_not_a_change():
+    customer = SimpleNamespace(
+        curp=None, rfc=None, tipo_persona=None, llavemx_user_id=None, phone="",
+        metadata={}, updated_at=None
+    )
+    payload = {"curp": "ABCD800101HDFXXX01", "rfc": "ABCD800101XXX", "personas_morales": "[]"}
+
+    assert _sync_llavemx_profile(customer, payload) is True
+    assert _sync_llavemx_profile(customer, payload) is False
+    assert _sync_llavemx_profile(customer, {**payload, "rfc": "OTHER"}) is True
+
+
+
+class _QueryField:
+    """Stands in for an unbound document field; `field == value` yields the value"""
+
+    def __eq__(self, other):
+        return other
+
+
+@pytest.mark.asyncio
+async def test_stream_instance_rejects_other_customers(monkeypatch):
+    instances = {"i-1": SimpleNamespace(instance_id="i-1", user_id="owner")}
+
+    async def find_one(instance_id, projection_model=None):
+        return instances.get(instance_id)
+
+    monkeypatch.setattr(WorkflowInstance, "instance_id", _QueryField(), raising=False)
+    monkeypatch.setattr(WorkflowInstance, "find_one", find_one)
+    request = SimpleNamespace(is_disconnected=lambda: False)
+
+    with pytest.raises(HTTPException) as denied:
+        await stream_instance("i-1", request, SimpleNamespace(id="someone-else"))
+    assert denied.value.status_code == 403
+
+    with pytest.raises(HTTPException) as missing:
+        await stream_instance("i-2", request, SimpleNamespace(id="owner"))
+    assert missing.value.status_code == 404
+
+    response = await stream_instance("i-1", request, SimpleNamespace(id="owner"))
+    assert response.media_type == "text/event-stream"
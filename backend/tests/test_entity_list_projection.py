@@ -0,0 +1,75 @@
+"""
+Unit tests for server-side projection of entity list pages.
+
+These tests exercise the projection without Mongo:
+- slim_entities_pipeline: page stages and the per-value size filter on `data`
+- EntityService.find_entities: list views go through the aggregation pipeline
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services import entity_service
+from app.services.entity_service import EntityService, LIST_EXCLUDED_FIELDS, slim_entities_pipeline
+
+
+def test_pipeline_pages_before_filtering_data():
+    pipeline = slim_entities_pipeline({"owner_user_id": "u1"}, skip=40, limit=20, data_value_max_bytes=1024)
+
+    assert pipeline[:4] == [
+        {"$match": {"owner_user_id": "u1"}},
+        {"$sort": {"created_at": -1}},
+        {"$skip": 40},
+        {"$limit": 20},
+    ]
+    assert pipeline[4] == {"$unset": LIST_EXCLUDED_FIELDS}
+
+    data_filter = pipeline[5]["$set"]["data"]["$arrayToObject"]["$filter"]
+    size_check = data_filter["cond"]["$lte"]
+    assert size_check[1] == 1024
+    # Strings are measured by byte length, other values by BSON size
+    assert size_check[0]["$cond"][1] == {"$strLenBytes": "$$field.v"}
+    assert size_check[0]["$cond"][2] == {"$bsonSize": {"v": "$$field.v"}}
+
+
+class _FakeCursor:
+    def __init__(self, result):
+        self._result = result
+
+    async def to_list(self):
+        return self._result
+
+
+@pytest.mark.asyncio
+async def test_find_entities_uses_projection_pipeline_for_list_views(monkeypatch):
+    calls = []
+    entity = SimpleNamespace(entity_id="e1")
+
+    def fake_aggregate(pipeline, projection_model=None):
+        calls.append((pipeline, projection_model))
+        return _FakeCursor([entity])
+
+    def fail_find(*args, **kwargs):
+        raise AssertionError("full documents must not be fetched for list views")
+
+    monkeypatch.setattr(entity_service.LegalEntity, "aggregate", fake_aggregate)
+    monkeypatch.setattr(entity_service.LegalEntity, "find", fail_find)
+
+    result = await EntityService.find_entities(
+        owner_user_id="u1", entity_type="predio", limit=5, data_value_max_bytes=512
+    )
+
+    assert result == [entity]
+    pipeline, projection_model = calls[0]
+    assert pipeline[0] == {"$match": {"owner_user_id": "u1", "entity_type": "predio"}}
+    assert pipeline[3] == {"$limit": 5}
+    assert projection_model is entity_service.LegalEntity
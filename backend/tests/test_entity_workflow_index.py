@@ -0,0 +1,74 @@
+"""
+Unit tests for the entity type -> workflow reverse index.
+
+These tests exercise the index without Mongo / DAGs:
+- build_entity_workflow_index: grouping by declared entity types
+- EntityWorkflowIndex.workflows_for: single load, rebuild when the source version moves
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services.entity_workflow_index import EntityWorkflowIndex, build_entity_workflow_index
+
+
+def _workflow(workflow_id, entity_types=None, **metadata):
+    if entity_types is not None:
+        metadata["entity_types"] = entity_types
+    return SimpleNamespace(
+        workflow_id=workflow_id,
+        name=workflow_id.title(),
+        description="",
+        category="general",
+        metadata=metadata,
+    )
+
+
+def test_build_groups_workflows_by_entity_type():
+    index = build_entity_workflow_index([
+        _workflow("alta_predio", ["predio"], estimated_duration="5 min"),
+        _workflow("licencia", ["predio", "persona_moral", "predio"]),
+        _workflow("queja"),
+    ])
+
+    assert [w["workflow_id"] for w in index["predio"]] == ["alta_predio", "licencia"]
+    assert [w["workflow_id"] for w in index["persona_moral"]] == ["licencia"]
+    assert index["predio"][0]["estimatedDuration"] == "5 min"
+    assert index["predio"][1]["estimatedDuration"] == "10-20 min"
+    assert "queja" not in {w["workflow_id"] for ws in index.values() for w in ws}
+
+
+@pytest.mark.asyncio
+async def test_workflows_for_loads_once_and_rebuilds_on_version_change():
+    state = {"version": 1, "loads": 0}
+    workflows = [_workflow("alta_predio", ["predio"])]
+
+    async def loader():
+        state["loads"] += 1
+        return list(workflows)
+
+    index = EntityWorkflowIndex(max_age_seconds=3600)
+    index.configure(loader=loader, source_version=lambda: state["version"])
+
+    for _ in range(5):
+        assert [w["workflow_id"] for w in await index.workflows_for("predio")] == ["alta_predio"]
+    assert await index.workflows_for("vehiculo") == []
+    assert state["loads"] == 1
+
+    # Returned summaries are copies
+    (await index.workflows_for("predio"))[0]["name"] = "changed"
+    assert (await index.workflows_for("predio"))[0]["name"] == "Alta_Predio"
+
+    workflows.append(_workflow("baja_predio", ["predio"]))
+    state["version"] = 2
+    assert len(await index.workflows_for("predio")) == 2
+    assert state["loads"] == 2
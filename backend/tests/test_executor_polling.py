@@ -5,6 +5,7 @@ These tests exercise the pure scheduling decisions (no Mongo / Keycloak):
 - _get_instance_polling_decision: classify waiting tasks by strategy
 - _schedule_next_wakeup: pick the right queue and delay
 - resume_instance: contract for event-driven wake-up
+- _rollup_outcome: step metric rollups only see status changes
 
 The executor's _execution_loop is not started; each test calls the
 relevant method directly on a constructed DAGExecutor instance.
@@ -13,6 +14,7 @@ relevant method directly on a constructed DAGExecutor instance.
 import sys
 import time
 import types
+from datetime import datetime
 from types import SimpleNamespace
 
 import pytest
@@ -25,7 +27,8 @@ if BACKEND_DIR not in sys.path:
     sys.path.insert(0, BACKEND_DIR)
 
 from app.workflows.dag import InstanceStatus
-from app.workflows.executor import DAGExecutor
+from app.workflows.executor import DAGExecutor, _rollup_outcome
+from app.workflows.operators.base import TaskStatus
 from app.workflows.polling_strategy import (
     OperatorPollingStrategy,
     PollingConfig,
@@ -247,3 +250,16 @@ def test_schedule_wakeup_running_uses_short_throttle():
     assert "inst-3" not in executor.waiting_queue
     delay = executor.throttled_queue["inst-3"] - before
     assert 0.4 <= delay <= 0.7
+
+
+def test_rollup_records_waiting_once_and_full_duration():
+    started_at = datetime(2026, 3, 1, 12, 0, 0)
+    now = datetime(2026, 3, 1, 12, 5, 0)
+
+    assert _rollup_outcome("pending", TaskStatus.WAITING, started_at, now) == ("waiting", 300.0)
+    # Re-polled while still waiting: not a status change
+    assert _rollup_outcome("waiting", TaskStatus.WAITING, started_at, now) is None
+    # Finally completes: duration spans the whole wait
+    assert _rollup_outcome("waiting", TaskStatus.CONTINUE, started_at, now) == ("completed", 300.0)
+    assert _rollup_outcome("executing", TaskStatus.FAILED, started_at.isoformat(), now) == ("failed", 300.0)
+    assert _rollup_outcome("pending", TaskStatus.SKIP, None, now) == ("skipped", None)
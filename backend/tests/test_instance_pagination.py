@@ -0,0 +1,121 @@
+"""
+Unit tests for keyset pagination of workflow instance lists.
+
+These tests exercise the pagination helpers without Mongo:
+- encode_cursor / decode_cursor: opaque round trip and malformed tokens
+- keyset_query: (created_at, _id) continuation filter
+- paginate_instances: limit + 1 fetch, next cursor and cached totals
+"""
+
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from beanie import PydanticObjectId
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.models.workflow import InstanceSummary
+from app.services import instance_pagination
+from app.services.instance_pagination import (
+    KEYSET_SORT,
+    InstanceCountCache,
+    decode_cursor,
+    encode_cursor,
+    keyset_query,
+    paginate_instances,
+)
+
+
+CREATED = datetime(2026, 3, 1, 12, 0, 0, 123000)
+OID = PydanticObjectId("65f000000000000000000001")
+
+
+def test_cursor_round_trip_and_rejects_garbage():
+    assert decode_cursor(encode_cursor(CREATED, OID)) == (CREATED, OID)
+
+    for bad in ("", "not-a-cursor", encode_cursor(CREATED, OID)[:-4]):
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+def test_keyset_query_continues_after_cursor():
+    assert keyset_query({"workflow_id": "w"}, None) == {"workflow_id": "w"}
+
+    after = {"$or": [
+        {"created_at": {"$lt": CREATED}},
+        {"created_at": CREATED, "_id": {"$lt": OID}},
+    ]}
+    cursor = encode_cursor(CREATED, OID)
+    assert keyset_query({}, cursor) == after
+    assert keyset_query({"workflow_id": "w"}, cursor) == {"$and": [{"workflow_id": "w"}, after]}
+
+
+class _FakeFind:
+    def __init__(self, calls, rows, query):
+        self.calls = calls
+        self.rows = rows
+        calls.append(("find", query))
+
+    def sort(self, sort):
+        self.calls.append(("sort", sort))
+        return self
+
+    def skip(self, n):
+        self.calls.append(("skip", n))
+        return self
+
+    def limit(self, n):
+        self.calls.append(("limit", n))
+        self.n = n
+        return self
+
+    def project(self, model):
+        self.calls.append(("project", model))
+        return self
+
+    async def to_list(self):
+        return self.rows[:self.n]
+
+    async def count(self):
+        self.calls.append(("count", None))
+        return len(self.rows)
+
+
+@pytest.mark.asyncio
+async def test_paginate_fetches_one_extra_row_and_caches_total(monkeypatch):
+    rows = [
+        SimpleNamespace(created_at=datetime(2026, 3, 1, 12, i), id=PydanticObjectId(f"65f00000000000000000000{i}"))
+        for i in range(5, 0, -1)
+    ]
+    calls = []
+    monkeypatch.setattr(
+        instance_pagination.WorkflowInstance, "find",
+        lambda query: _FakeFind(calls, rows, query)
+    )
+    monkeypatch.setattr(instance_pagination, "instance_counts", InstanceCountCache())
+
+    page, next_cursor, total = await paginate_instances({"workflow_id": "w"}, limit=2)
+
+    assert page == rows[:2]
+    assert decode_cursor(next_cursor) == (rows[1].created_at, rows[1].id)
+    assert total == 5
+    assert ("sort", KEYSET_SORT) in calls and ("limit", 3) in calls
+    assert ("project", InstanceSummary) in calls
+    assert not any(call[0] == "skip" for call in calls)
+
+    calls.clear()
+    _, _, total = await paginate_instances({"workflow_id": "w"}, limit=2, cursor=next_cursor, skip=40)
+    assert total == 5
+    # Cursor wins over skip, and the total comes from the cache
+    assert not any(call[0] in ("skip", "count") for call in calls)
+    assert calls[0][1]["$and"][0] == {"workflow_id": "w"}
+
+    _, last_cursor, _ = await paginate_instances({"workflow_id": "w"}, limit=10)
+    assert last_cursor is None
@@ -0,0 +1,54 @@
+"""
+Unit tests for maintained workflow instance search terms.
+
+These tests exercise the term builder and query filter without Mongo:
+- build_search_terms: ids, workflow name and short context values, skipping blobs
+- search_filter: anchored prefix clause per query token
+"""
+
+import os
+import sys
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services.instance_search import MAX_SEARCH_TERMS, build_search_terms, search_filter
+
+
+def test_build_search_terms_indexes_ids_names_and_context_values():
+    terms = build_search_terms(
+        "4060a9a0-7ebb",
+        "licencia_construccion",
+        {
+            "parent_customer_email": "José.Pérez@Correo.mx",
+            "solicitante": {"nombre": "José Pérez", "edad": 41, "activo": True},
+            "folios": ["A-17"],
+            "_input": "rawpayload",
+            "documento": "x" * 5000,
+        },
+        workflow_name="Licencia de Construcción"
+    )
+
+    for expected in ("4060a9a0", "7ebb", "licencia", "construccion", "jose", "perez", "correo", "41", "a", "17"):
+        assert expected in terms
+    assert "rawpayload" not in terms
+    assert "true" not in terms
+    assert not any(len(term) > 256 for term in terms)
+    assert terms == sorted(set(terms))
+
+
+def test_build_search_terms_is_bounded():
+    context = {f"campo_{i}": f"valor{i}" for i in range(2000)}
+    assert len(build_search_terms("i", "w", context)) == MAX_SEARCH_TERMS
+
+
+def test_search_filter_uses_anchored_prefix_per_token():
+    assert search_filter("  ") is None
+    assert search_filter("Pérez") == {"search_terms": {"$regex": "^perez"}}
+    assert search_filter("jose.perez@") == {"$and": [
+        {"search_terms": {"$regex": "^jose"}},
+        {"search_terms": {"$regex": "^perez"}},
+    ]}
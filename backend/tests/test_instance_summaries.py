@@ -0,0 +1,112 @@
+"""
+Unit tests for projected instance summaries used by list endpoints.
+
+These tests exercise the summaries without Mongo:
+- InstanceSummary: projection excludes heavy fields and computes step counts
+- workflow_list_info: one batched lookup per page instead of per row
+- progress_percentage
+"""
+
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.models.workflow import AssignmentStatus, InstanceSummary
+from app.services import instance_summaries
+from app.services.instance_summaries import progress_percentage, workflow_list_info
+
+
+def test_projection_excludes_heavy_fields_and_parses_rows():
+    projection = InstanceSummary.Settings.projection
+
+    for heavy in ("context", "task_states", "pre_task_context_snapshots", "completed_steps"):
+        assert heavy not in projection
+    assert projection["completed_step_count"] == {"$size": {"$ifNull": ["$completed_steps", []]}}
+    assert projection["citizen_email"] == "$context.parent_customer_email"
+
+    summary = InstanceSummary.model_validate({
+        "_id": "65f000000000000000000001",
+        "instance_id": "i-1",
+        "workflow_id": "licencia",
+        "user_id": "u-1",
+        "status": "running",
+        "completed_step_count": 3,
+        "assignment_status": "under_review",
+        "created_at": datetime(2026, 3, 1),
+    })
+    assert str(summary.id) == "65f000000000000000000001"
+    assert summary.assignment_status == AssignmentStatus.UNDER_REVIEW
+    assert summary.completed_step_count == 3
+
+
+class _FakeCursor:
+    def __init__(self, result):
+        self._result = result
+
+    async def to_list(self):
+        return self._result
+
+
+@pytest.mark.asyncio
+async def test_workflow_list_info_batches_lookups(monkeypatch):
+    calls = []
+
+    def fake_find(query):
+        calls.append(("find", query))
+        return _FakeCursor([SimpleNamespace(workflow_id="licencia", name="Licencia")])
+
+    def fake_aggregate(pipeline):
+        calls.append(("aggregate", pipeline))
+        return _FakeCursor([{"_id": "licencia", "total_steps": 4}, {"_id": "huerfano", "total_steps": 2}])
+
+    monkeypatch.setattr(instance_summaries.WorkflowDefinition, "find", fake_find)
+    monkeypatch.setattr(instance_summaries.WorkflowStep, "aggregate", fake_aggregate)
+
+    info = await workflow_list_info(["licencia", "huerfano", "licencia"])
+
+    assert info == {"licencia": {"name": "Licencia", "total_steps": 4}}
+    assert len(calls) == 2
+    assert calls[0][1] == {"workflow_id": {"$in": ["licencia", "huerfano"]}}
+    assert await workflow_list_info([]) == {}
+
+
+def test_progress_percentage():
+    assert progress_percentage(2, 4) == 50
+    assert progress_percentage(6, 4) == 100
+    assert progress_percentage(3, 0) == 0
+
+
+@pytest.mark.asyncio
+async def test_workflow_list_info_uses_metadata_cache_for_registered_dags(monkeypatch):
+    from app.services.workflow_metadata import WorkflowMetadataCache
+
+    cache = WorkflowMetadataCache()
+    cache.register(SimpleNamespace(
+        dag_id="licencia",
+        version="1.0.0",
+        description="Licencia de Construcción",
+        tasks={
+            task_id: SimpleNamespace(task_id=task_id, downstream_tasks=[])
+            for task_id in ("captura", "revision", "firma")
+        },
+    ))
+    monkeypatch.setattr(instance_summaries, "workflow_metadata", cache)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("registered workflows must not hit the database")
+
+    monkeypatch.setattr(instance_summaries.WorkflowDefinition, "find", fail)
+    monkeypatch.setattr(instance_summaries.WorkflowStep, "aggregate", fail)
+
+    info = await workflow_list_info(["licencia", "licencia"])
+
+    assert info == {"licencia": {"name": "Licencia de Construcción", "total_steps": 3}}
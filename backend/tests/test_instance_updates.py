@@ -0,0 +1,74 @@
+"""
+Unit tests for pushed workflow instance updates.
+
+These tests exercise the in-process path (no Redis):
+- instance_update: payload and progress
+- InstanceUpdateBroker: fan-out to subscribers of an instance only
+- stream_instance_updates: snapshot, updates, keepalive and terminal close
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services import instance_updates as updates_module
+from app.services.instance_updates import InstanceUpdateBroker, instance_update, stream_instance_updates
+
+
+def _update(event, status="running", step="revision", waiting_for=None):
+    return instance_update(event, "i-1", status, step, completed_steps=1, total_steps=4, waiting_for=waiting_for)
+
+
+def test_instance_update_payload():
+    update = _update("waiting_for_input", waiting_for="citizen_data")
+
+    assert update["progress_percentage"] == 25.0
+    assert update["requires_input"] is True
+    assert update["waiting_for"] == "citizen_data"
+
+
+@pytest.mark.asyncio
+async def test_broker_delivers_only_to_subscribers_of_the_instance():
+    broker = InstanceUpdateBroker(use_redis=False)
+
+    async with broker.subscribe("i-1") as queue, broker.subscribe("i-2") as other:
+        await broker.publish("i-1", _update("step_advanced"))
+        assert (await queue.get())["event"] == "step_advanced"
+        assert other.empty()
+
+    assert broker._subscribers == {}
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_snapshot_updates_keepalive_and_closes(monkeypatch):
+    broker = InstanceUpdateBroker(use_redis=False)
+    monkeypatch.setattr(updates_module, "instance_updates", broker)
+
+    async def load_snapshot(instance_id):
+        return _update("snapshot")
+
+    async def connected():
+        return False
+
+    stream = stream_instance_updates("i-1", connected, load_snapshot=load_snapshot, heartbeat_seconds=0.01)
+
+    first = await stream.__anext__()
+    assert first.startswith("event: snapshot\ndata: ")
+    assert await stream.__anext__() == ": keepalive\n\n"
+
+    await broker.publish("i-1", _update("status_changed", status="completed"))
+    chunk = await stream.__anext__()
+    assert json.loads(chunk.split("data: ", 1)[1])["status"] == "completed"
+
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+    assert broker._subscribers == {}
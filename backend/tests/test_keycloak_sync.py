@@ -0,0 +1,247 @@
+"""
+Unit tests for the Keycloak admin sync service.
+
+These tests run without Mongo or Keycloak:
+- _get_admin_token: one token request for concurrent callers, refreshed on 401
+- _paginate: listings are fetched page by page with first/max
+- sync_all_users: bounded concurrency, incremental query and watermark handling
+- _run_concurrently: failing workers are counted and never stall the producer
+- get_all_keycloak_groups: nested listings share one in-flight request limit
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services import keycloak_sync as sync_module
+from app.services.keycloak_sync import KeycloakSyncService
+
+
+class _FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self._payload = payload
+        self.content = b"x"
+        self.text = ""
+
+    def json(self):
+        return self._payload
+
+
+class _FakeClient:
+    """Stands in for the pooled httpx client"""
+
+    def __init__(self, statuses=()):
+        self.token_requests = 0
+        self.requests = []
+        self._statuses = list(statuses)
+        self.is_closed = False
+
+    async def post(self, url, data=None, headers=None):
+        self.token_requests += 1
+        await asyncio.sleep(0)
+        return _FakeResponse(200, {"access_token": f"token-{self.token_requests}", "expires_in": 300})
+
+    async def request(self, method, url, headers=None, params=None, json=None):
+        self.requests.append((method, url, headers["Authorization"]))
+        status_code = self._statuses.pop(0) if self._statuses else 200
+        return _FakeResponse(status_code, [])
+
+
+class _FakeState:
+    sync_type = "sync_type"
+    stored = None
+
+    def __init__(self, sync_type, watermark=None):
+        self.sync_type = sync_type
+        self.watermark = watermark
+        self.last_run_at = None
+        self.last_results = {}
+
+    @classmethod
+    async def find_one(cls, *args):
+        return cls.stored
+
+    async def save(self):
+        type(self).stored = self
+
+
+class _FakeQuery:
+    def __init__(self, items):
+        self._items = items
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for item in self._items:
+            yield item
+
+
+@pytest.fixture
+def service(monkeypatch):
+    service = KeycloakSyncService()
+    client = _FakeClient()
+    service._client = client
+    return service
+
+
+@pytest.fixture
+def fake_users(monkeypatch):
+    queries = []
+    users = [SimpleNamespace(email=f"user{i}@example.com") for i in range(10)]
+
+    def find(query):
+        queries.append(query)
+        return _FakeQuery(users)
+
+    _FakeState.stored = None
+    monkeypatch.setattr(sync_module, "KeycloakSyncState", _FakeState)
+    monkeypatch.setattr(sync_module, "UserModel", SimpleNamespace(find=find))
+    return queries
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_admin_token(service):
+    tokens = await asyncio.gather(*(service._get_admin_token() for _ in range(5)))
+
+    assert set(tokens) == {"token-1"}
+    assert service._client.token_requests == 1
+
+
+@pytest.mark.asyncio
+async def test_rejected_token_is_refreshed_once(service):
+    service._client = _FakeClient(statuses=[401, 200])
+
+    status_code, _ = await service._make_admin_request("GET", "/users")
+
+    assert status_code == 200
+    assert [auth for _, _, auth in service._client.requests] == ["Bearer token-1", "Bearer token-2"]
+
+
+@pytest.mark.asyncio
+async def test_listings_are_paginated(service, monkeypatch):
+    monkeypatch.setattr(sync_module.settings, "KEYCLOAK_SYNC_PAGE_SIZE", 2)
+    users = [{"id": str(i)} for i in range(5)]
+    pages = []
+
+    async def fake_request(method, endpoint, data=None, params=None):
+        pages.append(params)
+        return 200, users[params["first"]:params["first"] + params["max"]]
+
+    monkeypatch.setattr(service, "_make_admin_request", fake_request)
+
+    assert await service.get_all_keycloak_users() == users
+    assert [page["first"] for page in pages] == [0, 2, 4]
+
+
+@pytest.mark.asyncio
+async def test_full_sync_is_bounded_and_sets_watermark(service, fake_users, monkeypatch):
+    monkeypatch.setattr(sync_module.settings, "KEYCLOAK_SYNC_CONCURRENCY", 3)
+    running = {"now": 0, "max": 0}
+
+    async def fake_sync_user(user):
+        running["now"] += 1
+        running["max"] = max(running["max"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        return True
+
+    async def fake_sync_groups(user):
+        return True
+
+    monkeypatch.setattr(service, "sync_user_to_keycloak", fake_sync_user)
+    monkeypatch.setattr(service, "sync_user_to_team_groups", fake_sync_groups)
+
+    started = datetime.utcnow()
+    results = await service.sync_all_users()
+
+    assert results == {"success": 10, "failed": 0, "total": 10, "mode": "full"}
+    assert running["max"] == 3
+    assert fake_users == [{}]
+    assert _FakeState.stored.watermark >= started
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_keeps_watermark_after_failures(service, fake_users, monkeypatch):
+    watermark = datetime(2026, 1, 1)
+    _FakeState.stored = _FakeState("users", watermark=watermark)
+
+    async def fake_sync_user(user):
+        return user.email != "user3@example.com"
+
+    async def fake_sync_groups(user):
+        return True
+
+    monkeypatch.setattr(service, "sync_user_to_keycloak", fake_sync_user)
+    monkeypatch.setattr(service, "sync_user_to_team_groups", fake_sync_groups)
+
+    results = await service.sync_all_users(incremental=True)
+
+    assert fake_users == [{"updated_at": {"$gt": watermark}}]
+    assert results["mode"] == "incremental"
+    assert results["failed"] == 1
+    assert _FakeState.stored.watermark == watermark
+    assert _FakeState.stored.last_results == results
+
+
+@pytest.mark.asyncio
+async def test_failing_workers_do_not_stall_the_producer(service, monkeypatch):
+    monkeypatch.setattr(sync_module.settings, "KEYCLOAK_SYNC_CONCURRENCY", 2)
+
+    async def failing_worker(item):
+        raise RuntimeError("boom")
+
+    failures = await asyncio.wait_for(service._run_concurrently(range(100), failing_worker), timeout=3)
+
+    assert failures == 100
+
+
+class _GroupsClient(_FakeClient):
+    """Serves groups, members and role mappings, tracking requests in flight"""
+
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def request(self, method, url, headers=None, params=None, json=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+        if url.endswith("/groups"):
+            payload = [{"id": f"g{i}"} for i in range(4)] if params["first"] == 0 else []
+        elif url.endswith("/members"):
+            payload = [{"id": f"u{i}"} for i in range(6)] if params["first"] == 0 else []
+        elif "u3" in url:
+            raise RuntimeError("pool timeout")
+        else:
+            payload = [{"name": "staff"}]
+        return _FakeResponse(200, payload)
+
+
+@pytest.mark.asyncio
+async def test_nested_group_listing_shares_the_request_limit(monkeypatch):
+    monkeypatch.setattr(sync_module.settings, "KEYCLOAK_SYNC_CONCURRENCY", 3)
+    service = KeycloakSyncService()
+    service._client = _GroupsClient()
+
+    groups = await asyncio.wait_for(service.get_all_keycloak_groups(), timeout=3)
+
+    assert len(groups) == 4
+    assert service._client.max_in_flight == 3
+    for group in groups:
+        roles = {member["id"]: member["realmRoles"] for member in group["members"]}
+        assert roles["u0"] == ["staff"]
+        assert roles["u3"] == []
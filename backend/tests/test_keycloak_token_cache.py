@@ -0,0 +1,119 @@
+"""
+Unit tests for KeycloakProvider token verification caching.
+
+Tokens are signed with a throwaway RSA key served as the JWKS. Covers:
+- repeat tokens are answered from the verified-claims cache
+- an unknown key id refetches the JWKS (key rotation), rate limited
+- cache entries expire with the token
+"""
+
+import os
+import sys
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.auth.provider import KeycloakProvider, VerifiedTokenCache
+from app.core.config import settings
+
+
+def _signing_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    return pem, {**public, "kid": kid, "use": "sig"}
+
+
+def _token(pem, kid, issuer, exp_in=300):
+    claims = {"sub": "u-1", "aud": "munistream-admin", "iss": issuer, "exp": int(time.time()) + exp_in}
+    return jwt.encode(claims, pem, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = KeycloakProvider()
+    provider.jwks = {"keys": []}
+    provider.jwks_fetches = 0
+
+    async def fake_get_jwks(force=False):
+        if force or provider._jwks_cache is None:
+            provider.jwks_fetches += 1
+            provider._jwks_cache = provider.jwks
+            provider._jwks_by_kid = {key["kid"]: key for key in provider.jwks["keys"]}
+            provider._jwks_cache_time = time.monotonic()
+        return provider._jwks_cache
+
+    monkeypatch.setattr(provider, "get_jwks", fake_get_jwks)
+    monkeypatch.setattr(settings, "KEYCLOAK_VALID_ISSUERS", [provider.realm_url])
+    return provider
+
+
+@pytest.mark.asyncio
+async def test_repeat_tokens_skip_verification(provider, monkeypatch):
+    pem, public = _signing_key("k1")
+    provider.jwks = {"keys": [public]}
+    token = _token(pem, "k1", provider.realm_url)
+
+    assert (await provider.verify_token(token))["sub"] == "u-1"
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached token was decoded again")
+
+    monkeypatch.setattr(jwt, "decode", fail)
+    assert (await provider.verify_token(token))["sub"] == "u-1"
+    assert provider.jwks_fetches == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_refetches_jwks_once(provider, monkeypatch):
+    monkeypatch.setattr(settings, "KEYCLOAK_JWKS_MIN_REFRESH_SECONDS", 0)
+    old_pem, old_public = _signing_key("old")
+    provider.jwks = {"keys": [old_public]}
+    await provider.verify_token(_token(old_pem, "old", provider.realm_url))
+
+    # Keycloak rotated its key
+    new_pem, new_public = _signing_key("new")
+    provider.jwks = {"keys": [old_public, new_public]}
+    assert (await provider.verify_token(_token(new_pem, "new", provider.realm_url)))["sub"] == "u-1"
+    assert provider.jwks_fetches == 2
+
+    monkeypatch.setattr(settings, "KEYCLOAK_JWKS_MIN_REFRESH_SECONDS", 3600)
+    with pytest.raises(HTTPException):
+        await provider.verify_token(_token(new_pem, "bogus", provider.realm_url))
+    assert provider.jwks_fetches == 2
+
+
+@pytest.mark.asyncio
+async def test_untrusted_issuer_is_rejected(provider):
+    pem, public = _signing_key("k1")
+    provider.jwks = {"keys": [public]}
+
+    with pytest.raises(HTTPException) as exc:
+        await provider.verify_token(_token(pem, "k1", "https://evil.example/realms/munistream"))
+    assert exc.value.status_code == 401
+
+
+def test_cache_entries_expire_with_the_token():
+    cache = VerifiedTokenCache(max_size=2, max_seconds=300)
+    cache.put("expired", {"exp": time.time() - 1})
+    cache.put("a", {"exp": time.time() + 60})
+    cache.put("b", {"exp": time.time() + 60})
+    cache.put("c", {"exp": time.time() + 60})
+
+    assert cache.get("expired") is None
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
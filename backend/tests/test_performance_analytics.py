@@ -0,0 +1,131 @@
+"""
+Unit tests for aggregation-pipeline performance analytics.
+
+These tests exercise the pipeline builders and result shaping (no Mongo):
+- parse_time_window / window_match: inclusive date windows
+- step_metrics_pipeline: single grouped pass with percentiles and facets
+- PerformanceAnalyticsService.get_steps_metrics: per-step results from facet output
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services import performance_analytics
+from app.services.performance_analytics import (
+    PerformanceAnalyticsService,
+    parse_time_window,
+    step_metrics_pipeline,
+    window_match,
+)
+
+
+def test_time_window_end_date_is_inclusive():
+    start, end = parse_time_window("2026-03-01", "2026-03-31")
+
+    assert start == datetime(2026, 3, 1)
+    assert end == datetime(2026, 4, 1)
+    assert window_match("started_at", start, end) == {
+        "started_at": {"$gte": datetime(2026, 3, 1), "$lt": datetime(2026, 4, 1)}
+    }
+    assert window_match("started_at", None, None) == {}
+
+
+def test_time_window_rejects_malformed_dates():
+    with pytest.raises(ValueError):
+        parse_time_window("03/01/2026", None)
+
+
+def test_step_pipeline_groups_by_step_with_percentiles():
+    pipeline = step_metrics_pipeline({"workflow_id": "licencia"})
+
+    assert pipeline[0] == {"$match": {"workflow_id": "licencia"}}
+    # Workflow-wide queries compute queue times with a window per instance
+    assert pipeline[1]["$setWindowFields"]["partitionBy"] == "$instance_id"
+    facets = pipeline[-1]["$facet"]
+    assert set(facets) == {"summary", "histogram", "errors"}
+    group = facets["summary"][0]["$group"]
+    assert group["_id"] == "$step_id"
+    assert group["percentiles"]["$percentile"]["p"] == [0.5, 0.9, 0.95]
+
+
+class _FakeCursor:
+    def __init__(self, result):
+        self._result = result
+
+    async def to_list(self):
+        return self._result
+
+
+@pytest.mark.asyncio
+async def test_get_steps_metrics_shapes_facet_output(monkeypatch):
+    captured = {}
+    facet_output = [{
+        "summary": [
+            {
+                "_id": "review",
+                "total": 4,
+                "successful": 3,
+                "avg_duration": 2.0,
+                "min_duration": 0.5,
+                "max_duration": 5.0,
+                "avg_queue_ms": 1500.0,
+                "percentiles": [1.5, 4.0, 5.0],
+                "slow": 1,
+            }
+        ],
+        "histogram": [
+            {"_id": {"step_id": "review", "bucket": 1}, "count": 3},
+            {"_id": {"step_id": "review", "bucket": 0}, "count": 1},
+        ],
+        "errors": [
+            {"_id": {"step_id": "review", "error": "timeout"}, "count": 1},
+        ],
+    }]
+
+    def fake_aggregate(pipeline, **kwargs):
+        captured["match"] = pipeline[0]["$match"]
+        captured["pipeline"] = pipeline
+        return _FakeCursor(facet_output)
+
+    monkeypatch.setattr(performance_analytics.StepExecution, "aggregate", fake_aggregate)
+
+    metrics = await PerformanceAnalyticsService.get_steps_metrics(
+        step_ids=["review", "approve"],
+        workflow_id="licencia",
+        start=datetime(2026, 3, 1),
+    )
+
+    # The step filter is in the first (index-backed) match; the previous
+    # execution of each instance is looked up per row, not windowed
+    assert captured["match"] == {
+        "started_at": {"$gte": datetime(2026, 3, 1)},
+        "workflow_id": "licencia",
+        "step_id": {"$in": ["review", "approve"]},
+    }
+    stages = [next(iter(stage)) for stage in captured["pipeline"]]
+    assert stages[1] == "$lookup"
+    assert captured["pipeline"][1]["$lookup"]["from"] == "step_executions"
+    assert stages.count("$match") == 1
+    assert list(metrics) == ["review"]
+    review = metrics["review"]
+    assert review["success_rate"] == 75.0
+    assert review["average_duration_ms"] == 2000.0
+    assert review["p90_duration_ms"] == 4000.0
+    assert review["average_queue_time_ms"] == 1500.0
+    assert review["common_errors"] == [{"error": "timeout", "count": 1, "percentage": 100.0}]
+    assert review["bottleneck_indicators"] == {
+        "slow_executions": 1,
+        "duration_histogram": [
+            {"min_seconds": 0, "count": 1},
+            {"min_seconds": 1, "count": 3},
+        ],
+    }
@@ -0,0 +1,111 @@
+"""
+Unit tests for the materialized public workflow catalog.
+
+These tests exercise the snapshot cache without Mongo or DAGs:
+- PublicWorkflowCatalog.get: one build per locale until the source changes
+- PublicWorkflowCatalog: at most MAX_LOCALES snapshots are kept
+- PublicCatalogSnapshot.render: memoized bodies with stable strong ETags
+- etag_matches: If-None-Match parsing
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services.public_workflow_catalog import (
+    MAX_LOCALES,
+    CatalogEntry,
+    PublicWorkflowCatalog,
+    etag_matches,
+)
+
+
+def _catalog(source):
+    builds = []
+
+    async def builder(locale):
+        builds.append(locale)
+        await asyncio.sleep(0)
+        return [
+            CatalogEntry(workflow_id="licencia", workflow_type="process", data={"name": f"Licencia {locale}"}),
+        ]
+
+    catalog = PublicWorkflowCatalog(max_age_seconds=300)
+    catalog.configure(builder=builder, source_version=lambda: source["version"])
+    return catalog, builds
+
+
+@pytest.mark.asyncio
+async def test_snapshot_built_once_per_locale_under_concurrency():
+    catalog, builds = _catalog({"version": 1})
+
+    snapshots = await asyncio.gather(*(catalog.get("es") for _ in range(5)))
+    await catalog.get("en")
+
+    assert builds == ["es", "en"]
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_rebuilt_when_dags_change_or_invalidated():
+    source = {"version": 1}
+    catalog, builds = _catalog(source)
+
+    await catalog.get("es")
+    source["version"] = 2
+    await catalog.get("es")
+    catalog.invalidate()
+    await catalog.get("es")
+    await catalog.get("es")
+
+    assert builds == ["es", "es", "es"]
+
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_is_bounded():
+    catalog, builds = _catalog({"version": 1})
+
+    for i in range(MAX_LOCALES + 2):
+        await catalog.get(f"locale-{i}")
+
+    assert len(catalog._snapshots) == MAX_LOCALES
+    assert len(catalog._locks) == MAX_LOCALES
+    assert "locale-0" not in catalog._snapshots
+    await catalog.get(f"locale-{MAX_LOCALES + 1}")
+    assert len(builds) == MAX_LOCALES + 2
+
+@pytest.mark.asyncio
+async def test_rendered_body_is_memoized_with_strong_etag():
+    catalog, _ = _catalog({"version": 1})
+    snapshot = await catalog.get("es")
+    calls = []
+
+    def build(snap):
+        calls.append(1)
+        return {"workflows": [e.data for e in snap.entries]}
+
+    body, etag = snapshot.render(("workflows", "process"), build)
+    again, same_etag = snapshot.render(("workflows", "process"), build)
+
+    assert json.loads(body) == {"workflows": [{"name": "Licencia es"}]}
+    assert again is body and same_etag == etag
+    assert etag.startswith('"') and not etag.startswith('W/')
+    assert len(calls) == 1
+
+
+def test_etag_matches_if_none_match_lists():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"zzz", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"zzz"', '"abc"')
+    assert not etag_matches(None, '"abc"')
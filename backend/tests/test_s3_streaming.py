@@ -0,0 +1,71 @@
+"""
+Unit tests for streamed S3 downloads.
+
+These tests run without S3:
+- single_byte_range: only one well-formed byte range is forwarded to GetObject
+- iter_body: the body is read in bounded chunks and always closed
+"""
+
+import io
+import os
+import sys
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services.s3_storage import iter_body, single_byte_range
+
+
+class _FakeBody(io.BytesIO):
+    """StreamingBody stand-in recording each read size"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", "bytes=0-99"),
+    ("bytes=100-", "bytes=100-"),
+    ("bytes=-500", "bytes=-500"),
+    (" bytes = 0-99 ", "bytes=0-99"),
+    ("bytes=0-9,20-29", None),
+    ("bytes=50-10", None),
+    ("bytes=-", None),
+    ("items=0-1", None),
+    (None, None),
+])
+def test_single_byte_range(header, expected):
+    assert single_byte_range(header) == expected
+
+
+@pytest.mark.asyncio
+async def test_iter_body_reads_in_chunks():
+    body = _FakeBody(b"x" * 25)
+
+    chunks = [chunk async for chunk in iter_body(body, chunk_size=10)]
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert set(body.reads) == {10}
+    assert body.closed
+
+
+@pytest.mark.asyncio
+async def test_iter_body_closes_on_early_exit():
+    body = _FakeBody(b"x" * 100)
+    stream = iter_body(body, chunk_size=10)
+
+    assert await stream.__anext__() == b"x" * 10
+    await stream.aclose()
+
+    assert body.closed
+    assert len(body.reads) == 1
@@ -0,0 +1,118 @@
+"""
+Unit tests for S3UploadOperator concurrent and multipart uploads.
+
+These tests run without S3:
+- _iter_base64_parts: parts decode to the original content, one part at a time
+- _multipart_upload_to_s3: parallel parts, bounded in flight, aborted on failure
+"""
+
+import asyncio
+import base64
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.workflows.operators import s3_upload
+from app.workflows.operators.s3_upload import (
+    S3UploadOperator,
+    _decoded_size,
+    _iter_base64_parts,
+    _normalize_base64,
+)
+
+
+class _FakeS3Client:
+    def __init__(self, fail_part=None):
+        self.fail_part = fail_part
+        self.parts = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completed = None
+        self.aborted = False
+        self._lock = threading.Lock()
+
+    def create_multipart_upload(self, **params):
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            threading.Event().wait(0.01)
+            if PartNumber == self.fail_part:
+                raise RuntimeError("part failed")
+            self.parts[PartNumber] = Body
+            return {"ETag": f'"etag-{PartNumber}"'}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.completed = MultipartUpload["Parts"]
+        return {"ETag": '"final"'}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted = True
+
+    def generate_presigned_url(self, *args, **kwargs):
+        return "https://example.com/presigned"
+
+
+@pytest.fixture
+def operator():
+    operator = S3UploadOperator(task_id="upload_docs", bucket_name="bucket")
+    operator.executor = ThreadPoolExecutor(max_workers=16)
+    yield operator
+    operator.executor.shutdown(wait=False)
+
+
+def test_base64_parts_decode_to_original():
+    content = os.urandom(1000)
+    encoded = _normalize_base64(base64.encodebytes(content).decode())
+
+    parts = list(_iter_base64_parts(encoded, part_size=99))
+
+    assert _decoded_size(encoded) == len(content)
+    assert all(len(part) == 99 for part in parts[:-1])
+    assert b"".join(parts) == content
+
+
+def test_invalid_base64_is_rejected():
+    with pytest.raises(ValueError):
+        _normalize_base64("abc")
+
+
+@pytest.mark.asyncio
+async def test_multipart_upload_runs_parts_in_parallel(operator, monkeypatch):
+    monkeypatch.setattr(s3_upload, "MAX_CONCURRENT_PARTS", 3)
+    operator.s3_client = _FakeS3Client()
+    parts = [bytes([i]) * 10 for i in range(8)]
+
+    result = await operator._multipart_upload_to_s3(iter(parts), 80, "key", "application/pdf", {})
+
+    assert result["success"] is True
+    assert result["etag"] == "final"
+    assert [p["PartNumber"] for p in operator.s3_client.completed] == list(range(1, 9))
+    assert b"".join(operator.s3_client.parts[n] for n in range(1, 9)) == b"".join(parts)
+    assert 1 < operator.s3_client.max_in_flight <= 3
+
+
+@pytest.mark.asyncio
+async def test_failed_part_aborts_upload(operator):
+    operator.s3_client = _FakeS3Client(fail_part=2)
+
+    result = await operator._multipart_upload_to_s3(iter([b"a", b"b", b"c"]), 3, "key", "application/pdf", {})
+
+    assert result["success"] is False
+    assert operator.s3_client.aborted
+    assert operator.s3_client.completed is None
@@ -0,0 +1,111 @@
+"""
+Unit tests for incrementally maintained step metric rollups.
+
+These tests exercise the rollup logic without Mongo:
+- sketch_key / sketch_quantiles: percentile estimates within the sketch accuracy
+- StepMetricRollupService.record / build_operations: buffered $inc upserts per bucket
+- StepRollupSummary: merging buckets into per-step metrics
+"""
+
+import os
+import random
+import sys
+from datetime import datetime
+
+import pytest
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services.step_metric_rollups import (
+    SKETCH_RELATIVE_ACCURACY,
+    RollupDelta,
+    StepMetricRollupService,
+    StepRollupSummary,
+    choose_granularity,
+    sketch_key,
+    sketch_quantiles,
+)
+
+
+NOW = datetime(2026, 3, 1, 12, 34, 56)
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = random.Random(3)
+    durations = sorted(rng.lognormvariate(0, 1.5) for _ in range(5000))
+    sketch = {}
+    for value in durations:
+        key = sketch_key(value)
+        sketch[key] = sketch.get(key, 0) + 1
+
+    for q, estimate in zip([0.5, 0.9, 0.95], sketch_quantiles(sketch, [0.5, 0.9, 0.95])):
+        exact = durations[int(q * (len(durations) - 1))]
+        assert abs(estimate - exact) / exact <= SKETCH_RELATIVE_ACCURACY + 1e-9
+
+
+def test_record_buffers_one_upsert_per_bucket_and_granularity():
+    service = StepMetricRollupService()
+
+    service.record("licencia", "review", "completed", 2.0, timestamp=NOW)
+    service.record("licencia", "review", "failed", 4.0, timestamp=NOW)
+    service.record("licencia", "review", "waiting", 0.1, timestamp=NOW)
+
+    operations = service.build_operations(now=NOW)
+
+    assert service.pending_buckets == 0
+    filters = {op._filter["granularity"]: op._filter for op in operations}
+    assert set(filters) == {"minute", "hour", "day"}
+    assert filters["hour"]["bucket_start"] == datetime(2026, 3, 1, 12, 0)
+
+    update = next(op._doc for op in operations if op._filter["granularity"] == "minute")
+    assert update["$inc"]["executions"] == 2
+    assert update["$inc"]["completed"] == 1
+    assert update["$inc"]["waiting"] == 1
+    assert update["$inc"]["duration_sum"] == 6.0
+    assert update["$inc"]["duration_sum_sq"] == 20.0
+    assert update["$min"] == {"duration_min": 2.0}
+    assert update["$max"] == {"duration_max": 4.0}
+    assert sum(v for k, v in update["$inc"].items() if k.startswith("sketch.")) == 2
+    assert update["$setOnInsert"]["expires_at"] > NOW
+
+
+def test_record_rejects_unknown_outcome():
+    with pytest.raises(ValueError):
+        StepMetricRollupService().record("licencia", "review", "exploded")
+
+
+def test_summary_merges_buckets():
+    first, second = RollupDelta(), RollupDelta()
+    for duration in (1.0, 3.0):
+        first.add("completed", duration)
+    second.add("failed", 5.0)
+
+    summary = StepRollupSummary(step_id="review")
+    for delta in (first, second):
+        inc = delta.to_update("hour", NOW, NOW)["$inc"]
+        summary.merge({
+            **{k: v for k, v in inc.items() if not k.startswith("sketch.")},
+            "duration_min": delta.duration_min,
+            "duration_max": delta.duration_max,
+            "sketch": delta.sketch,
+        })
+
+    result = summary.to_dict()
+    assert result["total_executions"] == 3
+    assert result["failed_executions"] == 1
+    assert result["success_rate"] == pytest.approx(66.67)
+    assert result["avg_duration_seconds"] == pytest.approx(3.0)
+    assert result["stddev_duration_seconds"] == pytest.approx((8 / 3) ** 0.5)
+    assert 2.9 <= result["p50_duration_seconds"] <= 3.1
+    assert result["max_duration_seconds"] == 5.0
+
+
+def test_choose_granularity_by_window():
+    assert choose_granularity(datetime(2026, 3, 1, 10, 0), NOW) == "minute"
+    assert choose_granularity(datetime(2026, 2, 25), NOW) == "hour"
+    assert choose_granularity(datetime(2026, 1, 1), NOW) == "day"
+    assert choose_granularity(None, None) == "day"
@@ -0,0 +1,79 @@
+"""
+Unit tests for the workflow metadata cache filled on DAG registration.
+
+These tests exercise the cache without DAG operators:
+- WorkflowMetadata.from_dag: name, step order and operator classes
+- execution_order: topological order independent of definition order
+- WorkflowMetadataCache.get: exact version, latest fallback and misses
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services.workflow_metadata import WorkflowMetadataCache, execution_order
+
+
+class _Operator:
+    def __init__(self, task_id, downstream=()):
+        self.task_id = task_id
+        self.downstream_tasks = list(downstream)
+
+
+class UserInputOperator(_Operator):
+    pass
+
+
+class ApprovalOperator(_Operator):
+    pass
+
+
+def _dag(version, tasks, description="Licencia"):
+    return SimpleNamespace(dag_id="licencia", version=version, description=description, tasks=tasks)
+
+
+def test_register_records_order_and_operator_classes():
+    cache = WorkflowMetadataCache()
+    revision = ApprovalOperator("revision")
+    metadata = cache.register(
+        _dag("1.0.0", {"revision": revision, "captura": UserInputOperator("captura", [revision])}),
+        name="Licencia de Construcción"
+    )
+
+    assert metadata.name == "Licencia de Construcción"
+    assert metadata.step_order == ("captura", "revision")
+    assert metadata.total_steps == 2
+    assert metadata.operator_classes == {"captura": "UserInputOperator", "revision": "ApprovalOperator"}
+
+
+def test_get_prefers_exact_version_then_latest():
+    cache = WorkflowMetadataCache()
+    cache.register(_dag("1.0.0", {"captura": UserInputOperator("captura")}))
+    cache.register(_dag("2.0.0", {"captura": UserInputOperator("captura"), "revision": ApprovalOperator("revision")}))
+
+    assert cache.get("licencia", "1.0.0").total_steps == 1
+    assert cache.get("licencia").version == "2.0.0"
+    assert cache.get("licencia", "9.9.9").version == "2.0.0"
+    assert cache.get("otro") is None
+    assert cache.missing(["licencia", "otro"]) == ["otro"]
+
+
+def test_execution_order_follows_edges_and_keeps_cycles_last():
+    pago = _Operator("pago")
+    revision = _Operator("revision", [pago])
+    captura = _Operator("captura", [revision, pago])
+    aviso = _Operator("aviso")
+
+    tasks = {"pago": pago, "revision": revision, "aviso": aviso, "captura": captura}
+    assert execution_order(tasks) == ("aviso", "captura", "revision", "pago")
+
+    a, b = _Operator("a"), _Operator("b")
+    a.downstream_tasks.append(b)
+    b.downstream_tasks.append(a)
+    assert execution_order({"inicio": _Operator("inicio"), "a": a, "b": b}) == ("inicio", "a", "b")
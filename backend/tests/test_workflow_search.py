@@ -0,0 +1,83 @@
+"""
+Unit tests for the public workflow full-text search index.
+
+These tests exercise the pure index (no Mongo / DAGs):
+- normalize_text / tokenize: accent folding, stopwords and plural stemming
+- WorkflowSearchIndex.search: prefix matching, ranking, category filter, pagination
+"""
+
+import os
+import sys
+
+# Ensure the backend `app` package is importable when running pytest from
+# the repo root without installing the package.
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from app.services.workflow_search import WorkflowSearchIndex, normalize_text, tokenize
+
+
+WORKFLOWS = [
+    {
+        "workflow_id": "licencia_construccion",
+        "name": "Licencia de Construcción",
+        "description": "Trámite para obtener permisos de obra",
+        "category": "construction",
+        "tags": ["obras"],
+    },
+    {
+        "workflow_id": "certificado_catastral",
+        "name": "Certificado Catastral",
+        "description": "Constancia de la construcción registrada en catastro",
+        "category": "property",
+        "tags": ["predial"],
+    },
+    {
+        "workflow_id": "denuncia_ambiental",
+        "name": "Denuncia Ambiental",
+        "description": "Reporte de daños al medio ambiente",
+        "category": "environment",
+        "tags": [],
+    },
+]
+
+
+def _ids(results):
+    return [r["workflow_id"] for r in results]
+
+
+def test_tokenize_folds_accents_stopwords_and_plurals():
+    assert normalize_text("Trámite AÑO") == "tramite ano"
+    assert tokenize("Licencias de Construcción") == ["licencia", "construccion"]
+    assert tokenize("the permits", locale="en") == ["permit"]
+
+
+def test_search_is_accent_insensitive_and_ranks_name_matches_first():
+    index = WorkflowSearchIndex.build(WORKFLOWS)
+
+    total, results = index.search("construccion")
+
+    assert total == 2
+    # Name match outranks a description-only match
+    assert _ids(results) == ["licencia_construccion", "certificado_catastral"]
+
+
+def test_search_matches_partial_words_and_requires_every_term():
+    index = WorkflowSearchIndex.build(WORKFLOWS)
+
+    assert _ids(index.search("licen")[1]) == ["licencia_construccion"]
+    assert _ids(index.search("de")[1]) == ["denuncia_ambiental"]
+    assert _ids(index.search("certif catastro")[1]) == ["certificado_catastral"]
+    assert index.search("licencia ambiental") == (0, [])
+
+
+def test_search_filters_category_and_paginates():
+    index = WorkflowSearchIndex.build(WORKFLOWS)
+
+    total, results = index.search("", skip=1, limit=1)
+    assert total == 3
+    assert _ids(results) == ["denuncia_ambiental"]
+
+    assert _ids(index.search("", category="property")[1]) == ["certificado_catastral"]
+    assert _ids(index.search("predial")[1]) == ["certificado_catastral"]